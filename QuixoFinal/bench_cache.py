@@ -0,0 +1,61 @@
+import argparse
+import time
+
+import minmax
+from minmax import MAX_INT, alfabeta_iter_deep, state_cache
+from bitboard import from_bitboard
+from bench_parallel import mid_game_positions
+from stats import SearchStats, set_search_stats
+
+#benchmark of the state_cache layout of alfabeta: one entry per position with depth and bound (single lookup) against
+#the previous one (one entry per depth, scan of the depths, minmax.CACHE_SCAN = True) at fixed depth 3-5
+#state_cache is emptied before each run and kept between the positions as in a game
+
+N_POSITIONS = 10
+DEPTHS = [3, 4, 5]
+
+def run(positions: [((int, int), int)], depth: int, scan: bool) -> ([tuple], float, SearchStats):
+    minmax.CACHE_SCAN = scan
+    state_cache.clear()
+    stats = SearchStats()
+    set_search_stats(stats)
+    start = time.perf_counter()
+    results = [alfabeta_iter_deep(board, player, depth, depth, [-MAX_INT]) for board, player in positions]
+    elapsed = time.perf_counter() - start
+    set_search_stats(None)
+    return results, elapsed, stats
+
+#cost of the probes alone: the positions in the cache after a run probed by a node at depth 1 (the deepest scan)
+def probe_time(keys: [(bytes, int, bool)], depth: int, scan: bool) -> float:
+    '''Seconds per probe (state_cache as left by the last run of the same layout)'''
+    start = time.perf_counter()
+    if scan:
+        for key in keys:
+            minmax.cache_scan(key[:2], 1, key[2], depth)
+    else:
+        alfa, beta = -MAX_INT, MAX_INT
+        for key in keys:
+            entry = state_cache.get(key)
+            hit = entry is not None and (entry[2] == minmax.EXACT or (entry[1] <= alfa if key[2] else entry[1] >= beta))
+    return (time.perf_counter() - start) / len(keys)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="single lookup state_cache against the scan of the depths")
+    parser.add_argument("--positions", type=int, default=N_POSITIONS)
+    parser.add_argument("--depths", type=int, nargs="+", default=DEPTHS)
+    args = parser.parse_args()
+
+    positions = [(from_bitboard(board), player) for board, player in mid_game_positions(args.positions)]
+    for depth in args.depths:
+        for scan in (True, False):
+            results, elapsed, stats = run(positions, depth, scan)
+            entries = len(state_cache)
+            keys = list({(key[0], key[1], key[-1]) for key in state_cache})
+            probe = probe_time(keys, depth, scan)
+            if scan:
+                reference = results
+            name = "scan of the depths" if scan else "single lookup"
+            lookups = stats.cache_hits + stats.cache_misses
+            print(f"depth {depth}, {name}: {elapsed / len(positions) * 1000:.1f} ms/move, {stats.nodes} nodes, {elapsed / stats.nodes * 1e6:.1f} us/node, "
+                  f"{lookups} probes ({stats.cache_hits / lookups:.1%} hits), {entries} entries, {probe * 1e6:.2f} us/probe at depth 1")
+        print(f"depth {depth}: same move and value {sum(a == b for a, b in zip(reference, results))}/{len(positions)}")
@@ -0,0 +1,39 @@
+import random
+import timeit
+from minmax import *
+
+#micro-benchmark: eval_terminal_3_4 (np.count_nonzero per line) vs eval_terminal_3_4_lines (12 line masks + popcount)
+
+N_GAMES = 200
+N_REPEAT = 5
+
+#positions reached by random games (same distribution of the nodes seen by alfabeta, terminal ones included)
+def sample_positions(n_games: int) -> [(np.array, int)]:
+    positions = []
+    for game in range(n_games):
+        random.seed(game+1)
+        board = np.zeros((5, 5), dtype=np.int8)
+        player = 1
+        while True:
+            positions.append((board, player))
+            positions.append((board, -player))
+            if eval_terminal_3_4(board, player)[0] != 0:
+                break
+            board = make_ply(board, random.choice(possible_moves(board, player)), player)
+            player = -player
+    return positions
+
+if __name__ == '__main__':
+
+    positions = sample_positions(N_GAMES)
+
+    for board, player in positions:
+        assert eval_terminal_3_4(board, player) == eval_terminal_3_4_lines(board, player), f"mismatch on board:\n {board}\n player: {player}"
+    print(f"same (val, count) on {len(positions)} positions")
+
+    t_ref = min(timeit.repeat(lambda: [eval_terminal_3_4(b, p) for b, p in positions], number=1, repeat=N_REPEAT))
+    t_lines = min(timeit.repeat(lambda: [eval_terminal_3_4_lines(b, p) for b, p in positions], number=1, repeat=N_REPEAT))
+
+    print(f"eval_terminal_3_4:       {t_ref / len(positions) * 1e6:.2f} us/call")
+    print(f"eval_terminal_3_4_lines: {t_lines / len(positions) * 1e6:.2f} us/call")
+    print(f"speedup: {t_ref / t_lines:.2f}x")
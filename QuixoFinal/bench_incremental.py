@@ -0,0 +1,50 @@
+import timeit
+
+import numpy as np
+
+from minmax import possible_moves, make_ply, eval_terminal_3_4_lines, heuristic_score
+from incremental import EvalState
+from bench_eval import sample_positions
+
+#benchmark of the evaluation of every child of a node: make_ply (copy) + eval_terminal_3_4_lines + heuristic_score
+#against EvalState make + eval_terminal_3_4 + heuristic_score + unmake (incremental, board changed in place)
+#every result is checked first, the board of the state must be the same after all the unmakes
+
+N_GAMES = 50
+N_REPEAT = 3
+
+def children_full(board: np.array, player: int, plies: [tuple]) -> list:
+    results = []
+    for ply in plies:
+        child = make_ply(board, ply, player)
+        val, count = eval_terminal_3_4_lines(child, -player)
+        results.append((val, count, heuristic_score(child, -player, count) if val == 0 else None))
+    return results
+
+def children_incremental(state: EvalState, player: int, plies: [tuple]) -> list:
+    results = []
+    for ply in plies:
+        before = state.make(ply, player)
+        val, count = state.eval_terminal_3_4(-player)
+        results.append((val, count, state.heuristic_score(-player, count) if val == 0 else None))
+        state.unmake(ply, before)
+    return results
+
+if __name__ == '__main__':
+
+    positions = [(board, player) for board, player in sample_positions(N_GAMES) if eval_terminal_3_4_lines(board, player)[0] == 0]
+    states = [EvalState(board) for board, _ in positions]
+    plies = [possible_moves(board, player) for board, player in positions] #move generation is the same for both: not timed
+
+    for (board, player), state, p in zip(positions, states, plies):
+        assert children_full(board, player, p) == children_incremental(state, player, p), f"mismatch on board:\n {board}\n player: {player}"
+        assert np.array_equal(state.board, board), f"board not restored:\n {state.board}\n != \n {board}"
+    children = sum(len(p) for p in plies)
+    print(f"same (val, count, heuristic) on {children} children of {len(positions)} positions")
+
+    t_full = min(timeit.repeat(lambda: [children_full(b, p, q) for (b, p), q in zip(positions, plies)], number=1, repeat=N_REPEAT))
+    t_inc = min(timeit.repeat(lambda: [children_incremental(s, p, q) for s, (_, p), q in zip(states, positions, plies)], number=1, repeat=N_REPEAT))
+
+    print(f"make_ply + eval_terminal_3_4_lines + heuristic_score: {t_full / children * 1e6:.2f} us/child")
+    print(f"EvalState make + evaluation + unmake:                 {t_inc / children * 1e6:.2f} us/child")
+    print(f"speedup: {t_full / t_inc:.2f}x")
@@ -0,0 +1,53 @@
+import argparse
+import time
+import tracemalloc
+
+import minmax
+from minmax import MAX_INT, alfabeta_iter_deep, state_cache
+from incremental import alfabeta_iter_deep_inplace
+from bitboard import from_bitboard
+from bench_parallel import mid_game_positions
+
+#alfabeta_iter_deep (copy of the board per child, children kept in postponed_eval) against alfabeta_iter_deep_inplace
+#(make/unmake on one EvalState): same move/value/depth, time per move, peak of the memory allocated during one search
+#(tracemalloc, state_cache emptied before every traced search: only the memory of the search itself)
+
+N_POSITIONS = 20
+DEPTHS = [3, 4]
+
+def run(search: callable, positions: [((int, int), int)], depth: int) -> ([tuple], float):
+    state_cache.clear()
+    start = time.perf_counter()
+    results = [search(board, player, depth, depth, [-MAX_INT]) for board, player in positions]
+    return results, time.perf_counter() - start
+
+#max over the positions of the peak of traced memory during the search, without the entries of state_cache
+def peak_memory(search: callable, positions: [((int, int), int)], depth: int) -> int:
+    peak = 0
+    for board, player in positions:
+        state_cache.clear()
+        tracemalloc.start()
+        search(board, player, depth, depth, [-MAX_INT])
+        size, search_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak = max(peak, search_peak - size) #size: memory still allocated at the end (state_cache)
+    return peak
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="alfabeta with a copy of the board per child against make/unmake on one board")
+    parser.add_argument("--positions", type=int, default=N_POSITIONS)
+    parser.add_argument("--depths", type=int, nargs="+", default=DEPTHS)
+    parser.add_argument("--no-batch", action="store_true", help="nodes at depth 1 expanded one child at a time by both searches")
+    args = parser.parse_args()
+    minmax.BATCH_LEAVES = not args.no_batch
+
+    positions = [(from_bitboard(board), player) for board, player in mid_game_positions(args.positions)]
+    print(f"batch of the leaves (minmax.BATCH_LEAVES): {minmax.BATCH_LEAVES}")
+    for depth in args.depths:
+        results_copy, t_copy = run(alfabeta_iter_deep, positions, depth)
+        results_inplace, t_inplace = run(alfabeta_iter_deep_inplace, positions, depth)
+        memory_copy = peak_memory(alfabeta_iter_deep, positions[:5], depth)
+        memory_inplace = peak_memory(alfabeta_iter_deep_inplace, positions[:5], depth)
+        print(f"depth {depth}: copy per child {t_copy / len(positions) * 1000:.1f} ms/move, peak {memory_copy / 1024:.0f} KiB | "
+              f"make/unmake {t_inplace / len(positions) * 1000:.1f} ms/move, peak {memory_inplace / 1024:.0f} KiB | "
+              f"same move, value and depth {sum(a == b for a, b in zip(results_copy, results_inplace))}/{len(positions)}")
@@ -0,0 +1,31 @@
+import time
+
+import minmax
+from minmax import MAX_INT, alfabeta_iter_deep, state_cache
+from bitboard import from_bitboard
+from bench_parallel import mid_game_positions
+
+#benchmark: alfabeta_iter_deep (configuration of main.py) with the nodes at depth 1 expanded one child at a time
+#and in batch (alfabeta_leaves), state_cache is emptied before each run and kept between the positions as in a game
+
+N_POSITIONS = 50
+MIN_DEPTH = 1
+MAX_DEPTH = 3
+TV = [MAX_INT, 0.3, -MAX_INT]
+
+def run(positions: [((int, int), int)], batch: bool) -> ([tuple], float):
+    minmax.BATCH_LEAVES = batch
+    state_cache.clear()
+    start = time.perf_counter()
+    results = [alfabeta_iter_deep(board, player, MIN_DEPTH, MAX_DEPTH, TV) for board, player in positions]
+    return results, time.perf_counter() - start
+
+if __name__ == '__main__':
+
+    positions = [(from_bitboard(board), player) for board, player in mid_game_positions(N_POSITIONS)]
+    results_one, t_one = run(positions, False)
+    results_batch, t_batch = run(positions, True)
+
+    print(f"one child at a time: {t_one / len(positions) * 1000:.1f} ms/move")
+    print(f"batch leaves: {t_batch / len(positions) * 1000:.1f} ms/move, speedup {t_one / t_batch:.2f}x")
+    print(f"same move, value and depth: {sum(a == b for a, b in zip(results_one, results_batch))}/{len(positions)}")
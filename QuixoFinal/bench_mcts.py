@@ -0,0 +1,86 @@
+import argparse
+import random
+import time
+
+from game import Player, Move
+from minmax import MAX_INT
+from transposition import TranspositionTable
+from selfplay import record_game
+from tuning import elo_interval
+from mcts import MCTSPlayer
+import players
+
+#head to head of MCTSPlayer against MyPlayer(1,3,...) (configuration of the main batch) at the same time per move:
+#the time per move of MCTSPlayer is the mean time per move of MyPlayer measured on calibration games against RandomPlayer
+#games are pairs with the same random opening and colours swapped (selfplay.record_game), games longer than MAX_PLIES are draws
+
+N_PAIRS = 10
+CALIBRATION_GAMES = 4
+RANDOM_PLIES = 4
+MAX_PLIES = 200
+TT_BYTES = 64 * 2**20
+TV = [MAX_INT, 0.3, -MAX_INT]
+
+class TimedPlayer(Player):
+    '''Player wrapper that measures the time of every move'''
+
+    def __init__(self, player: Player) -> None:
+        super().__init__()
+        self.player = player
+        self.seconds = 0.0
+        self.moves = 0
+
+    def make_move(self, game: 'Game') -> tuple[tuple[int, int], Move]:
+        start = time.perf_counter()
+        move = self.player.make_move(game)
+        self.seconds += time.perf_counter() - start
+        self.moves += 1
+        return move
+
+def calibrate(n_games: int, tt: TranspositionTable) -> float:
+    '''Mean seconds per move of MyPlayer(1,3,...) against RandomPlayer'''
+    agent = TimedPlayer(players.MyPlayer(1, 3, TV, tt=tt))
+    for game in range(n_games):
+        tt.clear()
+        random.seed(game+1)
+        record_game(game, (agent, players.RandomPlayer()) if game % 2 == 0 else (players.RandomPlayer(), agent), 0, MAX_PLIES)
+    return agent.seconds / agent.moves
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="MCTSPlayer against MyPlayer(1,3,...) at equal time per move")
+    parser.add_argument("--pairs", type=int, default=N_PAIRS)
+    parser.add_argument("--move-time", type=float, default=None, help="seconds per move of MCTSPlayer (default: calibrated on MyPlayer)")
+    parser.add_argument("--workers", type=int, default=None, help="root parallelism of MCTSPlayer (default: single process)")
+    args = parser.parse_args()
+
+    players.DEBUG = False
+    tt = TranspositionTable(TT_BYTES)
+    move_time = args.move_time
+    if move_time is None:
+        move_time = calibrate(CALIBRATION_GAMES, tt)
+        print(f"MyPlayer(1,3,...) against random: {move_time * 1000:.1f} ms per move")
+
+    alfabeta = TimedPlayer(players.MyPlayer(1, 3, TV, tt=tt))
+    points = []
+    iterations = 0
+    mcts_time = 0.0
+    mcts_moves = 0
+    for pair in range(args.pairs):
+        for first in (0, 1):
+            tt.clear()
+            mcts = TimedPlayer(MCTSPlayer(move_time, n_workers=args.workers, seed=pair))
+            random.seed(pair)
+            records = record_game(pair, (mcts, alfabeta) if first == 0 else (alfabeta, mcts), RANDOM_PLIES, MAX_PLIES)
+            points.append(float(records["outcome"][first] + 1) / 2)
+            mcts.player.close()
+            iterations += mcts.player.iterations
+            mcts_time += mcts.seconds
+            mcts_moves += mcts.moves
+        print(f"pair {pair}: {points[-2:]}")
+
+    gain, low, high = elo_interval(points)
+    print(f"MCTSPlayer ({move_time * 1000:.1f} ms per move, {mcts_time / mcts_moves * 1000:.1f} ms measured) against MyPlayer(1,3,...) "
+          f"({alfabeta.seconds / alfabeta.moves * 1000:.1f} ms per move): score {sum(points) / len(points):.3f} in {len(points)} games, "
+          f"Elo {gain:+.0f} [{low:+.0f}, {high:+.0f}]")
+    print(f"MCTSPlayer: {iterations / mcts_moves:.0f} iterations per move, {iterations / mcts_time:.0f} iterations per second")
@@ -0,0 +1,43 @@
+import time
+
+from minmax import MAX_INT, alfabeta_iter_deep
+from bitboard import from_bitboard, alfabeta_iter_deep_bb
+from transposition import TranspositionTable
+from ordering import MoveOrdering
+from search import alfabeta_iter_deep_tt
+from negamax import negamax_iter_deep
+from bench_parallel import mid_game_positions
+
+#benchmark on the configuration used by main.py (MyPlayer(1,3,[MAX_INT, 0.3, -MAX_INT])): time per move of
+#the numpy alfabeta, the bitboard alfabeta and the negamax search of search.py (table + move ordering) called by
+#alfabeta_iter_deep_tt and by negamax_iter_deep (SearchResult with the principal variation): same move and score expected
+#tables are kept between positions as during a batch of games
+
+N_POSITIONS = 50
+MIN_DEPTH = 1
+MAX_DEPTH = 3
+TV = [MAX_INT, 0.3, -MAX_INT]
+TT_BYTES = 64 * 2**20
+
+if __name__ == '__main__':
+
+    positions = mid_game_positions(N_POSITIONS)
+    tt_ab = TranspositionTable(TT_BYTES)
+    mo_ab = MoveOrdering()
+    tt_nm = TranspositionTable(TT_BYTES)
+    mo_nm = MoveOrdering()
+    searches = {
+        "alfabeta (numpy)": lambda b, p: alfabeta_iter_deep(from_bitboard(b), p, MIN_DEPTH, MAX_DEPTH, TV)[:2],
+        "alfabeta (bitboard)": lambda b, p: alfabeta_iter_deep_bb(b, p, MIN_DEPTH, MAX_DEPTH, TV)[:2],
+        "alfabeta_iter_deep_tt": lambda b, p: alfabeta_iter_deep_tt(b, p, MIN_DEPTH, MAX_DEPTH, TV, tt_ab, mo_ab)[:2],
+        "negamax_iter_deep": lambda b, p: (lambda r: (r.move, r.score))(negamax_iter_deep(b, p, MIN_DEPTH, MAX_DEPTH, TV, tt_nm, mo_nm)),
+    }
+
+    results = {}
+    for name, run in searches.items():
+        start = time.perf_counter()
+        results[name] = [run(board, player) for board, player in positions]
+        print(f"{name}: {(time.perf_counter() - start) / len(positions) * 1000:.1f} ms/move")
+
+    same = sum(a == b for a, b in zip(results["alfabeta_iter_deep_tt"], results["negamax_iter_deep"]))
+    print(f"negamax_iter_deep same move and score of alfabeta_iter_deep_tt: {same}/{len(positions)}")
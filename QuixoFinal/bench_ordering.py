@@ -0,0 +1,41 @@
+import time
+
+from minmax import MAX_INT
+from transposition import TranspositionTable
+from zobrist import zobrist_hash
+from ordering import MoveOrdering
+import search
+from search import negamax
+from bench_parallel import mid_game_positions
+
+#benchmark: nodes searched with the order of possible_moves and with MoveOrdering (negamax without and with mo)
+#both with iterative deepening from depth 1 and a fresh transposition table for every position
+
+N_POSITIONS = 10
+DEPTHS = [3, 4, 5]
+TT_BYTES = 64 * 2**20
+
+def iter_deep_nodes(board: (int, int), player: int, depth: int, ordering: bool) -> (int, float):
+    tt = TranspositionTable(TT_BYTES)
+    mo = MoveOrdering() if ordering else None
+    h = zobrist_hash(board)
+    search.search_nodes = 0
+    start = time.perf_counter()
+    for d in range(1, depth+1):
+        negamax(board, h, player, d, -MAX_INT, MAX_INT, tt, mo)
+    return search.search_nodes, time.perf_counter() - start
+
+if __name__ == '__main__':
+
+    positions = mid_game_positions(N_POSITIONS)
+    for depth in DEPTHS:
+        nodes = [0, 0]
+        elapsed = [0, 0]
+        for board, player in positions:
+            for ordering in [0, 1]:
+                n, t = iter_deep_nodes(board, player, depth, ordering)
+                nodes[ordering] += n
+                elapsed[ordering] += t
+        print(f"depth {depth}: possible_moves order {nodes[0] // len(positions)} nodes/move {elapsed[0] / len(positions) * 1000:.1f} ms/move, "
+              f"move ordering {nodes[1] // len(positions)} nodes/move {elapsed[1] / len(positions) * 1000:.1f} ms/move, "
+              f"nodes -{(1 - nodes[1] / nodes[0]) * 100:.1f}%")
@@ -0,0 +1,60 @@
+import os
+import random
+import time
+
+from minmax import MAX_INT
+from bitboard import possible_moves_bb, make_ply_bb, eval_terminal_3_4_bb
+from transposition import TranspositionTable
+from zobrist import zobrist_hash
+from search import negamax
+from parallel_search import ParallelSearch
+
+#benchmark: speedup of the root-split search against the number of workers on a fixed set of mid-game positions
+
+N_POSITIONS = 20
+DEPTHS = [3, 4]
+TT_BYTES = 64 * 2**20
+
+#positions after 10-20 random plies (seeded -> always the same set)
+def mid_game_positions(n: int) -> [((int, int), int)]:
+    positions = []
+    game = 0
+    while len(positions) < n:
+        random.seed(game+1)
+        board = (0, 0)
+        player = 1
+        for _ in range(random.randint(10, 20)):
+            board = make_ply_bb(board, random.choice(possible_moves_bb(board, player)), player)
+            player = -player
+        if eval_terminal_3_4_bb(board, player)[0] == 0:
+            positions.append((board, player))
+        game += 1
+    return positions
+
+if __name__ == '__main__':
+
+    positions = mid_game_positions(N_POSITIONS)
+    if os.cpu_count() == 1:
+        print("1 core: only the overhead of the pool is measured, not the multi-core speedup")
+    workers = [1]
+    while workers[-1] * 2 <= os.cpu_count():
+        workers.append(workers[-1] * 2)
+
+    for depth in DEPTHS:
+        tt = TranspositionTable(TT_BYTES)
+        start = time.perf_counter()
+        for board, player in positions:
+            tt.new_search()
+            negamax(board, zobrist_hash(board), player, depth, -MAX_INT, MAX_INT, tt)
+        t_seq = time.perf_counter() - start
+        print(f"depth {depth}, sequential: {t_seq / len(positions) * 1000:.1f} ms/move")
+
+        for n_workers in workers:
+            search = ParallelSearch(n_workers, TT_BYTES)
+            start = time.perf_counter()
+            for board, player in positions:
+                search.tt.new_search()
+                search.search(board, player, depth)
+            t_par = time.perf_counter() - start
+            search.close()
+            print(f"depth {depth}, {n_workers} workers: {t_par / len(positions) * 1000:.1f} ms/move, speedup {t_seq / t_par:.2f}x")
@@ -0,0 +1,93 @@
+import argparse
+import random
+import time
+
+from minmax import MAX_INT, alfabeta_iter_deep, state_cache
+from bitboard import possible_moves_bb, make_ply_bb, eval_terminal_3_4_bb, from_bitboard
+from prover import ThreatProver, MAX_MOVES, MAX_NODES
+from bench_mcts import TimedPlayer
+from selfplay import record_game
+import players
+
+#ThreatProver (prover.py) on positions of random games with a 4 in line: time and nodes per call, wins found by length,
+#every win of 2 or more plies of the player checked by alfabeta at the same depth (2n-1, value MAX_INT) and timed
+#then the cost of the prover in the games of the main batch: MyPlayer(1,3,...) with the prover against RandomPlayer
+
+N_POSITIONS = 1000
+N_GAMES = 10
+MAX_PLIES = 200
+TV = [MAX_INT, 0.3, -MAX_INT]
+
+def threat_positions(n: int) -> [((int, int), int)]:
+    '''Positions (not terminal) of seeded random games with at least a 4 in line'''
+    positions = []
+    game = 0
+    while len(positions) < n:
+        random.seed(game+1)
+        board = (0, 0)
+        player = 1
+        for _ in range(random.randint(10, 60)):
+            board = make_ply_bb(board, random.choice(possible_moves_bb(board, player)), player)
+            player = -player
+            if eval_terminal_3_4_bb(board, player)[0] != 0:
+                break
+        val, count = eval_terminal_3_4_bb(board, player)
+        if val == 0 and count[0] + count[1] > 0:
+            positions.append((board, player))
+        game += 1
+    return positions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="forced win prover against alfabeta at the depth of the win found")
+    parser.add_argument("--positions", type=int, default=N_POSITIONS)
+    parser.add_argument("--max-moves", type=int, default=MAX_MOVES)
+    parser.add_argument("--max-nodes", type=int, default=MAX_NODES)
+    parser.add_argument("--games", type=int, default=N_GAMES, help="games of MyPlayer with the prover against RandomPlayer (0: none)")
+    args = parser.parse_args()
+
+    players.DEBUG = False
+    prover = ThreatProver(args.max_moves, args.max_nodes)
+    wins = [0] * (args.max_moves + 1)
+    t_prover = 0.0
+    nodes = 0
+    t_found = [0.0] * (args.max_moves + 1)
+    t_alfabeta = [0.0] * (args.max_moves + 1)
+    confirmed = [0] * (args.max_moves + 1)
+    positions = [(from_bitboard(board), player) for board, player in threat_positions(args.positions)]
+    for board, player in positions:
+        start = time.perf_counter()
+        found = prover.prove(board, player)
+        elapsed = time.perf_counter() - start
+        t_prover += elapsed
+        nodes += prover.nodes
+        if found is None:
+            continue
+        wins[found[1]] += 1
+        t_found[found[1]] += elapsed
+        if found[1] > 1:
+            depth = 2*found[1] - 1
+            state_cache.clear()
+            start = time.perf_counter()
+            _, val, _ = alfabeta_iter_deep(board, player, depth, depth, [-MAX_INT])
+            t_alfabeta[found[1]] += time.perf_counter() - start
+            confirmed[found[1]] += val == MAX_INT
+
+    print(f"prover (max {args.max_moves} plies of the player, {args.max_nodes} nodes): {len(positions)} positions, "
+          f"{t_prover / len(positions) * 1000:.2f} ms and {nodes / len(positions):.0f} nodes per call, {prover.aborted} aborted")
+    for n in range(1, args.max_moves + 1):
+        line = f"win in {n} ({2*n - 1} plies): {wins[n]} positions"
+        if n > 1 and wins[n] > 0:
+            line += f", prover {t_found[n] / wins[n] * 1000:.1f} ms, alfabeta depth {2*n - 1}: {t_alfabeta[n] / wins[n] * 1000:.1f} ms per position, value MAX_INT {confirmed[n]}/{wins[n]}"
+        print(line)
+
+    if args.games > 0:
+        prover = ThreatProver(args.max_moves, args.max_nodes)
+        agent = TimedPlayer(players.MyPlayer(1, 3, TV, prover=prover))
+        points = 0
+        for game in range(args.games):
+            random.seed(game+1)
+            records = record_game(game, (agent, players.RandomPlayer()) if game % 2 == 0 else (players.RandomPlayer(), agent), 0, MAX_PLIES)
+            points += records["outcome"][game % 2] == 1
+        print(f"MyPlayer(1,3,...) with the prover against random: won {points}/{args.games}, {agent.seconds / agent.moves * 1000:.1f} ms/move, "
+              f"{prover.calls} prover calls, {prover.proved} wins found, {prover.aborted} aborted")
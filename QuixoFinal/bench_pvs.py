@@ -0,0 +1,46 @@
+import time
+
+from minmax import MAX_INT
+from transposition import TranspositionTable
+from ordering import MoveOrdering
+import search
+from search import alfabeta_iter_deep_tt, alfabeta_iter_deep_pvs
+from bench_parallel import mid_game_positions
+
+#regression + benchmark: negamax with move ordering, pvs and pvs with aspiration windows should return the same best move and value
+#(iterative deepening up to depth, fresh transposition table and move ordering for every position)
+#NOTE: with iterative deepening the table can give a deeper result for a transposition, so a different window can
+#change the score (search instability): a different move is fine only if it has the same value
+
+N_POSITIONS = 30
+DEPTHS = [3, 4]
+TT_BYTES = 64 * 2**20
+
+SEARCHES = {
+    "negamax+ordering": lambda b, p, d, tV, tt, mo: alfabeta_iter_deep_tt(b, p, 1, d, tV, tt, mo),
+    "pvs": lambda b, p, d, tV, tt, mo: alfabeta_iter_deep_pvs(b, p, 1, d, tV, tt, mo, aspiration=False),
+    "pvs+aspiration": lambda b, p, d, tV, tt, mo: alfabeta_iter_deep_pvs(b, p, 1, d, tV, tt, mo, aspiration=True),
+}
+
+if __name__ == '__main__':
+
+    positions = mid_game_positions(N_POSITIONS)
+    for depth in DEPTHS:
+        tV = [MAX_INT] * (depth-1) + [-MAX_INT] #stop early only on a forced win
+        results = {name: [] for name in SEARCHES}
+        nodes = {name: 0 for name in SEARCHES}
+        elapsed = {name: 0 for name in SEARCHES}
+        for board, player in positions:
+            for name, run in SEARCHES.items():
+                tt = TranspositionTable(TT_BYTES)
+                search.search_nodes = 0
+                start = time.perf_counter()
+                results[name].append(run(board, player, depth, tV, tt, MoveOrdering()))
+                elapsed[name] += time.perf_counter() - start
+                nodes[name] += search.search_nodes
+
+        for name in SEARCHES:
+            same_move = sum(r[0] == ref[0] for r, ref in zip(results[name], results["negamax+ordering"]))
+            same_val = sum(abs(r[1] - ref[1]) < 1e-9 for r, ref in zip(results[name], results["negamax+ordering"]))
+            print(f"depth {depth}, {name}: {nodes[name] // len(positions)} nodes/move, {elapsed[name] / len(positions) * 1000:.1f} ms/move, "
+                  f"same move {same_move}/{len(positions)}, same value {same_val}/{len(positions)}")
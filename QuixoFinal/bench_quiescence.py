@@ -0,0 +1,78 @@
+import argparse
+import random
+import time
+
+from minmax import MAX_INT, alfabeta_iter_deep, state_cache, set_quiescence
+from stats import SearchStats, set_search_stats
+from bitboard import from_bitboard
+from bench_parallel import mid_game_positions
+from bench_mcts import TimedPlayer
+from selfplay import record_game
+from tuning import elo_interval
+import players
+
+#quiescence extension of alfabeta (minmax.quiescence): fixed depth searches with and without it on mid game positions
+#(nodes, of which in the extension, time per move, same move of a deeper search without it), then a match of
+#MyPlayer(1, 2, ..., quiescence=plies) against the configuration of the main batch MyPlayer(1, 3, [MAX_INT, 0.3, -MAX_INT]),
+#and the same match without quiescence as control (pairs of games with the same random opening, colours swapped)
+#NOTE: players of the match share state_cache, cleared at every move by set_quiescence: times of the match are without cache
+#reuse between moves (for both players), the searches of the first part keep it for the whole run of a configuration
+
+N_POSITIONS = 20
+DEPTHS = [1, 2, 3]
+REFERENCE_DEPTH = 4
+PLIES = 2
+N_PAIRS = 10
+TV = [MAX_INT, 0.3, -MAX_INT]
+RANDOM_PLIES = 4
+MAX_PLIES = 200
+
+def run(positions: [((int, int), int)], depth: int, plies: int) -> ([tuple], SearchStats, float):
+    set_quiescence(plies)
+    state_cache.clear()
+    stats = SearchStats()
+    set_search_stats(stats)
+    start = time.perf_counter()
+    results = [alfabeta_iter_deep(board, player, depth, depth, [-MAX_INT]) for board, player in positions]
+    elapsed = time.perf_counter() - start
+    set_search_stats(None)
+    return results, stats, elapsed
+
+def match(n_pairs: int, player_a: callable, player_b: callable) -> ([float], TimedPlayer, TimedPlayer):
+    '''Points of player_a in every game, players built by player_a()/player_b()'''
+    a, b = TimedPlayer(player_a()), TimedPlayer(player_b())
+    points = []
+    for pair in range(n_pairs):
+        for first in (0, 1):
+            random.seed(pair)
+            records = record_game(pair, (a, b) if first == 0 else (b, a), RANDOM_PLIES, MAX_PLIES)
+            points.append(float(records["outcome"][first] + 1) / 2)
+    return points, a, b
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="alfabeta with and without the quiescence extension of the 4 in line threats")
+    parser.add_argument("--positions", type=int, default=N_POSITIONS)
+    parser.add_argument("--depths", type=int, nargs="+", default=DEPTHS)
+    parser.add_argument("--reference", type=int, default=REFERENCE_DEPTH, help="depth of the search (without quiescence) the moves are compared to")
+    parser.add_argument("--plies", type=int, default=PLIES, help="plies of the quiescence extension")
+    parser.add_argument("--pairs", type=int, default=N_PAIRS, help="pairs of games of the match (0: no match)")
+    args = parser.parse_args()
+
+    players.DEBUG = False
+    positions = [(from_bitboard(board), player) for board, player in mid_game_positions(args.positions)]
+    reference, _, t_reference = run(positions, args.reference, 0)
+    print(f"reference depth {args.reference}: {t_reference / len(positions) * 1000:.1f} ms/move")
+    for depth in args.depths:
+        for plies in (0, args.plies):
+            results, stats, elapsed = run(positions, depth, plies)
+            same = sum(r[0] == ref[0] for r, ref in zip(results, reference))
+            print(f"depth {depth} quiescence {plies}: {stats.nodes / len(positions):.0f} nodes/move ({stats.quiescence / len(positions):.0f} in quiescence), "
+                  f"{elapsed / len(positions) * 1000:.1f} ms/move, same move of depth {args.reference} {same}/{len(positions)}")
+
+    for plies in (args.plies, 0) if args.pairs > 0 else ():
+        points, a, b = match(args.pairs, lambda: players.MyPlayer(1, 2, [MAX_INT, -MAX_INT], quiescence=plies), lambda: players.MyPlayer(1, 3, TV))
+        gain, low, high = elo_interval(points)
+        print(f"depth 1-2 quiescence {plies} ({a.seconds / a.moves * 1000:.1f} ms/move) against depth 1-3 tV {TV[1]} ({b.seconds / b.moves * 1000:.1f} ms/move): "
+              f"score {sum(points) / len(points):.3f} in {len(points)} games (won {points.count(1.0)}, lost {points.count(0.0)}, {points.count(0.5)} stopped at {MAX_PLIES} plies), "
+              f"Elo {gain:+.0f} [{low:+.0f}, {high:+.0f}]")
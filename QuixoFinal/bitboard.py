@@ -0,0 +1,347 @@
+import time
+import numpy as np
+import minmax
+from game import Move #original enum
+from minmax import BORDER_TILES, POS_SCORES, TOT_SCORES, COUNT_4_DIV, COUNT_3_DIV, MAX_INT, eval_terminal_3_4_masks
+from transposition import EXACT, LOWER, UPPER
+
+#bitboard backend for minmax: every side is stored as a 25-bit int mask, bit i*5+j <-> tile (i,j)
+#a board is a tuple (pos, neg): pos = tiles of player 1, neg = tiles of player -1 (minmax representation)
+#all this methods are outside of a class for efficiency reason (same as minmax.py)
+
+FULL_MASK = (1 << 25) - 1
+
+def cell_bit(i: int, j: int) -> int:
+    return 1 << (i*5 + j)
+
+BORDER_MASK = sum(cell_bit(i, j) for i in range(5) for j in range(5) if BORDER_TILES[i][j])
+
+#all plies in the same order produced by possible_moves: the index in MOVES is the move id used by the bitboard search
+MOVES = []
+#(tile bit, move ids) for each border tile, in the same order of possible_moves
+BORDER_MOVES = []
+for i in range(5):
+    for j in range(5):
+        if BORDER_TILES[i][j]:
+            ids = []
+            for k in range(4):
+                if not ((i == 0 and k==0) or (i==4 and k==1) or (j == 0 and k==2) or (j == 4 and k==3)):
+                    ids.append(len(MOVES))
+                    MOVES.append((i,j,Move(k)))
+            BORDER_MOVES.append((cell_bit(i, j), ids))
+
+MOVE_ID = {ply: m for m, ply in enumerate(MOVES)}
+
+#slide of a ply as (keep, src, left shift, right shift, dst):
+#new_mask = (mask & keep) | ((mask & src) << left >> right), then the taken tile goes in dst
+def slide_masks(i: int, j: int, k: int) -> (int, int, int, int, int):
+    if k == Move.TOP.value: #col j, rows 0..i go down by one row
+        line = sum(cell_bit(r, j) for r in range(0, i+1))
+        src = sum(cell_bit(r, j) for r in range(0, i))
+        return FULL_MASK & ~line, src, 5, 0, cell_bit(0, j)
+    elif k == Move.BOTTOM.value: #col j, rows i..4 go up by one row
+        line = sum(cell_bit(r, j) for r in range(i, 5))
+        src = sum(cell_bit(r, j) for r in range(i+1, 5))
+        return FULL_MASK & ~line, src, 0, 5, cell_bit(4, j)
+    elif k == Move.LEFT.value: #row i, cols 0..j go right by one col
+        line = sum(cell_bit(i, c) for c in range(0, j+1))
+        src = sum(cell_bit(i, c) for c in range(0, j))
+        return FULL_MASK & ~line, src, 1, 0, cell_bit(i, 0)
+    else: #row i, cols j..4 go left by one col
+        line = sum(cell_bit(i, c) for c in range(j, 5))
+        src = sum(cell_bit(i, c) for c in range(j+1, 5))
+        return FULL_MASK & ~line, src, 0, 1, cell_bit(i, 4)
+
+PLY_TABLE = [slide_masks(ply[0], ply[1], ply[2].value) for ply in MOVES]
+
+
+#conversions happen only at the boundary (once per make_move)
+def to_bitboard(board: np.array) -> (int, int):
+    pos = 0
+    neg = 0
+    for i in range(5):
+        for j in range(5):
+            if board[i][j] == 1:
+                pos |= cell_bit(i, j)
+            elif board[i][j] == -1:
+                neg |= cell_bit(i, j)
+    return pos, neg
+
+def from_bitboard(board: (int, int)) -> np.array:
+    new_board = np.zeros((5, 5), dtype=np.int8)
+    for i in range(5):
+        for j in range(5):
+            if board[0] & cell_bit(i, j):
+                new_board[i, j] = 1
+            elif board[1] & cell_bit(i, j):
+                new_board[i, j] = -1
+    return new_board
+
+#game._board (-1 neutral, 0 player 0, 1 player 1) -> bitboard, same mapping of board*2 - 1 in main.py
+def from_game_board(board: np.array) -> (int, int):
+    pos = 0
+    neg = 0
+    for i in range(5):
+        for j in range(5):
+            if board[i][j] == 1:
+                pos |= cell_bit(i, j)
+            elif board[i][j] == 0:
+                neg |= cell_bit(i, j)
+    return pos, neg
+
+
+#move ids of all valid plies (free or own border tiles)
+def possible_moves_bb(board: (int, int), player: int) -> [int]:
+    opponent = board[1] if player == 1 else board[0]
+    valid_moves = []
+    for bit, ids in BORDER_MOVES:
+        if not opponent & bit:
+            valid_moves.extend(ids)
+    return valid_moves
+
+#table-driven ply, move must be already validated (no copy: ints are immutable)
+def make_ply_bb(board: (int, int), m: int, player: int) -> (int, int):
+    keep, src, left, right, dst = PLY_TABLE[m]
+    pos = (board[0] & keep) | ((board[0] & src) << left >> right)
+    neg = (board[1] & keep) | ((board[1] & src) << left >> right)
+    if player == 1:
+        pos |= dst
+    else:
+        neg |= dst
+    return pos, neg
+
+
+def eval_terminal_3_4_bb(board: (int, int), player: int) -> (int, (int, int, int, int)):
+    if player == 1:
+        return eval_terminal_3_4_masks(board[0], board[1])
+    return eval_terminal_3_4_masks(board[1], board[0])
+
+
+#tiles grouped by positional score: sum(board*POS_SCORES) = sum(score * popcount(mask & group))
+def pos_groups(pos_scores: np.array) -> [(int, int)]:
+    return [(s.item(), sum(cell_bit(i, j) for i in range(5) for j in range(5) if pos_scores[i][j] == s)) for s in np.unique(pos_scores)]
+
+POS_GROUPS = pos_groups(POS_SCORES)
+
+def positional_sum(mask: int) -> int:
+    return sum(s * (mask & group).bit_count() for s, group in POS_GROUPS)
+
+def heuristic_score_bb(board: (int, int), player: int, count: (int, int)) -> int: #same score of heuristic_score
+    score = 0
+    score += (count[0]-count[1]) / COUNT_4_DIV
+    score += (count[2]-count[3]) / COUNT_3_DIV
+    score += (positional_sum(board[0]) - positional_sum(board[1])) * player / TOT_SCORES
+    return score
+
+
+#symmetries in the same order of canonical_repr_16simm: id, flipud, rot90, flipud(rot90), ...
+#SIMM_PERM[t][dst] = src tile index
+SIMM_PERM = []
+idx = np.arange(25).reshape(5, 5)
+for _ in range(4):
+    SIMM_PERM += [idx.flatten().tolist(), np.flipud(idx).flatten().tolist()]
+    idx = np.rot90(idx)
+
+#bytes() of an int8 board compares tile by tile with 0 < 1 < -1 (0x00 < 0x01 < 0xFF):
+#2 bits per tile (00 empty, 01 pos, 10 neg), tile (0,0) most significant -> int order == bytes order
+#SIMM_TABLE[t][r][bits] = code of the pos tiles of row r (5 bits) after symmetry t
+SIMM_TABLE = []
+for perm in SIMM_PERM:
+    dst_of = [0] * 25
+    for dst, src in enumerate(perm):
+        dst_of[src] = dst
+    rows = []
+    for r in range(5):
+        table = []
+        for bits in range(32):
+            code = 0
+            for c in range(5):
+                if bits >> c & 1:
+                    code |= 1 << (2 * (24 - dst_of[r*5 + c]))
+            table.append(code)
+        rows.append(table)
+    SIMM_TABLE.append(rows)
+
+def simm_code(mask: int, rows: [[int]]) -> int:
+    return rows[0][mask & 31] | rows[1][mask >> 5 & 31] | rows[2][mask >> 10 & 31] | rows[3][mask >> 15 & 31] | rows[4][mask >> 20]
+
+#same equivalence classes (and same tie breaking) of canonical_repr_16simm, without array copies
+#returns (code, turn, t): t is the symmetry applied to reach the canonical board (used to map moves with MOVE_SIMM)
+def canonical_repr_16simm_bb(board: (int, int), player: int) -> (int, int, int):
+    best = None
+    for t in range(0, 8, 2): #rotation, flipud(rotation) and their negated boards
+        pos_rot = simm_code(board[0], SIMM_TABLE[t])
+        neg_rot = simm_code(board[1], SIMM_TABLE[t])
+        pos_flip = simm_code(board[0], SIMM_TABLE[t+1])
+        neg_flip = simm_code(board[1], SIMM_TABLE[t+1])
+        for code, turn, simm in ((pos_rot | neg_rot << 1, player, t), (pos_flip | neg_flip << 1, player, t+1), (neg_rot | pos_rot << 1, -player, t), (neg_flip | pos_flip << 1, -player, t+1)):
+            if best is None or code < best[0]:
+                best = (code, turn, simm)
+    return best
+
+
+#MOVE_SIMM[t][m] = move id of ply m on the board after symmetry t (negation does not change the geometry of a ply)
+#the taken tile and the border tile where it is inserted are mapped, the direction follows from the mapped border tile
+def simm_move(perm: [int], ply: (int, int, Move)) -> int:
+    dst_of = [0] * 25
+    for dst, src in enumerate(perm):
+        dst_of[src] = dst
+    i, j = divmod(dst_of[ply[0]*5 + ply[1]], 5)
+    target = {Move.TOP: (0, ply[1]), Move.BOTTOM: (4, ply[1]), Move.LEFT: (ply[0], 0), Move.RIGHT: (ply[0], 4)}[ply[2]]
+    ti, tj = divmod(dst_of[target[0]*5 + target[1]], 5)
+    if tj == j and ti != i:
+        k = Move.TOP if ti == 0 else Move.BOTTOM
+    else:
+        k = Move.LEFT if tj == 0 else Move.RIGHT
+    return MOVE_ID[(i, j, k)]
+
+MOVE_SIMM = [[simm_move(perm, ply) for ply in MOVES] for perm in SIMM_PERM]
+#MOVE_SIMM_INV[t][m] maps a move of the board after symmetry t back to the original board
+MOVE_SIMM_INV = []
+for t in range(8):
+    inv = [0] * len(MOVES)
+    for m in range(len(MOVES)):
+        inv[MOVE_SIMM[t][m]] = m
+    MOVE_SIMM_INV.append(inv)
+
+
+#same layout of state_cache: (canonical board, turn, is_max) -> (depth, value, bound), one lookup per probe
+state_cache_bb = {}
+
+def cache_store_bb(board_turn_key: (int, int), depth: int, is_max: bool, val: float, pruned: bool) -> None:
+    bound = EXACT if not pruned else (UPPER if is_max else LOWER)
+    key = (board_turn_key[0], board_turn_key[1], is_max)
+    entry = state_cache_bb.get(key)
+    if entry is None or depth > entry[0] or (depth == entry[0] and (bound == EXACT or entry[2] != EXACT)):
+        if entry is not None and minmax.search_stats is not None:
+            minmax.search_stats.cache_deletes += 1
+        state_cache_bb[key] = (depth, val, bound)
+
+#same search of alfabeta on the bitboard backend (plies are move ids, converted back only for the best one)
+#NOTE: counts in the SearchStats of minmax (set_search_stats), same counters of alfabeta
+def alfabeta_bb(board: (int, int), player: int, depth: int, alfa: int, beta: int, max_turn: int, mul_leaf: int , max_depth: int) -> ((int, int, Move), int, bool):
+
+    search_stats = minmax.search_stats
+    if search_stats is not None:
+        search_stats.nodes += 1
+
+    val, count = eval_terminal_3_4_bb(board, player)
+    if val !=0:
+        if search_stats is not None:
+            search_stats.terminal += 1
+        return None, mul_leaf * val * (1 - (depth % 2) * 2) , False
+
+    if depth == 0:
+        if minmax.endgame is not None:
+            solved = minmax.endgame.probe(board, player)
+            if solved is not None: #value of the retrograde analysis instead of the heuristic, as alfabeta
+                return None, mul_leaf * solved, False
+        hs = heuristic_score_bb(board, player, count)
+        return None, mul_leaf * hs, False
+
+    possible = possible_moves_bb(board, player)
+    if len(possible)==0:
+        return None, 0, False
+
+    is_max = depth%2 == max_turn
+
+    evaluations = []
+    postponed_eval = []
+    for m in possible:
+        new_board = make_ply_bb(board, m, player)
+        board_turn_key = canonical_repr_16simm_bb(new_board, player)
+
+        entry = state_cache_bb.get((board_turn_key[0], board_turn_key[1], is_max))
+        hit = entry is not None and entry[0] >= depth and (entry[2] == EXACT or (entry[1] <= alfa if is_max else entry[1] >= beta))
+        if hit:
+            val = entry[1]
+
+        if search_stats is not None:
+            if hit:
+                search_stats.cache_hits += 1
+            else:
+                search_stats.cache_misses += 1
+
+        if not hit:
+            if depth > 1:
+                postponed_eval.append((m, new_board, board_turn_key))
+            else:
+                _, val, pruned = alfabeta_bb(new_board, -player , depth-1, alfa, beta, max_turn, mul_leaf, max_depth)
+                cache_store_bb(board_turn_key, depth, is_max, val, pruned)
+
+                if is_max:
+                    alfa = max(alfa, val)
+                else:
+                    beta = min(beta, val)
+
+                evaluations.append((m, val))
+
+                if beta <= alfa:
+                    if search_stats is not None:
+                        search_stats.cutoffs[len(evaluations)-1] += 1
+                    break
+        else:
+
+            if is_max:
+                alfa = max(alfa, val)
+            else:
+                beta = min(beta, val)
+
+            evaluations.append((m, val))
+
+            if beta <= alfa:
+                if search_stats is not None:
+                    search_stats.cutoffs[len(evaluations)-1] += 1
+                break
+
+    if beta <= alfa or depth <= 1:
+        if is_max:
+            best = max(evaluations, key=lambda k: k[1])
+        else:
+            best = min(evaluations, key=lambda k: k[1])
+
+        return MOVES[best[0]], best[1], len(evaluations) != len(possible)
+
+
+    for m_board_key in postponed_eval:
+        _, val, pruned = alfabeta_bb(m_board_key[1], -player , depth-1, alfa, beta, max_turn, mul_leaf, max_depth)
+        cache_store_bb(m_board_key[2], depth, is_max, val, pruned)
+
+        if is_max:
+            alfa = max(alfa, val)
+        else:
+            beta = min(beta, val)
+
+        evaluations.append((m_board_key[0], val))
+
+        if beta <= alfa:
+            if search_stats is not None:
+                search_stats.cutoffs[len(evaluations)-1] += 1
+            break
+
+    if is_max:
+        best = max(evaluations, key=lambda k: k[1])
+    else:
+        best = min(evaluations, key=lambda k: k[1])
+
+    return MOVES[best[0]], best[1], len(evaluations) != len(possible)
+
+
+def alfabeta_iter_deep_bb(board: (int, int), player: int, min_depth: int, max_depth: int, tV: [int]) -> ((int, int, Move), int, int):
+
+    search_stats = minmax.search_stats
+    t = 0
+    for d in range(min_depth, max_depth+1):
+
+        if search_stats is not None:
+            nodes, start = search_stats.nodes, time.perf_counter()
+        ply, val, _ = alfabeta_bb(board, player, d, -MAX_INT, MAX_INT, d%2, 1 - (d % 2)*2, max_depth)
+        if search_stats is not None:
+            search_stats.iteration(d, search_stats.nodes - nodes, time.perf_counter() - start)
+        if val >= tV[t]:
+            if search_stats is not None:
+                search_stats.end_search()
+            return ply, val , d
+        t += 1
+
+    assert False, "return val mus be > -MAX_INT"
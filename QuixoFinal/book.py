@@ -0,0 +1,129 @@
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+import tqdm
+from tqdm import tqdm
+
+from game import Move #original enum
+from minmax import MAX_INT
+from bitboard import possible_moves_bb, make_ply_bb, eval_terminal_3_4_bb, simm_code, SIMM_TABLE, MOVES, MOVE_ID, MOVE_SIMM, MOVE_SIMM_INV
+from transposition import TranspositionTable
+from ordering import MoveOrdering
+from search import alfabeta_iter_deep_tt
+
+#opening book: best move of every position of the first plies of a game, searched offline at a fixed depth
+#positions are stored in a canonical frame of the 16 simmetries (8 rotations/flips x colour swap)
+#-> one record per equivalence class, the move is mapped back to the board of the game with MOVE_SIMM_INV
+#file: header + records sorted by key, read with np.memmap (only the pages touched by the binary search are loaded)
+
+BOOK_MAGIC = b"QXBK"
+BOOK_VERSION = 1
+BOOK_HEADER = struct.Struct("<4sIIII") #magic, version, records, plies, depth
+#key = canonical code (2 bits per tile as canonical_repr_16simm_bb, 50 bits) << 1 | (turn == 1), move id in the canonical frame, value for the player to move
+BOOK_DTYPE = np.dtype([("key", "<u8"), ("move", "u1"), ("depth", "u1"), ("value", "<f4")])
+
+PLIES = 4
+DEPTH = 4
+TT_BYTES = 64 * 2**20
+
+#NOTE: the player to move is part of the ordering (canonical_repr_16simm_bb compares only the boards): a position equal to
+#its colour swap, as the empty board, gets the same key whoever moves
+def book_key(board: (int, int), player: int) -> (int, int):
+    '''Key of the equivalence class of (board, player to move) and simmetry t of its canonical frame'''
+    best = None
+    for t in range(8):
+        pos = simm_code(board[0], SIMM_TABLE[t])
+        neg = simm_code(board[1], SIMM_TABLE[t])
+        for key in ((pos | neg << 1) << 1 | (player == 1), (neg | pos << 1) << 1 | (player != 1)):
+            if best is None or key < best[0]:
+                best = (key, t)
+    return best
+
+
+class OpeningBook(object):
+    '''Read-only book opened with np.memmap, lookup is a binary search on the sorted keys'''
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            magic, version, n, self.plies, self.depth = BOOK_HEADER.unpack(f.read(BOOK_HEADER.size))
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            raise ValueError(f"{path} is not an opening book (version {BOOK_VERSION})")
+        self._records = np.memmap(path, dtype=BOOK_DTYPE, mode="r", offset=BOOK_HEADER.size, shape=(n,)) if n > 0 else np.zeros(0, dtype=BOOK_DTYPE)
+        self._keys = self._records["key"]
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def probe(self, board: (int, int), player: int) -> (int, float):
+        '''Move id (on board) and value of the position, None if not in the book'''
+        key, t = book_key(board, player)
+        k = int(np.searchsorted(self._keys, key))
+        if k == len(self._keys) or int(self._keys[k]) != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        record = self._records[k]
+        return MOVE_SIMM_INV[t][int(record["move"])], float(record["value"])
+
+    def lookup(self, board: (int, int), player: int) -> (int, int, Move):
+        '''Ply (i, j, Move) for the position, None if not in the book'''
+        found = self.probe(board, player)
+        if found is None:
+            return None
+        return MOVES[found[0]]
+
+
+#canonical positions (not terminal) reachable in less than plies plies from the empty board, first mover is player -1 (player 0 of Game)
+def opening_positions(plies: int) -> {int: ((int, int), int)}:
+    positions = {}
+    frontier = [((0, 0), -1)]
+    for _ in range(plies):
+        next_frontier = []
+        for board, player in frontier:
+            key, _ = book_key(board, player)
+            if key in positions or eval_terminal_3_4_bb(board, player)[0] != 0:
+                continue
+            positions[key] = (board, player)
+            for m in possible_moves_bb(board, player):
+                next_frontier.append((make_ply_bb(board, m, player), -player))
+        frontier = next_frontier
+    return positions
+
+#searches every opening position (iterative deepening with move ordering up to depth, stops early only on a forced win) and writes the book
+def build_book(path: str, plies: int = PLIES, depth: int = DEPTH, tt_bytes: int = TT_BYTES, progress: bool = True) -> int:
+    positions = opening_positions(plies)
+    tt = TranspositionTable(tt_bytes)
+    tV = [MAX_INT] * (depth - 1) + [-MAX_INT]
+    records = np.zeros(len(positions), dtype=BOOK_DTYPE)
+    items = sorted(positions.items())
+    for k, (key, (board, player)) in enumerate(tqdm(items, desc="book", disable=not progress)):
+        tt.clear() #every position searched from scratch: the book does not depend on the order of the searches
+        ply, val, d = alfabeta_iter_deep_tt(board, player, 1, depth, tV, tt, MoveOrdering())
+        _, t = book_key(board, player)
+        records[k] = (key, MOVE_SIMM[t][MOVE_ID[ply]], d, val)
+
+    #written to a temporary file and renamed: a reader never sees a partial book
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, len(records), plies, depth))
+        f.write(records.tobytes())
+    os.replace(tmp, path)
+    return len(records)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="build the opening book read by MyPlayer(book=...)")
+    parser.add_argument("--out", type=str, default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin"), help="default: next to main.py, read by its batch")
+    parser.add_argument("--plies", type=int, default=PLIES, help="positions after 0..plies-1 plies from the empty board")
+    parser.add_argument("--depth", type=int, default=DEPTH, help="search depth of every position")
+    parser.add_argument("--tt-mb", type=int, default=TT_BYTES // 2**20, help="transposition table used while building (MB)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    n = build_book(args.out, args.plies, args.depth, args.tt_mb * 2**20)
+    print(f"{args.out}: {n} positions, {os.path.getsize(args.out)} bytes, {time.perf_counter() - start:.1f} s")
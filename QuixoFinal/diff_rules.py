@@ -0,0 +1,86 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from game import Game, Move
+from game_reference import ReferenceGame
+
+#differential test of the rules of Game (slide permutations, vectorized check_winner) against the original implementation
+#(ReferenceGame): the same random moves, legal or not, are applied to both and every result is compared
+#from_pos is drawn mostly on the board, sometimes out of it: negative coordinates are accepted by the original __take as
+#numpy indices, coordinates >= 5 raise IndexError -> the exception is part of the result that must match
+
+N_MOVES = 1_000_000
+SEED = 0
+
+def random_move(rng: random.Random) -> (tuple[int, int], Move):
+    if rng.random() < 0.05:
+        from_pos = (rng.randint(-5, 5), rng.randint(-5, 5))
+    else:
+        from_pos = (rng.randint(0, 4), rng.randint(0, 4))
+    return from_pos, rng.choice(list(Move))
+
+#result of __move: accepted flag or the type of the exception raised
+def apply(move: callable, from_pos: tuple[int, int], slide: Move, player: int) -> object:
+    try:
+        return move(from_pos, slide, player)
+    except IndexError as e:
+        return type(e)
+
+def run(n_moves: int, seed: int) -> (int, int, int):
+    '''Returns (moves, accepted moves, games), raises AssertionError on the first difference'''
+    rng = random.Random(seed)
+    games = 0
+    accepted = 0
+    game, reference = Game(), ReferenceGame()
+    player = 0
+    for move in range(n_moves):
+        from_pos, slide = random_move(rng)
+        ok = apply(game._Game__move, from_pos, slide, player)
+        ok_reference = apply(reference._ReferenceGame__move, from_pos, slide, player)
+        assert ok == ok_reference, f"move {move}: {from_pos} {slide} accepted {ok} != {ok_reference}\n{reference._board}"
+        assert np.array_equal(game._board, reference._board), f"move {move}: {from_pos} {slide}\n{game._board}\n!=\n{reference._board}"
+        if ok is not True:
+            continue
+        accepted += 1
+        winner = game.check_winner()
+        assert winner == reference.check_winner(), f"move {move}: winner {winner} != {reference.check_winner()}\n{reference._board}"
+        player = 1 - player
+        if winner >= 0:
+            games += 1
+            game, reference = Game(), ReferenceGame()
+            player = 0
+    return n_moves, accepted, games
+
+#time of the rules only (same random moves for both)
+def bench(cls: type, n_moves: int, seed: int) -> float:
+    rng = random.Random(seed)
+    moves = [random_move(rng) for _ in range(n_moves)]
+    move = getattr(cls, f"_{cls.__name__}__move")
+    game = cls()
+    player = 0
+    start = time.perf_counter()
+    for from_pos, slide in moves:
+        if apply(lambda *args: move(game, *args), from_pos, slide, player) is True:
+            player = 1 - player
+            if game.check_winner() >= 0:
+                game = cls()
+                player = 0
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="differential test of the rules of Game against the original implementation")
+    parser.add_argument("--moves", type=int, default=N_MOVES)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    moves, accepted, games = run(args.moves, args.seed)
+    print(f"{moves} random moves ({accepted} accepted, {games} games): same results")
+
+    n_bench = min(args.moves, 100_000)
+    t_reference = bench(ReferenceGame, n_bench, args.seed)
+    t_game = bench(Game, n_bench, args.seed)
+    print(f"rules time for {n_bench} moves: original {t_reference:.2f} s, Game {t_game:.2f} s, speedup {t_reference / t_game:.2f}x")
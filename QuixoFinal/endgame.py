@@ -0,0 +1,310 @@
+import argparse
+import json
+import os
+import time
+from math import comb
+
+import numpy as np
+
+from minmax import MAX_INT, BIT_WEIGHTS
+import minmax
+import search
+
+#retrograde analysis of Quixo positions with many non-neutral tiles (as in "Quixo is Solved", on a restricted set of positions)
+#a position is (mine, theirs) with "me" to move, value DRAW/WIN/LOSS for the player to move (same rules of eval_terminal_3_4:
+#a line of the player to move wins even if the opponent has one too)
+#
+#partitions: positions with a tiles of the player to move and b of the opponent -> a ply leads to (b, a) (own tile taken)
+#or (b, a+1) (neutral tile taken): pieces never leave the board, so partitions are solved from the full board down to
+#min_pieces tiles, the pair (a, b)/(b, a) together (value iteration until nothing changes: what is left is a draw) using only
+#the tables of the partitions with one more tile (read from disk) -> RAM is bounded by the biggest pair of partitions
+#max_minority restricts the tables to positions where the side with less tiles has few of them (+1 allowed for every
+#tile more than min_pieces, so the set of partitions is closed under the plies)
+#
+#index in a partition: rank of mine among the C(N, a) subsets of the N cells * C(N-a, b) + rank of theirs among the subsets
+#of the N-a free cells (combinatorial number system) -> the table is an array of 2-bit values, 4 positions per byte
+
+DRAW = 0
+WIN = 1
+LOSS = 2
+
+MIN_PIECES = 24
+MAX_MINORITY = 5
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "endgame") #next to main.py, read by its batch
+
+BINOM = np.array([[comb(p, j) for j in range(26)] for p in range(26)], dtype=np.int64)
+
+def line_masks(n: int) -> [int]:
+    return [sum(1 << (i*n + j) for j in range(n)) for i in range(n)] \
+         + [sum(1 << (i*n + j) for i in range(n)) for j in range(n)] \
+         + [sum(1 << (i*n + i) for i in range(n)), sum(1 << (i*n + n-1 - i) for i in range(n))]
+
+#plies of an n x n board in the order of possible_moves: (taken bit, keep, src, shift, dst)
+#the tiles of src are shifted by shift bits (<0: right shift), the taken tile is inserted at dst
+def ply_table(n: int) -> [(int, int, int, int, int)]:
+    plies = []
+    for i in range(n):
+        for j in range(n):
+            if 0 < i < n-1 and 0 < j < n-1:
+                continue
+            for k in range(4): #TOP, BOTTOM, LEFT, RIGHT
+                if (i == 0 and k == 0) or (i == n-1 and k == 1) or (j == 0 and k == 2) or (j == n-1 and k == 3):
+                    continue
+                if k == 0:
+                    src, shift, dst = [(r, j) for r in range(i)], n, (0, j)
+                elif k == 1:
+                    src, shift, dst = [(r, j) for r in range(i+1, n)], -n, (n-1, j)
+                elif k == 2:
+                    src, shift, dst = [(i, c) for c in range(j)], 1, (i, 0)
+                else:
+                    src, shift, dst = [(i, c) for c in range(j+1, n)], -1, (i, n-1)
+                src_mask = sum(1 << (r*n + c) for r, c in src)
+                keep = ((1 << n*n) - 1) & ~src_mask & ~(1 << (i*n + j))
+                plies.append((1 << (i*n + j), keep, src_mask, shift, 1 << (dst[0]*n + dst[1])))
+    return plies
+
+def apply_ply(mine: np.array, theirs: np.array, ply: (int, int, int, int, int)) -> (np.array, np.array):
+    _, keep, src, shift, dst = ply
+    if shift > 0:
+        return (mine & keep) | ((mine & src) << shift) | dst, (theirs & keep) | ((theirs & src) << shift)
+    return (mine & keep) | ((mine & src) >> -shift) | dst, (theirs & keep) | ((theirs & src) >> -shift)
+
+def terminal(mine: np.array, theirs: np.array, lines: [int]) -> np.array:
+    '''WIN if the player to move has a line, LOSS if only the opponent has one, DRAW otherwise (not terminal)'''
+    values = np.zeros(len(mine), dtype=np.uint8)
+    for line in lines:
+        values[(values == DRAW) & ((theirs & line) == line)] = LOSS
+    for line in lines:
+        values[(mine & line) == line] = WIN
+    return values
+
+#combinatorial number system on numpy arrays of masks (bit p set -> cell p in the subset)
+def rank_masks(masks: np.array, n_cells: int) -> np.array:
+    rank = np.zeros(len(masks), dtype=np.int64)
+    j = np.zeros(len(masks), dtype=np.int64)
+    for p in range(n_cells):
+        bit = (masks >> p) & 1
+        j += bit
+        rank += bit * BINOM[p, j]
+    return rank
+
+def unrank_masks(ranks: np.array, k: int, n_cells: int) -> np.array:
+    ranks = ranks.copy()
+    masks = np.zeros(len(ranks), dtype=np.int64)
+    j = np.full(len(ranks), k, dtype=np.int64)
+    for p in range(n_cells-1, -1, -1):
+        c = BINOM[p, j]
+        take = ((j > 0) & (ranks >= c)).astype(np.int64)
+        masks |= take << p
+        ranks -= take * c
+        j -= take
+    return masks
+
+#bits of theirs on the cells not in mine -> consecutive bits (and back)
+def compress(theirs: np.array, mine: np.array, n_cells: int) -> np.array:
+    out = np.zeros(len(mine), dtype=np.int64)
+    q = np.zeros(len(mine), dtype=np.int64)
+    for p in range(n_cells):
+        free = 1 - ((mine >> p) & 1)
+        out |= (((theirs >> p) & 1) & free) << q
+        q += free
+    return out
+
+def expand(x: np.array, mine: np.array, n_cells: int) -> np.array:
+    out = np.zeros(len(mine), dtype=np.int64)
+    q = np.zeros(len(mine), dtype=np.int64)
+    for p in range(n_cells):
+        free = 1 - ((mine >> p) & 1)
+        out |= ((x >> q) & 1 & free) << p
+        q += free
+    return out
+
+def partition_size(n_cells: int, a: int, b: int) -> int:
+    return comb(n_cells, a) * comb(n_cells - a, b)
+
+def partition_index(mine: np.array, theirs: np.array, n_cells: int, a: int, b: int) -> np.array:
+    return rank_masks(mine, n_cells) * comb(n_cells - a, b) + rank_masks(compress(theirs, mine, n_cells), n_cells - a)
+
+def partition_positions(n_cells: int, a: int, b: int) -> (np.array, np.array):
+    '''(mine, theirs) of every position of the partition, in index order'''
+    index = np.arange(partition_size(n_cells, a, b), dtype=np.int64)
+    mine = unrank_masks(index // comb(n_cells - a, b), a, n_cells)
+    return mine, expand(unrank_masks(index % comb(n_cells - a, b), b, n_cells - a), mine, n_cells)
+
+#scalar version of partition_index (probe of a single position)
+def position_index(mine: int, theirs: int, n_cells: int, a: int, b: int) -> int:
+    rank_m = 0
+    rank_t = 0
+    j_m = 0
+    j_t = 0
+    q = 0
+    for p in range(n_cells):
+        if mine >> p & 1:
+            j_m += 1
+            rank_m += comb(p, j_m)
+        else:
+            if theirs >> p & 1:
+                j_t += 1
+                rank_t += comb(q, j_t)
+            q += 1
+    return rank_m * comb(n_cells - a, b) + rank_t
+
+#2 bits per position, 4 positions per byte
+def pack_values(values: np.array) -> np.array:
+    padded = np.zeros((len(values) + 3) // 4 * 4, dtype=np.uint8)
+    padded[:len(values)] = values
+    quads = padded.reshape(-1, 4)
+    return quads[:, 0] | quads[:, 1] << 2 | quads[:, 2] << 4 | quads[:, 3] << 6
+
+def unpack_values(packed: np.array, index: np.array) -> np.array:
+    return (packed[index >> 2] >> ((index & 3) * 2).astype(np.uint8)) & 3
+
+
+def in_tables(a: int, b: int, n_cells: int, min_pieces: int, max_minority: int) -> bool:
+    return min_pieces <= a + b <= n_cells and (max_minority is None or min(a, b) <= max_minority + a + b - min_pieces)
+
+def partition_file(table_dir: str, n: int, a: int, b: int) -> str:
+    return os.path.join(table_dir, f"{n}x{n}_{a}_{b}.bits")
+
+def load_partition(table_dir: str, n: int, a: int, b: int) -> np.array:
+    return np.memmap(partition_file(table_dir, n, a, b), dtype=np.uint8, mode="r")
+
+#solves the partitions (a, b) and (b, a) (the same one if a == b), the partitions with one more tile must be on disk
+def solve_pair(table_dir: str, n: int, a: int, b: int) -> {(int, int): np.array}:
+    n_cells = n*n
+    lines = line_masks(n)
+    plies = ply_table(n)
+    parts = [(a, b)] if a == b else [(a, b), (b, a)]
+
+    positions = {}
+    values = {}
+    upper_all_win = {} #every ply that takes a neutral tile leads to a position won by the opponent
+    has_move = {}
+    for x, y in parts:
+        mine, theirs = partition_positions(n_cells, x, y)
+        positions[(x, y)] = (mine, theirs)
+        values[(x, y)] = terminal(mine, theirs, lines)
+        has_move[(x, y)] = np.zeros(len(mine), dtype=bool)
+        upper_all_win[(x, y)] = np.ones(len(mine), dtype=bool)
+        upper = load_partition(table_dir, n, y, x+1) if x + y < n_cells else None
+        for ply in plies:
+            legal = (theirs & ply[0]) == 0
+            has_move[(x, y)] |= legal
+            neutral = legal & ((mine & ply[0]) == 0)
+            if upper is None or not neutral.any():
+                continue
+            new_mine, new_theirs = apply_ply(mine[neutral], theirs[neutral], ply)
+            child = unpack_values(upper, partition_index(new_theirs, new_mine, n_cells, y, x+1))
+            won = np.zeros(len(mine), dtype=bool)
+            won[neutral] = child == LOSS
+            values[(x, y)][won & (values[(x, y)] == DRAW)] = WIN
+            lost = np.ones(len(mine), dtype=bool)
+            lost[neutral] = child == WIN
+            upper_all_win[(x, y)] &= lost
+
+    #value iteration on the plies that take an own tile (they stay in the pair)
+    changed = True
+    while changed:
+        changed = False
+        for x, y in parts:
+            idx = np.nonzero(values[(x, y)] == DRAW)[0]
+            if len(idx) == 0:
+                continue
+            mine, theirs = positions[(x, y)][0][idx], positions[(x, y)][1][idx]
+            any_loss = np.zeros(len(idx), dtype=bool)
+            all_win = upper_all_win[(x, y)][idx] & has_move[(x, y)][idx]
+            for ply in plies:
+                own = (mine & ply[0]) != 0
+                if not own.any():
+                    continue
+                new_mine, new_theirs = apply_ply(mine[own], theirs[own], ply)
+                child = values[(y, x)][partition_index(new_theirs, new_mine, n_cells, y, x)]
+                any_loss[own] |= child == LOSS
+                all_win[own] &= child == WIN
+            decided = np.where(any_loss, WIN, np.where(all_win, LOSS, DRAW)).astype(np.uint8)
+            if (decided != DRAW).any():
+                values[(x, y)][idx] = decided
+                changed = True
+
+    return values
+
+def build_tables(table_dir: str, n: int = 5, min_pieces: int = MIN_PIECES, max_minority: int = MAX_MINORITY, progress: bool = True) -> {(int, int): (int, int, int)}:
+    '''Writes the tables of every partition and the manifest, returns (wins, losses, draws) of every partition'''
+    os.makedirs(table_dir, exist_ok=True)
+    n_cells = n*n
+    counts = {}
+    for total in range(n_cells, min_pieces-1, -1):
+        for a in range(total // 2, -1, -1):
+            b = total - a
+            if not in_tables(a, b, n_cells, min_pieces, max_minority):
+                continue
+            start = time.perf_counter()
+            values = solve_pair(table_dir, n, a, b)
+            for (x, y), v in values.items():
+                pack_values(v).tofile(partition_file(table_dir, n, x, y))
+                counts[(x, y)] = (int((v == WIN).sum()), int((v == LOSS).sum()), int((v == DRAW).sum()))
+                if progress:
+                    print(f"{n}x{n} ({x}, {y}): {len(v)} positions, win/loss/draw {counts[(x, y)]}, {time.perf_counter() - start:.1f} s")
+    with open(os.path.join(table_dir, "manifest.json"), "w") as f:
+        json.dump({"n": n, "min_pieces": min_pieces, "max_minority": max_minority, "partitions": sorted(counts)}, f)
+    return counts
+
+
+class EndgameTable(object):
+    '''Tables of a 5x5 build (build_tables) probed by the searches at the leaves, partitions are memory-mapped when first used'''
+
+    def __init__(self, table_dir: str = TABLE_DIR) -> None:
+        with open(os.path.join(table_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest["n"] != 5:
+            raise ValueError(f"{table_dir}: only 5x5 tables can be probed by the search")
+        self.table_dir = table_dir #loaded again from here by the workers of ParallelSearch
+        self.min_pieces = manifest["min_pieces"]
+        self.max_minority = manifest["max_minority"]
+        self._partitions = {tuple(p): None for p in manifest["partitions"]}
+        self.hits = 0
+
+    def probe_masks(self, mine: int, theirs: int) -> int:
+        '''MAX_INT/-MAX_INT/0 for a won/lost/drawn position of the player to move, None if not in the tables'''
+        a = mine.bit_count()
+        b = theirs.bit_count()
+        if a + b < self.min_pieces or (a, b) not in self._partitions:
+            return None
+        if self._partitions[(a, b)] is None:
+            self._partitions[(a, b)] = load_partition(self.table_dir, 5, a, b)
+        index = position_index(mine, theirs, 25, a, b)
+        value = self._partitions[(a, b)][index >> 2] >> ((index & 3) * 2) & 3
+        self.hits += 1
+        return MAX_INT if value == WIN else -MAX_INT if value == LOSS else 0
+
+    def probe(self, board: (int, int), player: int) -> int:
+        '''Same as probe_masks for a bitboard'''
+        if player == 1:
+            return self.probe_masks(board[0], board[1])
+        return self.probe_masks(board[1], board[0])
+
+    def probe_board(self, board: np.array, player: int) -> int:
+        '''Same as probe_masks for a numpy board of 1/-1/0'''
+        if np.count_nonzero(board) < self.min_pieces:
+            return None
+        flat = board.reshape(25)
+        return self.probe_masks(int(BIT_WEIGHTS @ (flat == player)), int(BIT_WEIGHTS @ (flat == -player)))
+
+def set_endgame(table: EndgameTable) -> None:
+    '''Tables probed at the leaves of every search: alfabeta (copy or make/unmake), alfabeta_bb, negamax and the workers of ParallelSearch (None: no probe)'''
+    minmax.endgame = table
+    search.endgame = table
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="retrograde analysis of the positions with at least min_pieces non-neutral tiles")
+    parser.add_argument("--out", type=str, default=TABLE_DIR)
+    parser.add_argument("--n", type=int, default=5, help="side of the board (tables of smaller boards are not used by the search)")
+    parser.add_argument("--min-pieces", type=int, default=MIN_PIECES)
+    parser.add_argument("--max-minority", type=int, default=MAX_MINORITY, help="tiles of the side with less tiles at min_pieces (<0: no limit)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = build_tables(args.out, args.n, args.min_pieces, None if args.max_minority < 0 else args.max_minority)
+    total = [sum(c[k] for c in counts.values()) for k in range(3)]
+    print(f"{sum(total)} positions in {len(counts)} partitions: {total[0]} win, {total[1]} loss, {total[2]} draw, {time.perf_counter() - start:.1f} s")
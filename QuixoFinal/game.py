@@ -1,10 +1,15 @@
 from abc import ABC, abstractmethod
-from copy import deepcopy
 from enum import Enum
 import numpy as np
 
 # Rules on PDF
 
+# encodings of the board used by the search, computed from _board without copies:
+# minmax board: 1 for pieces of player 1, -1 for pieces of player 0, 0 for neutral pieces
+# bitboard: (pos, neg) masks of 25 bits (bit 5*row + col) with the pieces of player 1 and player 0
+MINMAX_TILE = np.array([-1, 1, 0], dtype=np.int8)  # indexed by the tiles of _board (-1 -> last element)
+BIT_WEIGHTS = (1 << np.arange(25)).astype(np.int64)
+
 
 class Move(Enum):
     '''
@@ -16,6 +21,42 @@ class Move(Enum):
     RIGHT = 3
 
 
+# cells (flat index) of the lines checked by check_winner, in the same order: rows, columns, principal and secondary diagonal
+WIN_LINES = np.array([[x*5 + y for y in range(5)] for x in range(5)]
+                     + [[x*5 + y for x in range(5)] for y in range(5)]
+                     + [[x*5 + x for x in range(5)], [x*5 + 4 - x for x in range(5)]])
+
+
+def slide_permutation(from_pos: tuple[int, int], slide: Move) -> np.ndarray:
+    '''Flat index of the tile that ends in each cell after the slide of the piece in from_pos (row, col)'''
+    idx = np.arange(25).reshape(5, 5)
+    row, col = from_pos
+    piece = idx[from_pos]
+    if slide == Move.LEFT:
+        idx[row, 1:col + 1] = idx[row, 0:col].copy()
+        idx[row, 0] = piece
+    elif slide == Move.RIGHT:
+        idx[row, col:4] = idx[row, col + 1:5].copy()
+        idx[row, 4] = piece
+    elif slide == Move.TOP:
+        idx[1:row + 1, col] = idx[0:row, col].copy()
+        idx[0, col] = piece
+    else:
+        idx[row:4, col] = idx[row + 1:5, col].copy()
+        idx[4, col] = piece
+    return idx.reshape(25)
+
+
+# acceptable slides of the pieces on the border: a piece cannot be pushed back to the side it was taken from
+SLIDE_PERM = {
+    (row, col, slide): slide_permutation((row, col), slide)
+    for row in range(5) for col in range(5) if row in (0, 4) or col in (0, 4)
+    for slide in Move
+    if not ((row == 0 and slide == Move.TOP) or (row == 4 and slide == Move.BOTTOM)
+            or (col == 0 and slide == Move.LEFT) or (col == 4 and slide == Move.RIGHT))
+}
+
+
 class Player(ABC):
     def __init__(self) -> None:
         '''You can change this for your player if you need to handle state/have memory'''
@@ -42,13 +83,40 @@ class Game(object):
         '''
         Returns the board
         '''
-        return deepcopy(self._board)
+        return self._board.copy()
 
     def get_current_player(self) -> int:
         '''
         Returns the current player
         '''
-        return deepcopy(self.current_player_idx)
+        return self.current_player_idx
+
+    def get_board_view(self) -> np.ndarray:
+        '''
+        Returns a read-only view of the board (no copy)
+        '''
+        view = self._board.view()
+        view.flags.writeable = False
+        return view
+
+    def get_minmax_board(self) -> np.ndarray:
+        '''
+        Returns the board encoded for minmax (1/-1 pieces of player 1/0, 0 neutral pieces)
+        '''
+        return MINMAX_TILE[self._board]
+
+    def get_bitboard(self) -> tuple[int, int]:
+        '''
+        Returns the board as (pos, neg) masks of 25 bits: pieces of player 1 and of player 0
+        '''
+        flat = self._board.reshape(25)
+        return int(BIT_WEIGHTS @ (flat == 1)), int(BIT_WEIGHTS @ (flat == 0))
+
+    def get_minmax_player(self) -> int:
+        '''
+        Returns the current player encoded for minmax (1 or -1)
+        '''
+        return self.current_player_idx * 2 - 1
 
     def print(self):
         '''Prints the board. -1 are neutral pieces, 0 are pieces of player 0, 1 pieces of player 1'''
@@ -56,32 +124,11 @@ class Game(object):
 
     def check_winner(self) -> int:
         '''Check the winner. Returns the player ID of the winner if any, otherwise returns -1'''
-        # for each row
-        for x in range(self._board.shape[0]):
-            # if a player has completed an entire row
-            if self._board[x, 0] != -1 and all(self._board[x, :] == self._board[x, 0]):
-                # return the relative id
-                return self._board[x, 0]
-        # for each column
-        for y in range(self._board.shape[1]):
-            # if a player has completed an entire column
-            if self._board[0, y] != -1 and all(self._board[:, y] == self._board[0, y]):
-                # return the relative id
-                return self._board[0, y]
-        # if a player has completed the principal diagonal
-        if self._board[0, 0] != -1 and all(
-            [self._board[x, x]
-                for x in range(self._board.shape[0])] == self._board[0, 0]
-        ):
-            # return the relative id
-            return self._board[0, 0]
-        # if a player has completed the secondary diagonal
-        if self._board[0, -1] != -1 and all(
-            [self._board[x, -(x + 1)]
-             for x in range(self._board.shape[0])] == self._board[0, -1]
-        ):
-            # return the relative id
-            return self._board[0, -1]
+        # all the lines at once: the first complete one in the order of WIN_LINES gives the winner
+        lines = self._board.reshape(25)[WIN_LINES]
+        complete = (lines[:, 0] != -1) & (lines == lines[:, :1]).all(axis=1)
+        if complete.any():
+            return lines[complete.argmax(), 0]
         return -1
 
     def play(self, player1: Player, player2: Player) -> int:
@@ -104,12 +151,12 @@ class Game(object):
         if player_id > 2:
             return False
         # Oh God, Numpy arrays
-        prev_value = deepcopy(self._board[(from_pos[1], from_pos[0])])
+        prev_value = self._board[(from_pos[1], from_pos[0])]
         acceptable = self.__take((from_pos[1], from_pos[0]), player_id)
         if acceptable:
             acceptable = self.__slide((from_pos[1], from_pos[0]), slide)
             if not acceptable:
-                self._board[(from_pos[1], from_pos[0])] = deepcopy(prev_value)
+                self._board[(from_pos[1], from_pos[0])] = prev_value
         return acceptable
 
     def __take(self, from_pos: tuple[int, int], player_id: int) -> bool:
@@ -132,6 +179,14 @@ class Game(object):
 
     def __slide(self, from_pos: tuple[int, int], slide: Move) -> bool:
         '''Slide the other pieces'''
+        # piece on the board: the whole slide is one permutation of the tiles (SLIDE_PERM has only the acceptable slides)
+        if 0 <= from_pos[0] < 5 and 0 <= from_pos[1] < 5:
+            perm = SLIDE_PERM.get((from_pos[0], from_pos[1], slide))
+            if perm is None:
+                return False
+            self._board[:] = self._board.reshape(25)[perm].reshape(5, 5)
+            return True
+        # negative coordinates (accepted by __take as numpy indices): element by element shifts below
         # define the corners
         SIDES = [(0, 0), (0, 4), (4, 0), (4, 4)]
         # if the piece position is not in a corner
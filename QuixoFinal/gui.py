@@ -1,37 +1,17 @@
 from game import Game, Move, Player
 import numpy as np
 
-from copy import deepcopy
-
 import tkinter as tk
 from tkinter import messagebox
 
 from minmax import *
+from transposition import TranspositionTable
+from players import MyPlayer
 
 import time
 
-#same of calss MyPlayer in main
-class MyPlayer(Player):
-    def __init__(self, min_depth: int, max_depth: int, tV: [int]) -> None: # min_depth = 1, max_depth = 3 , state_cache = {}, max_int = 10_000, are already included in minmax.py
-        super().__init__()
-        self.policy = "minmax with alphabeta,iterative deepening,transposition tables"
-        self.win = 0
-        self._min_depth = min_depth
-        self._max_depth = max_depth
-        self._tV = tV
-
-    def make_move(self, game: 'Game') -> tuple[tuple[int, int], Move]:
-
-
-        #mapping board to minmax representation
-        board = deepcopy(game._board)
-        board = board*2 - 1
-        board = np.where(board < -1, 0, board)
-
-        ply, _, _ = alfabeta_iter_deep(board, game.get_current_player() * 2 - 1 , self._min_depth, self._max_depth, self._tV)
-
-
-        return (ply[1], ply[0]), ply[2] #inverted row col
+GUI_MOVE_TIME = 2 #seconds per move of the agent (predictable latency)
+GUI_TT_BYTES = 64 * 2**20
 
 class GUI(object):
 
@@ -67,12 +47,13 @@ class GUI(object):
         
         #instantiate game
         g = GameForHuman(debug = True, gui = self) 
+        tt = TranspositionTable(GUI_TT_BYTES)
         #define player on basis of user input
         if human_turn == 'X':
             player1 = Human()
-            player2 = MyPlayer(1,3,[MAX_INT,0.3,-MAX_INT])
+            player2 = MyPlayer(1,3,[MAX_INT,0.3,-MAX_INT], tt=tt, move_time=GUI_MOVE_TIME)
         else:
-            player1 = MyPlayer(1,3,[MAX_INT,0.3,-MAX_INT])
+            player1 = MyPlayer(1,3,[MAX_INT,0.3,-MAX_INT], tt=tt, move_time=GUI_MOVE_TIME)
             player2 = Human()
         #start playing
         g.play_human(player1, player2) # player selected, game can start 
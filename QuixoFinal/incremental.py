@@ -0,0 +1,111 @@
+import numpy as np
+
+import minmax
+from game import Move #original enum
+from minmax import MAX_INT, ALL_PLIES, PLY_GATHER, LINE_CELLS, alfabeta_iter_deep
+
+#incremental evaluation for the numpy backend: the board is kept together with the positional sum (sum(board*POS_SCORES))
+#and the pieces of each player on each of the 12 lines, updated by delta when a ply is made and unmade
+#-> eval_terminal_3_4 and heuristic_score of the current board without scanning it (same values, same floats)
+#a slide changes only the cells of one segment of a row or column: each of them updates the sum and its 2-4 lines
+
+#(changed cells, source of each of them) of every ply: new[cell] = old[source], source 25 is the piece of the player
+SLIDE_CELLS = {}
+for ply, gather in zip(ALL_PLIES, PLY_GATHER.tolist()):
+    changed = [c for c in range(25) if gather[c] != c]
+    SLIDE_CELLS[ply] = (changed, [gather[c] for c in changed])
+
+#lines (index in LINE_CELLS) of every cell
+CELL_LINES = [[l for l in range(len(LINE_CELLS)) if c in LINE_CELLS[l]] for c in range(25)]
+
+
+class EvalState(object):
+    '''Board (1/-1/0, changed in place) with positional sum and pieces per line, make returns the saved cells that unmake restores'''
+
+    def __init__(self, board: np.array) -> None:
+        self.board = board.copy()
+        self._flat = self.board.reshape(25) #view: writes go to self.board
+        self._cells = self._flat.tolist()
+        self._pos = minmax.POS_FLAT.tolist() #positional scores when the state is built (params.py changes them between searches)
+        self.pos_sum = sum(v * s for v, s in zip(self._cells, self._pos))
+        self._lines = {1: [0] * len(LINE_CELLS), -1: [0] * len(LINE_CELLS)}
+        #lines with at least 3, at least 4, 5 pieces of each player
+        self._n3 = {1: 0, -1: 0}
+        self._n4 = {1: 0, -1: 0}
+        self._n5 = {1: 0, -1: 0}
+        for c, v in enumerate(self._cells):
+            if v != 0:
+                for l in CELL_LINES[c]:
+                    self._add(v, l)
+
+    def _add(self, v: int, l: int) -> None:
+        lines = self._lines[v]
+        lines[l] += 1
+        k = lines[l]
+        if k == 3:
+            self._n3[v] += 1
+        elif k == 4:
+            self._n4[v] += 1
+        elif k == 5:
+            self._n5[v] += 1
+
+    #_add inlined (and its reverse): this is the inner loop of make/unmake
+    def _set(self, changed: [int], before: [int], after: [int]) -> None:
+        cells = self._cells
+        pos = self._pos
+        for c, old, new in zip(changed, before, after):
+            if old != new:
+                cells[c] = new
+                self.pos_sum += (new - old) * pos[c]
+                if old != 0:
+                    lines = self._lines[old]
+                    for l in CELL_LINES[c]:
+                        k = lines[l]
+                        lines[l] = k - 1
+                        if k >= 3:
+                            (self._n3 if k == 3 else self._n4 if k == 4 else self._n5)[old] -= 1
+                if new != 0:
+                    lines = self._lines[new]
+                    for l in CELL_LINES[c]:
+                        k = lines[l] + 1
+                        lines[l] = k
+                        if k >= 3:
+                            (self._n3 if k == 3 else self._n4 if k == 4 else self._n5)[new] += 1
+        self._flat[changed] = after
+
+    def make(self, ply: (int, int, Move), player: int) -> [int]:
+        '''Applies ply (already validated) in place, returns the undo record: previous values of the changed cells'''
+        changed, sources = SLIDE_CELLS[ply]
+        cells = self._cells
+        before = [cells[c] for c in changed]
+        self._set(changed, before, [cells[s] if s < 25 else player for s in sources])
+        return before
+
+    def unmake(self, ply: (int, int, Move), before: [int]) -> None:
+        changed, _ = SLIDE_CELLS[ply]
+        cells = self._cells
+        self._set(changed, [cells[c] for c in changed], before)
+
+    def eval_terminal_3_4(self, player: int) -> (int, (int, int, int, int)):
+        '''Same result of eval_terminal_3_4(board, player)'''
+        if self._n5[player]:
+            return (MAX_INT, None)
+        if self._n5[-player]:
+            return (-MAX_INT, None)
+        return (0, (self._n4[player], self._n4[-player], self._n3[player], self._n3[-player]))
+
+    def heuristic_score(self, player: int, count: (int, int, int, int)) -> float:
+        '''Same score (same operations) of heuristic_score(board, player, count)'''
+        score = 0
+        score += (count[0]-count[1]) / minmax.COUNT_4_DIV
+        score += (count[2]-count[3]) / minmax.COUNT_3_DIV
+        score += self.pos_sum * player / minmax.TOT_SCORES
+        return score
+
+
+#search of alfabeta (same cache reads/writes, same result) with make/unmake on one EvalState instead of a copy of the
+#board per child (state argument of alfabeta) -> boards alive during the search: one, plus an undo record of at most
+#5 cells per level; the nodes at depth 1 still build their children in one stack when minmax.BATCH_LEAVES (alfabeta_leaves)
+def alfabeta_iter_deep_inplace(board: np.array, player: int, min_depth: int, max_depth: int, tV: [int]) -> ((int, int, Move), int, int):
+    state = EvalState(board)
+    return alfabeta_iter_deep(state.board, player, min_depth, max_depth, tV, state)
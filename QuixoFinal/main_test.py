@@ -1,6 +1,9 @@
 import random
 from game import Game, Move, Player
 from minmax import *
+from transposition import TranspositionTable
+from search import alfabeta_iter_deep_tt
+from stats import SearchStats, set_search_stats
 
 
 import tqdm
@@ -11,28 +14,26 @@ import sys
 DEBUG = True
 
 class TestMyPlayer(Player):
-    def __init__(self, min_depth: int, max_depth: int, tV: [int]) -> None: # min_depth = 1, max_depth = 3 , state_cache = {}, max_int = 10_000, are already included in minmax.py
+    def __init__(self, min_depth: int, max_depth: int, tV: [int], tt: TranspositionTable = None) -> None: # min_depth = 1, max_depth = 3 , state_cache = {}, max_int = 10_000, are already included in minmax.py
         super().__init__()
         self.policy = "minmax with alphabeta,iterative deepening,transposition tables"
         self.win = 0
         self._min_depth = min_depth
         self._max_depth = max_depth
         self._tV = tV
+        self._tt = tt #bounded transposition table (bitboard backend), can be shared between players
 
     def make_move(self, game: 'Game') -> tuple[tuple[int, int], Move]:
         
         if DEBUG:
             print(game._board)
 
-        #mapping board to minmax representation
-        board = deepcopy(game._board)
-        board = board*2 - 1
-        board = np.where(board < -1, 0, board)
-
         if random.random() < 0.3:
-            ply = random.choice(possible_moves(board, game.get_current_player() * 2 - 1))
+            ply = random.choice(possible_moves(game.get_minmax_board(), game.get_minmax_player()))
+        elif self._tt is not None:
+            ply, _, _ = alfabeta_iter_deep_tt(game.get_bitboard(), game.get_minmax_player(), self._min_depth, self._max_depth, self._tV, self._tt)
         else:
-            ply, _, _ = alfabeta_iter_deep(board, game.get_current_player() * 2 - 1 , self._min_depth, self._max_depth, self._tV)
+            ply, _, _ = alfabeta_iter_deep(game.get_minmax_board(), game.get_minmax_player(), self._min_depth, self._max_depth, self._tV)
         
         if DEBUG:
             print(ply)
@@ -41,14 +42,21 @@ class TestMyPlayer(Player):
     
 
 N_GAMES = 5000 
+TT_BYTES = 256 * 2**20 #memory budget of the transposition table shared by each batch
+STATS_FILE = None #e.g. "stats.json" or "stats.csv": export the search stats of the 3 batches (opt-in, see stats.py)
 
 if __name__ == '__main__': #stochastic test
 
+    if STATS_FILE is not None:
+        stats = SearchStats()
+        set_search_stats(stats)
+
     win = 0
     lose = 0
     print(f"test alfabeta: {1000} matches")
     custom_bar_format = "{l_bar}{bar:50}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
     progress_bar = tqdm(range(1000),dynamic_ncols=True,desc="Game",colour="green",total=1000,mininterval=0.5,bar_format=custom_bar_format,ncols=100)
+    tt = TranspositionTable(TT_BYTES)
 
     for game in progress_bar:
 
@@ -58,11 +66,11 @@ if __name__ == '__main__': #stochastic test
         g = Game()
         random.seed(game+1)
         if game%2 == 0:
-            player1 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT])
-            player2 = TestMyPlayer(1,4,[MAX_INT,0.3,0.5,-MAX_INT])
+            player1 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT], tt=tt)
+            player2 = TestMyPlayer(1,4,[MAX_INT,0.3,0.5,-MAX_INT], tt=tt)
         else:
-            player2 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT])
-            player1 = TestMyPlayer(1,4,[MAX_INT,0.3,0.5,-MAX_INT])
+            player2 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT], tt=tt)
+            player1 = TestMyPlayer(1,4,[MAX_INT,0.3,0.5,-MAX_INT], tt=tt)
 
         winner = g.play(player1, player2)
 
@@ -78,7 +86,7 @@ if __name__ == '__main__': #stochastic test
         if game % 2500 == 0:
             print(f"lose @{game}: {lose}")
         
-        progress_bar.set_description(f"won: {win}, lost: {lose}, size dict: {sys.getsizeof(state_cache)} bytes") #monitoring slowdown: in 300 game around 1M entries
+        progress_bar.set_description(f"won: {win}, lost: {lose}, tt: {len(tt)}/{tt.capacity()} entries, {tt.hits} hits, {tt.overwrites} overwrites") #memory is bounded by TT_BYTES
 
    
     win = 0
@@ -86,6 +94,7 @@ if __name__ == '__main__': #stochastic test
     print(f"test alfabeta: {N_GAMES} matches")
     custom_bar_format = "{l_bar}{bar:50}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
     progress_bar = tqdm(range(N_GAMES),dynamic_ncols=True,desc="Game",colour="green",total=N_GAMES,mininterval=0.5,bar_format=custom_bar_format,ncols=100)
+    tt = TranspositionTable(TT_BYTES)
 
     for game in progress_bar:
 
@@ -95,11 +104,11 @@ if __name__ == '__main__': #stochastic test
         g = Game()
         random.seed(game+1)
         if game%2 == 0:
-            player1 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT])
-            player2 = TestMyPlayer(2,2,[-MAX_INT])
+            player1 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT], tt=tt)
+            player2 = TestMyPlayer(2,2,[-MAX_INT], tt=tt)
         else:
-            player2 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT])
-            player1 = TestMyPlayer(2,2,[-MAX_INT])
+            player2 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT], tt=tt)
+            player1 = TestMyPlayer(2,2,[-MAX_INT], tt=tt)
 
         winner = g.play(player1, player2)
 
@@ -115,13 +124,14 @@ if __name__ == '__main__': #stochastic test
         if game % 2500 == 0:
             print(f"lose @{game}: {lose}")
         
-        progress_bar.set_description(f"won: {win}, lost: {lose}, size dict: {sys.getsizeof(state_cache)} bytes") #monitoring slowdown: in 300 game around 1M entries
+        progress_bar.set_description(f"won: {win}, lost: {lose}, tt: {len(tt)}/{tt.capacity()} entries, {tt.hits} hits, {tt.overwrites} overwrites") #memory is bounded by TT_BYTES
 
     win = 0
     lose = 0
     print(f"test alfabeta: {N_GAMES} matches")
     custom_bar_format = "{l_bar}{bar:50}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
     progress_bar = tqdm(range(N_GAMES),dynamic_ncols=True,desc="Game",colour="green",total=N_GAMES,mininterval=0.5,bar_format=custom_bar_format,ncols=100)
+    tt = TranspositionTable(TT_BYTES)
 
     for game in progress_bar:
 
@@ -131,11 +141,11 @@ if __name__ == '__main__': #stochastic test
         g = Game()
         random.seed(game+1)
         if game%2 == 0:
-            player1 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT])
-            player2 = TestMyPlayer(3,3,[-MAX_INT])
+            player1 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT], tt=tt)
+            player2 = TestMyPlayer(3,3,[-MAX_INT], tt=tt)
         else:
-            player2 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT])
-            player1 = TestMyPlayer(3,3,[-MAX_INT])
+            player2 = TestMyPlayer(1,3,[MAX_INT,0.3,-MAX_INT], tt=tt)
+            player1 = TestMyPlayer(3,3,[-MAX_INT], tt=tt)
 
         winner = g.play(player1, player2)
 
@@ -151,4 +161,9 @@ if __name__ == '__main__': #stochastic test
         if game % 2500 == 0:
             print(f"lose @{game}: {lose}")
         
-        progress_bar.set_description(f"won: {win}, lost: {lose}, size dict: {sys.getsizeof(state_cache)} bytes") #monitoring slowdown: in 300 game around 1M entries
+        progress_bar.set_description(f"won: {win}, lost: {lose}, tt: {len(tt)}/{tt.capacity()} entries, {tt.hits} hits, {tt.overwrites} overwrites") #memory is bounded by TT_BYTES
+
+    if STATS_FILE is not None:
+        set_search_stats(None)
+        stats.export(STATS_FILE)
+        print(stats)
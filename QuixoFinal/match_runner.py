@@ -0,0 +1,140 @@
+import argparse
+import os
+import random
+from multiprocessing import Pool
+
+import tqdm
+from tqdm import tqdm
+
+from game import Game
+from minmax import MAX_INT
+from transposition import TranspositionTable
+from stats import SearchStats, set_search_stats
+from book import OpeningBook
+from params import load_params
+from prover import ThreatProver
+from endgame import EndgameTable, set_endgame
+import players
+import main_test
+
+#parallel version of the batch loops in main.py / main_test.py: games are split in chunks played by a pool of processes
+#every worker keeps its transposition table warm inside a chunk and clears it at the start of the next one:
+#the result of a game depends only on its seed (random.seed(game+1)) and on the games before it in the same chunk
+#-> same chunk_size gives exactly the same results whatever the number of workers (chunk_size=1: every game is independent)
+
+N_GAMES = 25000
+CHUNK_SIZE = 50
+TT_BYTES = 256 * 2**20 #memory budget of the transposition table of each worker
+
+#player specs are plain tuples (picklable): ("random",), ("minmax", min_depth, max_depth, tV), ("test", min_depth, max_depth, tV),
+#("main", min_depth, max_depth, tV): minmax with the book, params, endgame tables (if built) and prover of the batch of main.py
+RANDOM = ("random",)
+DEFAULT_AGENT = ("minmax", 1, 3, [MAX_INT, 0.3, -MAX_INT])
+MAIN_AGENT = ("main",) + DEFAULT_AGENT[1:]
+
+_worker_tt = None
+_worker_stats = False
+_main_agent = None
+
+def init_worker(tt_bytes: int, stats: bool = False) -> None:
+    global _worker_tt, _worker_stats
+    players.DEBUG = False
+    main_test.DEBUG = False
+    _worker_tt = TranspositionTable(tt_bytes)
+    _worker_stats = stats
+
+def main_agent() -> (OpeningBook, dict, ThreatProver):
+    '''Book, params and prover of the batch of main.py, loaded once per process (endgame tables set for all its searches)'''
+    global _main_agent
+    if _main_agent is None:
+        book = OpeningBook(players.BOOK_FILE) if os.path.exists(players.BOOK_FILE) else None
+        params = load_params(players.PARAMS_FILE) if os.path.exists(players.PARAMS_FILE) else None
+        if os.path.exists(os.path.join(players.ENDGAME_DIR, "manifest.json")):
+            set_endgame(EndgameTable(players.ENDGAME_DIR))
+        _main_agent = (book, params, ThreatProver())
+    return _main_agent
+
+def make_player(spec: tuple, tt: TranspositionTable) -> 'Player':
+    if spec[0] == "random":
+        return players.RandomPlayer()
+    elif spec[0] == "minmax":
+        return players.MyPlayer(spec[1], spec[2], spec[3], tt=tt)
+    elif spec[0] == "main":
+        book, params, prover = main_agent()
+        return players.MyPlayer(spec[1], spec[2], spec[3], tt=tt, book=book, params=params, prover=prover)
+    elif spec[0] == "test": #30% of random moves (stochastic test of main_test.py)
+        return main_test.TestMyPlayer(spec[1], spec[2], spec[3], tt=tt)
+    assert False, f"unknown player: {spec}"
+
+#match of the batch loop in main.py (same games with agent=MAIN_AGENT): agent is player 0 on even games, player 1 on odd games
+def play_game(game: int, agent: tuple, opponent: tuple, tt: TranspositionTable) -> int:
+    g = Game()
+    random.seed(game+1)
+    if game%2 == 0:
+        player1 = make_player(agent, tt)
+        player2 = make_player(opponent, tt)
+    else:
+        player2 = make_player(agent, tt)
+        player1 = make_player(opponent, tt)
+    return g.play(player1, player2)
+
+#search stats of the chunk are returned with the results (None if not requested) and merged by run_matches
+def play_chunk(args: (range, tuple, tuple)) -> ([(int, int)], SearchStats):
+    games, agent, opponent = args
+    _worker_tt.clear()
+    _worker_tt.reset_stats()
+    stats = SearchStats() if _worker_stats else None
+    set_search_stats(stats)
+    results = [(game, play_game(game, agent, opponent, _worker_tt)) for game in games]
+    set_search_stats(None)
+    return results, stats
+
+def run_matches(n_games: int, agent: tuple = MAIN_AGENT, opponent: tuple = RANDOM, n_workers: int = None, chunk_size: int = CHUNK_SIZE, tt_bytes: int = TT_BYTES, progress: bool = True, stats: SearchStats = None) -> (int, int, [int]):
+    '''Returns (win, lose, winners): winners[game] is the id of the player who won game, search stats of all the workers are merged in stats (if given)'''
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    chunks = [(range(start, min(start + chunk_size, n_games)), agent, opponent) for start in range(0, n_games, chunk_size)]
+
+    winners = [-1] * n_games
+    win = 0
+    lose = 0
+    with Pool(n_workers, initializer=init_worker, initargs=(tt_bytes, stats is not None)) as pool:
+        if progress:
+            custom_bar_format = "{l_bar}{bar:50}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
+            progress_bar = tqdm(total=n_games,dynamic_ncols=True,desc="Game",colour="green",mininterval=0.5,bar_format=custom_bar_format,ncols=100)
+        for results, chunk_stats in pool.imap_unordered(play_chunk, chunks):
+            if stats is not None:
+                stats.merge(chunk_stats)
+            for game, winner in results:
+                winners[game] = winner
+                if winner == game % 2:
+                    win += 1
+                else:
+                    lose += 1
+            if progress:
+                progress_bar.update(len(results))
+                progress_bar.set_description(f"won: {win}, lost: {lose}")
+        if progress:
+            progress_bar.close()
+
+    return win, lose, winners
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="play seeded Quixo matches on a pool of processes")
+    parser.add_argument("--games", type=int, default=N_GAMES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="games played with the same warm transposition table")
+    parser.add_argument("--tt-mb", type=int, default=TT_BYTES // 2**20, help="transposition table size of each worker (MB)")
+    parser.add_argument("--opponent-depth", type=int, default=None, help="minmax opponent with fixed depth (default: random player)")
+    parser.add_argument("--stats", type=str, default=None, help="export search stats of all the games (.csv: one row per iteration, otherwise json)")
+    args = parser.parse_args()
+
+    opponent = RANDOM if args.opponent_depth is None else ("minmax", args.opponent_depth, args.opponent_depth, [-MAX_INT])
+    print(f"test alfabeta: {args.games} matches on {args.workers} workers")
+    stats = SearchStats() if args.stats is not None else None
+    win, lose, _ = run_matches(args.games, MAIN_AGENT, opponent, args.workers, args.chunk, args.tt_mb * 2**20, stats=stats)
+    print(f"won: {win}, lost: {lose}")
+    if stats is not None:
+        stats.export(args.stats)
+        print(stats)
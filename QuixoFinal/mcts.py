@@ -0,0 +1,183 @@
+import math
+import random
+import time
+from multiprocessing import Pool
+
+from game import Move, Player
+from minmax import LINE_MASKS
+from bitboard import possible_moves_bb, make_ply_bb, eval_terminal_3_4_bb, heuristic_score_bb, MOVES
+
+#Monte Carlo tree search (UCT) on the bitboard backend: every iteration selects a leaf with UCB1, expands one child,
+#plays a random game from it (rollout) and backs the result up to the root; the move played is the most visited child
+#the tree is kept between moves: the position after the opponent reply is looked up 2 plies below the old root
+#root parallelism (optional): every process of a pool builds its own tree from the root, visits of the root children are summed
+
+UCT_C = 1.4 #exploration constant of UCB1 (results are in [0, 1])
+ROLLOUT_PLIES = 40 #rollouts longer than this are stopped and scored by heuristic_score_bb
+
+def has_line(mask: int) -> bool:
+    for line in LINE_MASKS:
+        if mask & line == line:
+            return True
+    return False
+
+def terminal_winner(board: (int, int), player: int) -> int:
+    '''1/-1 if the game is over (a complete line of the player to move wins first, as eval_terminal_3_4), 0 otherwise'''
+    mine, oppo = (board[0], board[1]) if player == 1 else (board[1], board[0])
+    if has_line(mine):
+        return player
+    if has_line(oppo):
+        return -player
+    return 0
+
+#fast rollout: random plies (possible_moves_bb/make_ply_bb) until a complete line, result as score of player 1 in [0, 1]
+def rollout(board: (int, int), player: int, rng: random.Random, max_plies: int = ROLLOUT_PLIES) -> float:
+    for _ in range(max_plies):
+        board = make_ply_bb(board, rng.choice(possible_moves_bb(board, player)), player)
+        player = -player
+        winner = terminal_winner(board, player)
+        if winner != 0:
+            return 1.0 if winner == 1 else 0.0
+    #stopped: heuristic of the player to move clamped to [-1, 1]
+    _, count = eval_terminal_3_4_bb(board, player)
+    score = max(-1.0, min(1.0, heuristic_score_bb(board, player, count) * player))
+    return (score + 1) / 2
+
+
+class Node(object):
+    '''Position of the tree (board, player to move) with the statistics of the move that leads here, for the player who made it'''
+    __slots__ = ("board", "player", "move", "parent", "children", "untried", "visits", "wins", "winner")
+
+    def __init__(self, board: (int, int), player: int, move: int = None, parent: 'Node' = None) -> None:
+        self.board = board
+        self.player = player
+        self.move = move
+        self.parent = parent
+        self.children = {}
+        self.winner = terminal_winner(board, player)
+        self.untried = possible_moves_bb(board, player) if self.winner == 0 else []
+        self.visits = 0
+        self.wins = 0.0
+
+    def select(self, c: float) -> 'Node':
+        '''Child with the best UCB1 value'''
+        log_n = math.log(self.visits)
+        return max(self.children.values(), key=lambda n: n.wins / n.visits + c * math.sqrt(log_n / n.visits))
+
+    def expand(self, rng: random.Random) -> 'Node':
+        m = self.untried.pop(rng.randrange(len(self.untried)))
+        child = Node(make_ply_bb(self.board, m, self.player), -self.player, m, self)
+        self.children[m] = child
+        return child
+
+
+class MCTS(object):
+    '''Search tree kept between the moves of a game'''
+
+    def __init__(self, c: float = UCT_C, rollout_plies: int = ROLLOUT_PLIES, seed: int = None) -> None:
+        self.c = c
+        self.rollout_plies = rollout_plies
+        self.rng = random.Random(seed)
+        self.root = None
+        self.iterations = 0 #of the last search
+        self.reused = 0 #visits of the root inherited from the previous search
+
+    #new root: the node of the old tree with the same position (the root or up to 2 plies below it), a new node otherwise
+    def set_root(self, board: (int, int), player: int) -> None:
+        candidates = []
+        if self.root is not None:
+            candidates = [self.root] + list(self.root.children.values())
+            candidates += [n for child in self.root.children.values() for n in child.children.values()]
+        for node in candidates:
+            if node.board == board and node.player == player:
+                node.parent = None
+                self.root = node
+                self.reused = node.visits
+                return
+        self.root = Node(board, player)
+        self.reused = 0
+
+    def iterate(self) -> None:
+        node = self.root
+        while not node.untried and node.children: #selection
+            node = node.select(self.c)
+        if node.untried: #expansion
+            node = node.expand(self.rng)
+        if node.winner != 0: #simulation
+            result = 1.0 if node.winner == 1 else 0.0
+        else:
+            result = rollout(node.board, node.player, self.rng, self.rollout_plies)
+        while node is not None: #backpropagation: wins of the player who moved into node (-node.player)
+            node.visits += 1
+            node.wins += result if node.player == -1 else 1 - result
+            node = node.parent
+
+    def search(self, board: (int, int), player: int, move_time: float = None, iterations: int = None) -> {int: int}:
+        '''Visits of the root children after move_time seconds and/or iterations iterations (at least one)'''
+        assert move_time is not None or iterations is not None, "MCTS needs a time budget or a number of iterations"
+        self.set_root(board, player)
+        deadline = None if move_time is None else time.perf_counter() + move_time
+        self.iterations = 0
+        while self.iterations == 0 or ((iterations is None or self.iterations < iterations) and (deadline is None or time.perf_counter() < deadline)):
+            self.iterate()
+            self.iterations += 1
+        return {m: n.visits for m, n in self.root.children.items()}
+
+    def value(self, m: int) -> float:
+        '''Mean result of root move m for the player to move'''
+        n = self.root.children[m]
+        return n.wins / n.visits
+
+
+#root parallelism: every worker searches from scratch with its own seed (no tree reuse between moves)
+def search_root(args: ((int, int), int, float, int, float, int, int)) -> ({int: int}, int):
+    board, player, move_time, iterations, c, rollout_plies, seed = args
+    tree = MCTS(c, rollout_plies, seed)
+    visits = tree.search(board, player, move_time, iterations)
+    return visits, tree.iterations
+
+
+class MCTSPlayer(Player):
+    def __init__(self, move_time: float = None, iterations: int = None, c: float = UCT_C, rollout_plies: int = ROLLOUT_PLIES, n_workers: int = None, seed: int = None) -> None:
+        super().__init__()
+        self.policy = "monte carlo tree search (uct)"
+        self.win = 0
+        self._move_time = move_time #seconds per move
+        self._iterations = iterations #iterations per move (per worker), with or without move_time
+        self._tree = MCTS(c, rollout_plies, seed)
+        self._seed = seed
+        self._pool = Pool(n_workers) if n_workers is not None else None #root parallelism, close() stops the workers
+        self._n_workers = n_workers
+        self.moves = 0
+        self.iterations = 0 #iterations of all the moves (all the workers)
+        self.last_iterations = 0 #iterations of the last move
+        self.last_score = None #mean result of the move played (for the player to move)
+
+    def make_move(self, game: 'Game') -> tuple[tuple[int, int], Move]:
+        board, player = game.get_bitboard(), game.get_minmax_player()
+        if self._pool is None:
+            visits = self._tree.search(board, player, self._move_time, self._iterations)
+            m = max(visits, key=visits.get)
+            self.last_iterations = self._tree.iterations
+            self.last_score = self._tree.value(m)
+        else:
+            seed = None if self._seed is None else self._seed * 10**6 + self.moves * self._n_workers
+            tasks = [(board, player, self._move_time, self._iterations, self._tree.c, self._tree.rollout_plies, None if seed is None else seed + w)
+                     for w in range(self._n_workers)]
+            visits = {}
+            self.last_iterations = 0
+            for worker_visits, iterations in self._pool.map(search_root, tasks, chunksize=1):
+                for move, n in worker_visits.items():
+                    visits[move] = visits.get(move, 0) + n
+                self.last_iterations += iterations
+            m = max(visits, key=visits.get)
+            self.last_score = None
+        self.moves += 1
+        self.iterations += self.last_iterations
+        ply = MOVES[m]
+        return (ply[1], ply[0]), ply[2] #inverted row col
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
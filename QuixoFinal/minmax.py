@@ -1,6 +1,8 @@
+import time
 from copy import deepcopy
 import numpy as np
 from game import Move #original enum
+from transposition import EXACT, LOWER, UPPER
 
 #all this methods are outside of a class for efficiency reason (lot of test to run)
 
@@ -58,6 +60,9 @@ POS_SCORES = np.array([
     [3,2,2,2,3]
 ])
 TOT_SCORES = np.sum(POS_SCORES)
+#divisors of the count of lines with 4 and with 3 pieces (params.py can change them and the positional scores)
+COUNT_4_DIV = 5
+COUNT_3_DIV = 25
 
 def heuristic_score(board:np.array, player:int, count: (int, int)) -> int: #must be efficient
     
@@ -67,8 +72,8 @@ def heuristic_score(board:np.array, player:int, count: (int, int)) -> int: #must
 
     #heuristic3: count of row/col/diag of 4 (later also 3)
     #NOTE: my idea
-    score += (count[0]-count[1]) / 5 #in case of 4 in a row opponent has higher chance of winning: his move and your move
-    score += (count[2]-count[3]) / 25
+    score += (count[0]-count[1]) / COUNT_4_DIV #in case of 4 in a row opponent has higher chance of winning: his move and your move
+    score += (count[2]-count[3]) / COUNT_3_DIV
 
     #heuristic 4: center control
     #NOTE: used @ https://github.com/Berkays/Quixo/blob/master/ai.py
@@ -169,6 +174,49 @@ def eval_terminal_3_4(board: np.array, player:int) -> (int, (int, int, int, int)
     return (0,(count_p_4, count_o_4, count_p_3, count_o_3))
 
 
+#12 precomputed line masks (5 rows, 5 cols, main and secondary diagonal) as 25-bit int, bit i*5+j <-> tile (i,j)
+LINE_MASKS = [sum(1 << (i*5 + j) for j in range(5)) for i in range(5)] \
+           + [sum(1 << (i*5 + j) for i in range(5)) for j in range(5)] \
+           + [sum(1 << (i*5 + i) for i in range(5)), sum(1 << (i*5 + 4 - i) for i in range(5))]
+BIT_WEIGHTS = (1 << np.arange(25)).astype(np.int64)
+
+#NOTE: a complete line of the player and one of the opponent can coexist only if parallel (otherwise they share a tile)
+#eval_terminal_3_4 scan rows before cols and returns MAX_INT first -> "player win" always has priority over "opponent win"
+def eval_terminal_3_4_masks(mine: int, oppo: int) -> (int, (int, int, int, int)):
+    count_p_4 = 0
+    count_o_4 = 0
+    count_p_3 = 0
+    count_o_3 = 0
+
+    oppo_win = False
+    for line in LINE_MASKS:
+        n_p = (mine & line).bit_count()
+        if n_p >= 3:
+            if n_p >= 4:
+                if n_p == 5:
+                    return (MAX_INT, None)
+                count_p_4 += 1
+            count_p_3 += 1
+        else:
+            n_o = (oppo & line).bit_count()
+            if n_o >= 3:
+                if n_o >= 4:
+                    if n_o == 5:
+                        oppo_win = True
+                    count_o_4 += 1
+                count_o_3 += 1
+
+    if oppo_win:
+        return (-MAX_INT, None)
+
+    return (0,(count_p_4, count_o_4, count_p_3, count_o_3))
+
+#drop-in replacement of eval_terminal_3_4: 2 dot products to get the masks, then only popcounts (speedup measured by bench_eval.py)
+def eval_terminal_3_4_lines(board: np.array, player:int) -> (int, (int, int, int, int) ):
+    flat = board.reshape(25)
+    return eval_terminal_3_4_masks(int(BIT_WEIGHTS @ (flat == player)), int(BIT_WEIGHTS @ (flat == -player)))
+
+
 print("heuristic scoring:")
 print(f"min: {-MAX_INT}, max: {MAX_INT}")
 print(f"positional scores:")
@@ -189,16 +237,181 @@ def canonical_repr_16simm(board: np.array, player: int) -> (np.array, int):
     return min(equiv_board_bytes, key= lambda x: x[0])
 
 
+#NOTE: batched children for the nodes at depth 1 (alfabeta_leaves): all the children are built, keyed and evaluated with a few numpy calls
+#ALL_PLIES in possible_moves order, PLY_GATHER[k][c] = cell of the parent (25 = the tile inserted by the player) that ends in cell c after ALL_PLIES[k]
+ALL_PLIES = possible_moves(np.zeros((5, 5), dtype=np.int8), 1)
+PLY_INDEX = {ply: k for k, ply in enumerate(ALL_PLIES)}
+PLY_GATHER = np.array([make_ply(np.arange(25).reshape(5, 5), ply, 25).reshape(25) for ply in ALL_PLIES])
+#cells of the 8 rotations/flips in the order of canonical_repr_16simm (rot, flipud(rot) for 0..3 rotations)
+SIMM_GATHER = np.array([m for r in range(4) for m in (np.rot90(np.arange(25).reshape(5, 5), r).reshape(25), np.flipud(np.rot90(np.arange(25).reshape(5, 5), r)).reshape(25))])
+#bytes order of a tile is 0 < 1 < -1 -> digit v % 3, cell 0 most significant: base 3 code order == bytes order
+BASE3 = 3 ** np.arange(24, -1, -1, dtype=np.int64)
+LINE_CELLS = np.array([[i*5 + j for j in range(5)] for i in range(5)] + [[i*5 + j for i in range(5)] for j in range(5)] + [[i*5 + i for i in range(5)], [i*5 + 4 - i for i in range(5)]])
+POS_FLAT = POS_SCORES.reshape(25)
+BATCH_LEAVES = True #alfabeta uses alfabeta_leaves at depth 1 (same results, False: one child at a time)
+
+def expand_children(board: np.array, player: int, possible: [(int, int, Move)]) -> np.array:
+    '''(N, 25) stack of the children of board after the plies of possible'''
+    parent = np.append(board.reshape(25), np.int8(player))
+    return parent[PLY_GATHER[[PLY_INDEX[ply] for ply in possible]]]
+
+def canonical_keys(children: np.array, player: int) -> [(bytes, int)]:
+    '''canonical_repr_16simm of every board of the stack'''
+    simm = children[:, SIMM_GATHER] #(N, 8, 25)
+    codes = np.empty((len(children), 16), dtype=np.int64)
+    codes[:, 0::4] = (simm[:, 0::2] % 3) @ BASE3
+    codes[:, 1::4] = (simm[:, 1::2] % 3) @ BASE3
+    codes[:, 2::4] = (-simm[:, 0::2] % 3) @ BASE3
+    codes[:, 3::4] = (-simm[:, 1::2] % 3) @ BASE3
+    best = np.argmin(codes, axis=1) #first minimum, as min() on the list of canonical_repr_16simm
+    keys = []
+    for n, s in enumerate(best.tolist()):
+        t = (s // 4) * 2 + (s & 1)
+        if s & 2:
+            keys.append((bytes(-simm[n, t]), -player))
+        else:
+            keys.append((bytes(simm[n, t]), player))
+    return keys
+
+def eval_children(children: np.array, player: int) -> (np.array, np.array):
+    '''eval_terminal_3_4 and heuristic_score of every board of the stack for player (to move in the children)'''
+    lines = children[:, LINE_CELLS] #(N, 12, 5)
+    n_p = np.count_nonzero(lines == player, axis=2)
+    n_o = np.count_nonzero(lines == -player, axis=2)
+    val = np.where((n_p == 5).any(axis=1), MAX_INT, np.where((n_o == 5).any(axis=1), -MAX_INT, 0))
+    #same operations (and order) of heuristic_score -> same floats
+    hs = (np.count_nonzero(n_p >= 4, axis=1) - np.count_nonzero(n_o >= 4, axis=1)) / COUNT_4_DIV
+    hs = hs + (np.count_nonzero(n_p >= 3, axis=1) - np.count_nonzero(n_o >= 3, axis=1)) / COUNT_3_DIV
+    hs = hs + ((children @ POS_FLAT) * player) / TOT_SCORES
+    return val, hs
+
+
+#one entry per position: (canonical board, turn, is_max) -> (depth, value, bound), only the deepest result is kept
+#bound is EXACT when the child was searched completely, UPPER/LOWER when it was cut (the value is only a bound)
+#-> a probe is one dict lookup instead of a scan of the depths (max_depth..depth) with a key built for each one
 state_cache = {}
+#True: previous layout (key with the depth, scan of the depths, shallower entries deleted on the way), kept for bench_cache.py
+CACHE_SCAN = False
+#SearchStats updated by alfabeta/alfabeta_iter_deep (None: no instrumentation, see stats.py)
+search_stats = None
+#EndgameTable probed at the leaves by alfabeta (None: no probe, see endgame.py)
+endgame = None
+#plies of the quiescence extension at the leaves of alfabeta (0: static evaluation, see set_quiescence)
+QUIESCENCE_PLIES = 0
+
+#previous probe (CACHE_SCAN): deepest entry from max_depth to depth, the shallower ones are deleted
+#NOTE: a value 0 is falsy -> read as a miss
+def cache_scan(board_turn_key: (bytes, int), depth: int, is_max: bool, max_depth: int) -> (bool, float):
+    hit = False
+    val = None
+    for d in range(max_depth, depth-1, -1):
+        if state_cache.get((board_turn_key[0], board_turn_key[1], d, is_max)) and not hit: 
+            val = state_cache[(board_turn_key[0], board_turn_key[1], d, is_max)]
+            hit = True
+        elif state_cache.get((board_turn_key[0], board_turn_key[1], d, is_max)):
+            del state_cache[(board_turn_key[0], board_turn_key[1], d, is_max)]
+            if search_stats is not None:
+                search_stats.cache_deletes += 1
+    return hit, val
+
+#value of the child searched at depth-1 (key depth is the depth of the parent), pruned -> the child was cut: its value is
+#an upper bound if it is a min node (parent is_max), a lower bound otherwise
+#the entry is replaced by a deeper result, or by an exact one of the same depth
+def cache_store(board_turn_key: (bytes, int), depth: int, is_max: bool, val: float, pruned: bool) -> None:
+    if CACHE_SCAN:
+        if not pruned: #if next layer has evaluated all the nodes the value returned is the correct one
+            state_cache[(board_turn_key[0], board_turn_key[1], depth, is_max)] = val
+        return
+    bound = EXACT if not pruned else (UPPER if is_max else LOWER)
+    key = (board_turn_key[0], board_turn_key[1], is_max)
+    entry = state_cache.get(key)
+    if entry is None or depth > entry[0] or (depth == entry[0] and (bound == EXACT or entry[2] != EXACT)):
+        if entry is not None and search_stats is not None:
+            search_stats.cache_deletes += 1
+        state_cache[key] = (depth, val, bound)
+
+#quiescence extension: a leaf with a 4 in line (of either player) is not evaluated statically if a line is one ply away
+#-> the player to move completes a line: win; the opponent completes a line at its next ply: only the plies that stop it
+#(blocks) are searched, loss if there are none; no line can be completed at the next 2 plies: quiet, static evaluation
+#at most QUIESCENCE_PLIES plies of blocks, searched with the full window -> the value is exact (stored in state_cache as the
+#static ones)
+#NOTE: a ply changes at most one tile of every line: a line is completed only from a 4 in line
+
+#cell taken by every ply of ALL_PLIES
+PLY_TAKEN = np.array([i*5 + j for i, j, _ in ALL_PLIES])
+
+def wins_next(boards: np.array, player: int) -> np.array:
+    '''For every board of the (N, 25) stack: player (to move) has a ply that completes its line and not one of the opponent'''
+    parent = np.concatenate([boards, np.full((len(boards), 1), player, dtype=boards.dtype)], axis=1)
+    lines = parent[:, PLY_GATHER][:, :, LINE_CELLS] #(N, plies, 12, 5)
+    mine = (lines == player).all(axis=3).any(axis=2)
+    oppo = (lines == -player).all(axis=3).any(axis=2)
+    return ((boards[:, PLY_TAKEN] != -player) & mine & ~oppo).any(axis=1)
+
+def threat_mask(boards: np.array) -> np.array:
+    '''For every board of the (N, 25) stack: a line with 4 pieces of the same player'''
+    lines = boards[:, LINE_CELLS]
+    return ((np.count_nonzero(lines == 1, axis=2) >= 4) | (np.count_nonzero(lines == -1, axis=2) >= 4)).any(axis=1)
+
+def quiescence(board: np.array, player: int, plies: int, alfa: float = -MAX_INT, beta: float = MAX_INT) -> float:
+    '''Value of board for player (to move) after the forcing plies (wins and blocks), static evaluation of the quiet positions'''
+    val, count = eval_terminal_3_4_lines(board, player)
+    if val != 0:
+        return val
+
+    hs = heuristic_score(board, player, count)
+    if plies == 0 or count[0] + count[1] == 0:
+        return hs
+
+    flat = board.reshape(1, 25)
+    if count[0] > 0 and wins_next(flat, player)[0]:
+        return MAX_INT
+    if count[1] == 0 or not wins_next(flat, -player)[0]:
+        return hs #quiet
+
+    #blocks: plies after which the opponent is not already winning and cannot complete a line
+    possible = possible_moves(board, player)
+    children = expand_children(board, player, possible)
+    val_children, _ = eval_children(children, -player)
+    blocks = np.flatnonzero((val_children == 0) & ~wins_next(children, -player)).tolist()
+
+    best = -MAX_INT
+    for n in blocks:
+        if search_stats is not None: #board is counted by the caller, the blocks here
+            search_stats.nodes += 1
+            search_stats.quiescence += 1
+        val = -quiescence(children[n].reshape(5, 5), -player, plies-1, -beta, -alfa)
+        best = max(best, val)
+        alfa = max(alfa, val)
+        if alfa >= beta:
+            break
+    return best
+
+def set_quiescence(plies: int) -> None:
+    '''Plies of the quiescence extension of the searches of this process (0: static evaluation at the leaves)'''
+    global QUIESCENCE_PLIES
+    if plies != QUIESCENCE_PLIES:
+        QUIESCENCE_PLIES = plies
+        state_cache.clear() #values of the other evaluation of the leaves
 
 #NOTE: alfabeta implementation found @ "Algorithms Explained – minimax and alpha-beta pruning" on youtube, slightly modified
 #turn are swapped when recurring. max_turn/mul_leaf are pre-computation of f(max_depth): less expensive to have larger stack than calculating every time from max_depth
 
 #turn are naturally swapped when recurring
-def alfabeta(board: np.array, player: int, depth: int, alfa: int, beta: int, max_turn: int, mul_leaf: int , max_depth: int) -> ((int, int, Move), int, bool): #out of object -> faster call
+#state: EvalState of incremental.py (board is state.board) -> children made/unmade in place on it and evaluated by delta,
+#children waiting for the tree search keep only ply and cache key (made again when searched); None: a copy of the board per child
+def alfabeta(board: np.array, player: int, depth: int, alfa: int, beta: int, max_turn: int, mul_leaf: int , max_depth: int, state: 'EvalState' = None) -> ((int, int, Move), int, bool): #out of object -> faster call
+
+    if search_stats is not None:
+        search_stats.nodes += 1
 
-    val, count = eval_terminal_3_4(board, player)
+    if state is None:
+        val, count = eval_terminal_3_4_lines(board, player)
+    else:
+        val, count = state.eval_terminal_3_4(player)
     if val !=0:
+        if search_stats is not None:
+            search_stats.terminal += 1
         #max d 3 mul leaf = -1 
         #ret at 2: 3 is max receive - val
         #ret at 1: 2 is min receive + val
@@ -211,7 +424,13 @@ def alfabeta(board: np.array, player: int, depth: int, alfa: int, beta: int, max
         return None, mul_leaf * val * (1 - (depth % 2) * 2) , False 
     
     if depth == 0:
-        hs = heuristic_score(board, player, count)
+        if endgame is not None:
+            solved = endgame.probe_board(board, player)
+            if solved is not None: #value of the retrograde analysis instead of the heuristic
+                return None, mul_leaf * solved, False
+        if QUIESCENCE_PLIES > 0 and count[0] + count[1] > 0:
+            return None, mul_leaf * quiescence(board, player, QUIESCENCE_PLIES), False
+        hs = heuristic_score(board, player, count) if state is None else state.heuristic_score(player, count)
         #max d 3 mul leaf = -1 
         #ret at 0: 1 is max receive - hs
         #max d 2 mul leaf = 1
@@ -226,49 +445,54 @@ def alfabeta(board: np.array, player: int, depth: int, alfa: int, beta: int, max
     
     is_max = depth%2 == max_turn
 
+    if depth == 1 and BATCH_LEAVES and endgame is None: #children in one stack, also with state (allocated, not made in place)
+        return alfabeta_leaves(board, player, possible, alfa, beta, is_max, mul_leaf, max_depth)
+
     evaluations = []
     postponed_eval = []
     for ply in possible:
-        new_board = make_ply(board, ply, player)
+        if state is None:
+            new_board = make_ply(board, ply, player)
+        else:
+            before = state.make(ply, player)
+            new_board = board #changed in place, unmade below
         board_turn_key = canonical_repr_16simm(new_board, player) #1h10min
         
-        hit = False
-        for d in range(max_depth, depth-1, -1):
-            if state_cache.get((board_turn_key[0], board_turn_key[1], d, is_max)) and not hit: 
-                val = state_cache[(board_turn_key[0], board_turn_key[1], d, is_max)]
-                hit = True
-            elif state_cache.get((board_turn_key[0], board_turn_key[1], d, is_max)):
-                del state_cache[(board_turn_key[0], board_turn_key[1], d, is_max)]
-        
-        if not hit:
-            if depth > 1:
-                postponed_eval.append((ply, new_board, board_turn_key)) #require tree search    
-            else: #at depth 1 just 1 level of recursion cost the same -> evaluate directly
-                _, val, pruned = alfabeta(new_board, -player , depth-1, alfa, beta, max_turn, mul_leaf, max_depth) 
-                if not pruned: #if next layer has evaluated all the nodes the value returned is the correct one
-                    state_cache[(board_turn_key[0], board_turn_key[1], depth, is_max)] = val #useful to store openings
-                
-                if is_max:
-                    alfa = max(alfa, val)
-                else:# first state that maximizes outcome (my_outcome = -oppo_outcome (win>loss for oppo) in terminal state) is 2
-                    beta = min(beta, val)
-                
-
-                evaluations.append((ply, val))
-                
-                if beta <= alfa:
-                    break
+        if CACHE_SCAN:
+            hit, val = cache_scan(board_turn_key, depth, is_max, max_depth)
         else:
+            entry = state_cache.get((board_turn_key[0], board_turn_key[1], is_max))
+            hit = entry is not None and entry[0] >= depth and (entry[2] == EXACT or (entry[1] <= alfa if is_max else entry[1] >= beta))
+            if hit:
+                val = entry[1]
+
+        if search_stats is not None:
+            if hit:
+                search_stats.cache_hits += 1
+            else:
+                search_stats.cache_misses += 1
+        
+        if not hit and depth == 1: #at depth 1 just 1 level of recursion cost the same -> evaluate directly
+            _, val, pruned = alfabeta(new_board, -player , depth-1, alfa, beta, max_turn, mul_leaf, max_depth, state) 
+            cache_store(board_turn_key, depth, is_max, val, pruned) #useful to store openings
+        if state is not None:
+            state.unmake(ply, before)
 
-            if is_max:
-                alfa = max(alfa, val)
-            else:# first state that maximizes outcome (my_outcome = -oppo_outcome (win>loss for oppo) in terminal state) is 2
-                beta = min(beta, val)    
+        if not hit and depth > 1:
+            postponed_eval.append((ply, new_board if state is None else None, board_turn_key)) #require tree search    
+            continue
 
-            evaluations.append((ply, val))
+        if is_max:
+            alfa = max(alfa, val)
+        else:# first state that maximizes outcome (my_outcome = -oppo_outcome (win>loss for oppo) in terminal state) is 2
+            beta = min(beta, val)
+
+        evaluations.append((ply, val))
 
-            if beta <= alfa:
-                break
+        if beta <= alfa:
+            if search_stats is not None:
+                search_stats.cutoffs[len(evaluations)-1] += 1
+            break
     
     if beta <= alfa or depth <= 1:#found an optimal move already cached
         if is_max:
@@ -280,9 +504,13 @@ def alfabeta(board: np.array, player: int, depth: int, alfa: int, beta: int, max
 
 
     for ply_board_key in postponed_eval:
-        _, val, pruned = alfabeta(ply_board_key[1], -player , depth-1, alfa, beta, max_turn, mul_leaf, max_depth)
-        if not pruned: #if next layer has evaluated all the nodes the value returned is the correct one
-            state_cache[(ply_board_key[2][0], ply_board_key[2][1], depth, is_max)] = val #useful to store openings
+        if state is None:
+            _, val, pruned = alfabeta(ply_board_key[1], -player , depth-1, alfa, beta, max_turn, mul_leaf, max_depth)
+        else: #made again on the board of state
+            before = state.make(ply_board_key[0], player)
+            _, val, pruned = alfabeta(board, -player , depth-1, alfa, beta, max_turn, mul_leaf, max_depth, state)
+            state.unmake(ply_board_key[0], before)
+        cache_store(ply_board_key[2], depth, is_max, val, pruned) #useful to store openings
 
         if is_max:
             alfa = max(alfa, val)
@@ -292,6 +520,8 @@ def alfabeta(board: np.array, player: int, depth: int, alfa: int, beta: int, max
         evaluations.append((ply_board_key[0], val))
 
         if beta <= alfa:
+            if search_stats is not None:
+                search_stats.cutoffs[len(evaluations)-1] += 1
             break
 
     if is_max:
@@ -302,14 +532,80 @@ def alfabeta(board: np.array, player: int, depth: int, alfa: int, beta: int, max
     return best[0], best[1], len(evaluations) != len(possible)
 
 
-def alfabeta_iter_deep(board, player, min_depth, max_depth, tV):
+#same as alfabeta at depth 1 (same cache reads/writes, same result) with the children expanded and evaluated in batch
+#NOTE: children after a cutoff are evaluated too (cheaper in one call than one by one)
+def alfabeta_leaves(board: np.array, player: int, possible: [(int, int, Move)], alfa: int, beta: int, is_max: bool, mul_leaf: int, max_depth: int) -> ((int, int, Move), int, bool):
+
+    children = expand_children(board, player, possible)
+    keys = canonical_keys(children, player)
+    val_leaf, hs_leaf = eval_children(children, -player)
+    val_leaf = val_leaf.tolist()
+    hs_leaf = hs_leaf.tolist()
+    threats = threat_mask(children).tolist() if QUIESCENCE_PLIES > 0 else None
+
+    evaluations = []
+    for n, ply in enumerate(possible):
+        board_turn_key = keys[n]
+
+        if CACHE_SCAN:
+            hit, val = cache_scan(board_turn_key, 1, is_max, max_depth)
+        else:
+            entry = state_cache.get((board_turn_key[0], board_turn_key[1], is_max))
+            hit = entry is not None and (entry[2] == EXACT or (entry[1] <= alfa if is_max else entry[1] >= beta))
+            if hit:
+                val = entry[1]
+
+        if search_stats is not None:
+            if hit:
+                search_stats.cache_hits += 1
+            else:
+                search_stats.cache_misses += 1
+                search_stats.nodes += 1
+                if val_leaf[n] != 0:
+                    search_stats.terminal += 1
+
+        if not hit:
+            if val_leaf[n] == 0 and threats is not None and threats[n]:
+                val = mul_leaf * quiescence(children[n].reshape(5, 5), -player, QUIESCENCE_PLIES)
+            else:
+                val = mul_leaf * (val_leaf[n] if val_leaf[n] != 0 else hs_leaf[n])
+            cache_store(board_turn_key, 1, is_max, val, False)
+
+        if is_max:
+            alfa = max(alfa, val)
+        else:
+            beta = min(beta, val)
+
+        evaluations.append((ply, val))
+
+        if beta <= alfa:
+            if search_stats is not None:
+                search_stats.cutoffs[len(evaluations)-1] += 1
+            break
+
+    if is_max:
+        best = max(evaluations, key=lambda k: k[1])
+    else:
+        best = min(evaluations, key=lambda k: k[1])
+
+    return best[0], best[1], len(evaluations) != len(possible)
+
+
+#state: EvalState of board (its board), searched with make/unmake (alfabeta_iter_deep_inplace of incremental.py)
+def alfabeta_iter_deep(board, player, min_depth, max_depth, tV, state=None):
 
     t = 0
     for d in range(min_depth, max_depth+1):
 
-        ply, val, _ = alfabeta(board, player, d, -MAX_INT, MAX_INT, d%2, 1 - (d % 2)*2, max_depth)
+        if search_stats is not None:
+            nodes, start = search_stats.nodes, time.perf_counter()
+        ply, val, _ = alfabeta(board, player, d, -MAX_INT, MAX_INT, d%2, 1 - (d % 2)*2, max_depth, state)
+        if search_stats is not None:
+            search_stats.iteration(d, search_stats.nodes - nodes, time.perf_counter() - start)
         if val >= tV[t]:
+            if search_stats is not None:
+                search_stats.end_search()
             return ply, val , d
         t += 1 
 
-    assert False, "return val mus be > -MAX_INT"
\ No newline at end of file
+    assert False, "return val mus be > -MAX_INT"
\ No newline at end of file
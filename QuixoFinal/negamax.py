@@ -0,0 +1,81 @@
+import time
+from game import Move #original enum
+from minmax import MAX_INT
+from bitboard import *
+from transposition import TranspositionTable
+from zobrist import zobrist_hash, canonical_key_zobrist
+from ordering import MoveOrdering
+import search
+import params
+from search import SearchTimeout, negamax
+
+#iterative deepening of the negamax search of search.py returning a SearchResult (nodes, principal variation)
+
+class SearchResult(object):
+    '''Result of negamax_iter_deep: move (i, j, Move), score for the player to move, nodes visited, depth reached, principal variation'''
+
+    def __init__(self, move: (int, int, Move), score: float, nodes: int, depth: int, pv: [(int, int, Move)]) -> None:
+        self.move = move
+        self.score = score
+        self.nodes = nodes
+        self.depth = depth
+        self.pv = pv
+
+    def __repr__(self) -> str:
+        return f"SearchResult(move={self.move}, score={self.score}, nodes={self.nodes}, depth={self.depth}, pv={self.pv})"
+
+#principal variation read back from the table (best moves of the stored entries, at most depth plies)
+def principal_variation(board: (int, int), player: int, first: int, depth: int, tt: TranspositionTable) -> [(int, int, Move)]:
+    pv = [MOVES[first]]
+    board = make_ply_bb(board, first, player)
+    player = -player
+    while len(pv) < depth and eval_terminal_3_4_bb(board, player)[0] == 0:
+        key, simm = canonical_key_zobrist(zobrist_hash(board), player)
+        entry = tt.probe(key)
+        if entry is None:
+            break
+        m = MOVE_SIMM_INV[simm][entry[4]]
+        pv.append(MOVES[m])
+        board = make_ply_bb(board, m, player)
+        player = -player
+    return pv
+
+#iterative deepening (same tV thresholds of alfabeta_iter_deep), optional time budget in seconds:
+#an iteration that runs out of time is dropped and the last completed one is returned
+def negamax_iter_deep(board: (int, int), player: int, min_depth: int, max_depth: int, tV: [int], tt: TranspositionTable, mo: MoveOrdering = None, move_time: float = None) -> SearchResult:
+    if mo is None:
+        mo = MoveOrdering()
+    tt.new_search(params.evaluation)
+    mo.new_search()
+    search_stats = search.search_stats
+    nodes = search.search_nodes
+    overwrites = tt.overwrites
+    start = time.perf_counter()
+    h = zobrist_hash(board)
+    best = None
+    t = 0
+    for d in range(min_depth, max_depth+1):
+
+        if move_time is not None and best is not None: #first iteration always completed
+            search.search_deadline = start + move_time
+        if search_stats is not None:
+            iter_nodes, iter_start = search_stats.nodes, time.perf_counter()
+        try:
+            m, val = negamax(board, h, player, d, -MAX_INT, MAX_INT, tt, mo, 0)
+        except SearchTimeout:
+            break
+        finally:
+            search.search_deadline = None
+        if search_stats is not None:
+            search_stats.iteration(d, search_stats.nodes - iter_nodes, time.perf_counter() - iter_start)
+
+        best = (m, val, d)
+        if val >= tV[t]:
+            break
+        t += 1
+
+    if search_stats is not None:
+        search_stats.cache_deletes += tt.overwrites - overwrites
+        search_stats.end_search()
+    m, val, d = best
+    return SearchResult(MOVES[m], val, search.search_nodes - nodes, d, principal_variation(board, player, m, d, tt))
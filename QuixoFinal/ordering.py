@@ -0,0 +1,44 @@
+from bitboard import MOVES
+
+#move ordering for the search: transposition table move, then killer moves of the ply, then history heuristic
+#NOTE: killer moves and history heuristic as described in "The History Heuristic and Alpha-Beta Search Enhancements in Practice" (Schaeffer)
+#history is indexed by move id: ids map 1:1 to the plies (i, j, Move) of possible_moves (see MOVES)
+
+N_KILLERS = 2
+MAX_PLY = 64
+
+class MoveOrdering(object):
+    '''State of the ordering heuristics, kept between the moves of a game (history is halved at every new search)'''
+
+    def __init__(self) -> None:
+        self.killers = [[None] * N_KILLERS for _ in range(MAX_PLY)]
+        #history[0] for player 1, history[1] for player -1
+        self.history = [[0] * len(MOVES) for _ in range(2)]
+
+    def new_search(self) -> None:
+        self.killers = [[None] * N_KILLERS for _ in range(MAX_PLY)]
+        for side in self.history:
+            for m in range(len(side)):
+                side[m] >>= 1
+
+    def order(self, possible: [int], tt_move: int, ply: int, player: int) -> [int]:
+        '''Moves of possible sorted by priority (ties keep the order of possible_moves)'''
+        history = self.history[0 if player == 1 else 1]
+        ordered = sorted(possible, key=history.__getitem__, reverse=True)
+        first = []
+        if tt_move is not None:
+            first.append(tt_move)
+        for killer in self.killers[ply]:
+            if killer is not None and killer != tt_move and killer in possible:
+                first.append(killer)
+        if not first:
+            return ordered
+        return first + [m for m in ordered if m not in first]
+
+    def cutoff(self, m: int, depth: int, ply: int, player: int) -> None:
+        '''Move m caused a cutoff at ply (with depth still to search)'''
+        killers = self.killers[ply]
+        if killers[0] != m:
+            killers[1] = killers[0]
+            killers[0] = m
+        self.history[0 if player == 1 else 1][m] += depth * depth
@@ -0,0 +1,119 @@
+import time
+from multiprocessing import Pool, Value
+
+from game import Move #original enum
+from minmax import MAX_INT
+from bitboard import possible_moves_bb, MOVES, MOVE_SIMM
+from transposition import SharedTranspositionTable, EXACT
+from zobrist import zobrist_hash, make_ply_zobrist, canonical_key_zobrist
+import search
+import params
+from search import negamax
+from endgame import EndgameTable, set_endgame
+from stats import SearchStats, set_search_stats
+
+#root-split search: the children of the root are searched by a pool of processes that share
+#- the transposition table (SharedTranspositionTable, lockless)
+#- the best value found so far at the root (alfa), so later root moves are searched with a narrower window
+#NOTE: moves with the same value can be chosen differently from the sequential search (depends on which finishes first)
+#NOTE: with set_search_stats active in the parent every worker counts its root move in its own SearchStats, merged by the parent
+#NOTE: the evaluation (set_heuristic_params) and the endgame tables (set_endgame, by table_dir) of the parent are sent with
+#every root move, the workers set them when they change
+#NOTE: experimental, not a faster mode until bench_parallel.py measures a speedup on a multi-core machine: only 1 core was
+#available when it was written (1 worker: ~0.55x of the sequential search, cost of the IPC)
+
+_tt = None
+_alfa = None
+_endgame_dir = None
+
+def init_worker(tt: SharedTranspositionTable, alfa: Value) -> None:
+    global _tt, _alfa
+    _tt = tt
+    _alfa = alfa
+
+#value of one root move from the point of view of the root player, exact is False if the move was cut by alfa
+#stats: SearchStats of the move returned (None if not counted), evaluation: params of the parent (params.active),
+#endgame_dir: table_dir of the endgame tables of the parent (None: no probe)
+def search_root_move(args: ((int, int), int, int, int, bool, dict, str)) -> (int, float, bool, SearchStats):
+    global _endgame_dir
+    board, player, m, depth, stats, evaluation, endgame_dir = args
+    params.set_heuristic_params(evaluation)
+    if endgame_dir != _endgame_dir:
+        _endgame_dir = endgame_dir
+        set_endgame(EndgameTable(endgame_dir) if endgame_dir is not None else None)
+    _tt.sync_age()
+    set_search_stats(SearchStats() if stats else None)
+    overwrites = _tt.overwrites
+    alfa = _alfa.value
+    new_board, new_h = make_ply_zobrist(board, zobrist_hash(board), m, player)
+    _, val = negamax(new_board, new_h, -player, depth-1, -MAX_INT, -alfa, _tt)
+    val = -val
+    if val > alfa:
+        with _alfa.get_lock():
+            if val > _alfa.value:
+                _alfa.value = val
+    worker_stats = search.search_stats
+    if worker_stats is not None:
+        worker_stats.cache_deletes += _tt.overwrites - overwrites
+        set_search_stats(None)
+    return m, val, val > alfa, worker_stats
+
+
+class ParallelSearch(object):
+    '''
+    Pool of n_workers processes started once (e.g. by MyPlayer) and reused for every move.
+    close() must be called to stop the workers and free the shared table.
+    '''
+
+    def __init__(self, n_workers: int, tt_bytes: int = 256 * 2**20) -> None:
+        self.n_workers = n_workers
+        self.tt = SharedTranspositionTable(tt_bytes)
+        self._alfa = Value('d', -MAX_INT-1)
+        self._pool = Pool(n_workers, initializer=init_worker, initargs=(self.tt, self._alfa))
+
+    def search(self, board: (int, int), player: int, depth: int) -> (int, float):
+        '''Best move id and value (same convention of negamax at the root)'''
+        self._alfa.value = -MAX_INT-1
+        search_stats = search.search_stats
+        if search_stats is not None:
+            search_stats.nodes += 1 #root, its children are counted by the workers
+        possible = possible_moves_bb(board, player)
+        endgame_dir = search.endgame.table_dir if search.endgame is not None else None
+        results = self._pool.map(search_root_move, [(board, player, m, depth, search_stats is not None, params.active, endgame_dir) for m in possible], chunksize=1)
+
+        best_move = None
+        best_val = -MAX_INT-1
+        for m, val, exact, worker_stats in results: #results are in the order of possible: first best move as the sequential search
+            if exact and val > best_val:
+                best_move, best_val = m, val
+            if worker_stats is not None:
+                search_stats.merge(worker_stats)
+
+        key, simm = canonical_key_zobrist(zobrist_hash(board), player)
+        self.tt.store(key, depth, best_val, EXACT, MOVE_SIMM[simm][best_move])
+        return best_move, best_val
+
+    def iter_deep(self, board: (int, int), player: int, min_depth: int, max_depth: int, tV: [int]) -> ((int, int, Move), float, int):
+        '''Same as alfabeta_iter_deep_tt, every iteration is split on the pool'''
+        self.tt.new_search(params.evaluation)
+        search_stats = search.search_stats
+        t = 0
+        for d in range(min_depth, max_depth+1):
+
+            if search_stats is not None:
+                nodes, start = search_stats.nodes, time.perf_counter()
+            m, val = self.search(board, player, d)
+            if search_stats is not None:
+                search_stats.iteration(d, search_stats.nodes - nodes, time.perf_counter() - start)
+            if val >= tV[t]:
+                if search_stats is not None:
+                    search_stats.end_search()
+                return MOVES[m], val , d
+            t += 1
+
+        assert False, "return val mus be > -MAX_INT"
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+        self.tt.close()
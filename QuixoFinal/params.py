@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+
+import minmax
+import bitboard
+from minmax import MAX_INT
+
+#parameters of the evaluation and of the iterative deepening, the heuristic of heuristic_score/heuristic_score_bb/eval_children is
+#(count 4 in line) / count_4_div + (count 3 in line) / count_3_div + sum(board*pos_scores*player) / pos_div
+#set for the searches of this process with set_heuristic_params (as set_search_stats/set_endgame), MyPlayer(params=...) sets
+#them before every move (params=None: DEFAULT_PARAMS); json file written by tuning.py, read by load_params
+#NOTE: the searches tag their TranspositionTable with the fingerprint of the evaluation (new_search), a table filled with
+#another evaluation is cleared: players with different params keep their values in their own tables, a shared one holds one
+#NOTE: workers of ParallelSearch are other processes: the params of the parent are sent with every root move
+
+DEFAULT_PARAMS = {
+    "count_4_div": minmax.COUNT_4_DIV,
+    "count_3_div": minmax.COUNT_3_DIV,
+    "pos_div": int(minmax.TOT_SCORES),
+    "pos_scores": minmax.POS_SCORES.tolist(),
+    "tV": [MAX_INT, 0.3, -MAX_INT], #thresholds of the depth 1-3 configuration of main
+}
+
+def fingerprint(params: dict) -> str:
+    '''Identity of the evaluation of params (None: default), equal for equal values in other dicts or processes (tV excluded)'''
+    if params is None:
+        params = DEFAULT_PARAMS
+    return json.dumps({k: v for k, v in params.items() if k != "tV"}, sort_keys=True, default=lambda x: x.tolist())
+
+#params of the evaluation in use (identity check: a player that sets the same params at every move does not rebuild the tables)
+active = None
+#fingerprint of the evaluation in use, tag of the transposition tables filled by the searches
+evaluation = fingerprint(None)
+
+def set_heuristic_params(params: dict) -> None:
+    '''Evaluation of the searches of this process (None: default evaluation)'''
+    global active, evaluation
+    if params is active:
+        return
+    active = params
+    key = fingerprint(params)
+    if key == evaluation:
+        return #same values in another dict
+    evaluation = key
+    if params is None:
+        params = DEFAULT_PARAMS
+    pos_scores = np.array(params["pos_scores"])
+    for module in (minmax, bitboard):
+        module.COUNT_4_DIV = params["count_4_div"]
+        module.COUNT_3_DIV = params["count_3_div"]
+        module.TOT_SCORES = params["pos_div"]
+        module.POS_SCORES = pos_scores
+    minmax.POS_FLAT = pos_scores.reshape(25)
+    bitboard.POS_GROUPS = bitboard.pos_groups(pos_scores)
+    minmax.state_cache.clear() #values of the other evaluation
+    bitboard.state_cache_bb.clear()
+
+def load_params(path: str) -> dict:
+    '''Params in the json file (missing keys take the default value)'''
+    with open(path) as f:
+        data = json.load(f)
+    return {k: data.get(k, v) for k, v in DEFAULT_PARAMS.items()}
+
+def save_params(path: str, params: dict, **info) -> None:
+    '''json file read by load_params, info (e.g. tuning results) is stored next to the params'''
+    with open(path, "w") as f:
+        json.dump({**params, **info}, f, indent=2)
@@ -0,0 +1,166 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from game import Game, Move #original enum
+from minmax import possible_moves, make_ply, eval_terminal_3_4
+from bitboard import possible_moves_bb, make_ply_bb, eval_terminal_3_4_bb, from_bitboard, MOVES
+from bench_parallel import mid_game_positions
+
+#perft: number of leaf nodes reachable in exactly depth plies from a position (move generation + ply + game over test)
+#NOTE: a position with a complete line is game over -> no children (it adds 0 to the count if reached before depth)
+#every backend returns the divide (nodes below each root ply) so a mismatch tells the ply to look at
+#backend "game" is the reference: it tries every (from_pos, slide) with Game.__move (__take + __slide), it is slow -> lower depth
+
+N_POSITIONS = 4
+DEPTH = 3
+REFERENCE_DEPTH = 3
+REPEAT = 3
+
+#numpy backend (minmax.py): board of 1/-1/0
+def perft_numpy(board: np.array, player: int, depth: int) -> int:
+    if depth == 0:
+        return 1
+    if eval_terminal_3_4(board, player)[0] != 0:
+        return 0
+    nodes = 0
+    for ply in possible_moves(board, player):
+        nodes += perft_numpy(make_ply(board, ply, player), -player, depth-1)
+    return nodes
+
+def divide_numpy(board: (int, int), player: int, depth: int) -> {(int, int, str): int}:
+    board = from_bitboard(board)
+    return {(ply[0], ply[1], ply[2].name): perft_numpy(make_ply(board, ply, player), -player, depth-1) for ply in possible_moves(board, player)}
+
+#bitboard backend (bitboard.py): (pos, neg) masks and move ids
+def perft_bb(board: (int, int), player: int, depth: int) -> int:
+    if depth == 0:
+        return 1
+    if eval_terminal_3_4_bb(board, player)[0] != 0:
+        return 0
+    nodes = 0
+    for m in possible_moves_bb(board, player):
+        nodes += perft_bb(make_ply_bb(board, m, player), -player, depth-1)
+    return nodes
+
+def divide_bb(board: (int, int), player: int, depth: int) -> {(int, int, str): int}:
+    return {(MOVES[m][0], MOVES[m][1], MOVES[m][2].name): perft_bb(make_ply_bb(board, m, player), -player, depth-1) for m in possible_moves_bb(board, player)}
+
+#reference backend: rules of Game (player ids 0/1, -1 neutral, from_pos is (x, y) = (col, row))
+def perft_game(game: Game, player_id: int, depth: int) -> int:
+    if depth == 0:
+        return 1
+    if game.check_winner() != -1:
+        return 0
+    nodes = 0
+    board = game._board.copy()
+    for x in range(5):
+        for y in range(5):
+            for slide in Move:
+                if game._Game__move((x, y), slide, player_id): #accepted -> board changed
+                    nodes += perft_game(game, 1 - player_id, depth-1)
+                    game._board = board.copy()
+    return nodes
+
+def to_game(board: (int, int)) -> Game:
+    game = Game()
+    board = from_bitboard(board)
+    game._board = np.where(board == 0, -1, board == 1).astype(np.int8)
+    return game
+
+def divide_game(board: (int, int), player: int, depth: int) -> {(int, int, str): int}:
+    game = to_game(board)
+    player_id = (player + 1) // 2
+    start = game._board.copy()
+    counts = {}
+    for x in range(5):
+        for y in range(5):
+            for slide in Move:
+                if game._Game__move((x, y), slide, player_id):
+                    counts[(y, x, slide.name)] = perft_game(game, 1 - player_id, depth-1)
+                    game._board = start.copy()
+    return counts
+
+BACKENDS = {
+    "numpy": divide_numpy,
+    "bitboard": divide_bb,
+    "game": divide_game,
+}
+
+#start position (empty board, player 1 to move) + seeded mid-game positions
+def reference_positions(n: int) -> [((int, int), int)]:
+    return [((0, 0), 1)] + mid_game_positions(n)
+
+def run_backend(divide: callable, positions: [((int, int), int)], depth: int, repeat: int) -> ([{(int, int, str): int}], float):
+    '''Divides of every position and best time over repeat runs'''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        divides = [divide(board, player, depth) for board, player in positions]
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return divides, best
+
+#plies with a different count (or missing in one of the two divides)
+def compare_divide(a: {(int, int, str): int}, b: {(int, int, str): int}) -> [str]:
+    return [f"{ply}: {a.get(ply)} != {b.get(ply)}" for ply in sorted(set(a) | set(b)) if a.get(ply) != b.get(ply)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="perft benchmark and move generation check against the rules of Game")
+    parser.add_argument("--positions", type=int, default=N_POSITIONS, help="seeded mid-game positions (plus the empty board)")
+    parser.add_argument("--depth", type=int, default=DEPTH)
+    parser.add_argument("--reference-depth", type=int, default=REFERENCE_DEPTH, help="depth of the game backend (cross-check)")
+    parser.add_argument("--backends", nargs="+", default=[b for b in BACKENDS if b != "game"], choices=[b for b in BACKENDS if b != "game"])
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timing is the best of repeat runs")
+    parser.add_argument("--json", type=str, default=None, help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    positions = reference_positions(args.positions)
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "positions": [{"pos": board[0], "neg": board[1], "player": player} for board, player in positions],
+        "depth": args.depth,
+        "reference_depth": args.reference_depth,
+        "repeat": args.repeat,
+        "backends": {},
+        "mismatches": [],
+    }
+
+    reference, elapsed = run_backend(BACKENDS["game"], positions, args.reference_depth, 1)
+    report["backends"]["game"] = {"depth": args.reference_depth, "nodes": [sum(d.values()) for d in reference], "seconds": elapsed}
+    print(f"game (reference): depth {args.reference_depth}, {sum(report['backends']['game']['nodes'])} nodes, {elapsed:.3f} s", file=sys.stderr)
+
+    for name in args.backends:
+        #check at the depth of the reference (same rules), then timing at depth
+        check, _ = run_backend(BACKENDS[name], positions, args.reference_depth, 1)
+        for p, (a, b) in enumerate(zip(check, reference)):
+            report["mismatches"] += [f"{name} position {p} depth {args.reference_depth} {diff}" for diff in compare_divide(a, b)]
+
+        divides, elapsed = run_backend(BACKENDS[name], positions, args.depth, args.repeat)
+        nodes = [sum(d.values()) for d in divides]
+        report["backends"][name] = {"depth": args.depth, "nodes": nodes, "seconds": elapsed, "nodes_per_second": sum(nodes) / elapsed}
+        print(f"{name}: depth {args.depth}, {sum(nodes)} nodes, {elapsed:.3f} s, {sum(nodes) / elapsed:.0f} nodes/s", file=sys.stderr)
+
+        #backends must agree at depth too
+        first = args.backends[0]
+        if name != first:
+            first_nodes = report["backends"][first]["nodes"]
+            report["mismatches"] += [f"{name} position {p} depth {args.depth}: {a} != {b} ({first})" for p, (a, b) in enumerate(zip(nodes, first_nodes)) if a != b]
+
+    for mismatch in report["mismatches"]:
+        print(f"MISMATCH {mismatch}", file=sys.stderr)
+
+    if args.json is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    sys.exit(1 if report["mismatches"] else 0)
@@ -0,0 +1,134 @@
+import os
+import random
+import time
+from game import Game, Move, Player
+from minmax import *
+from bitboard import alfabeta_iter_deep_bb, MOVES
+from transposition import TranspositionTable
+from search import alfabeta_iter_deep_tt, alfabeta_iter_deep_timed, alfabeta_iter_deep_pvs, move_budget
+from parallel_search import ParallelSearch
+from ordering import MoveOrdering
+from negamax import negamax_iter_deep
+from incremental import alfabeta_iter_deep_inplace
+from book import OpeningBook
+from prover import ThreatProver
+from params import set_heuristic_params
+
+#players of main.py without the gui (tkinter): imported by main.py and by the headless runners (match_runner.py,
+#selfplay.py, tuning.py, benches), DEBUG prints the boards and the moves (main.py turns it off after 10 games)
+
+DEBUG = True
+
+#files of the agent of the batch of main.py (and of match_runner.py, spec "main"): default outputs of book.py, tuning.py
+#and endgame.py next to main.py, whatever the working directory
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin") #used by the batch if built (python book.py)
+PARAMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "params.json") #tuned evaluation and tV used by the batch if present (python tuning.py)
+ENDGAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "endgame") #tables probed at the leaves by the batch if built (python endgame.py)
+
+
+class RandomPlayer(Player):
+    def __init__(self) -> None:
+        super().__init__()
+        self.policy = "random"
+        self.win = 0
+
+    def make_move(self, game: 'Game') -> tuple[tuple[int, int], Move]:
+        
+        if DEBUG:
+            print(game._board)
+
+        ply = random.choice(possible_moves(game.get_minmax_board(), game.get_minmax_player()))
+        
+        if DEBUG:
+            print(ply)
+
+        return (ply[1], ply[0]), ply[2] #inverted row col
+
+
+class MyPlayer(Player):
+    def __init__(self, min_depth: int, max_depth: int, tV: [int], bitboard: bool = False, tt: TranspositionTable = None, parallel: ParallelSearch = None, move_time: float = None, game_time: float = None, ordering: bool = False, pvs: bool = False, negamax: bool = False, book: OpeningBook = None, params: dict = None, inplace: bool = False, quiescence: int = 0, prover: ThreatProver = None) -> None:
+        super().__init__()
+        self.policy = "minmax with alphabeta,iterative deepening,transposition tables"
+        self.win = 0
+        if tt is None and (move_time is not None or ordering or pvs or negamax):
+            raise ValueError("move_time, ordering, pvs and negamax search the transposition table: tt is required")
+        if quiescence > 0 and (tt is not None or bitboard or parallel is not None):
+            raise ValueError("quiescence is an extension of the numpy alfabeta (inplace or not): not available with tt, bitboard or parallel")
+        if game_time is not None and move_time is None:
+            raise ValueError("game_time is shared among the moves by the budget of move_time: move_time is required")
+        self._min_depth = min_depth
+        self._max_depth = max_depth
+        self._tV = tV
+        self._bitboard = bitboard #same results of numpy backend, faster
+        self._tt = tt #bounded transposition table (bitboard backend), can be shared between players
+        self._parallel = parallel #root-split search on a pool of processes with shared transposition table (experimental, see parallel_search.py)
+        self._move_time = move_time #seconds per move, max_depth is still an upper limit
+        self._clock = game_time #remaining seconds for the whole game (optional, requires move_time)
+        self._mo = MoveOrdering() if ordering or pvs else None #tt move, killer moves, history heuristic
+        self._pvs = pvs #principal variation search with aspiration windows
+        self._negamax = negamax #negamax_iter_deep with move ordering (SearchResult with the principal variation)
+        if negamax and self._mo is None:
+            self._mo = MoveOrdering()
+        self._book = book #opening book (book.py) checked before searching
+        self._params = params #evaluation and tV (params.py) used by this player, None: default evaluation and tV above
+        if params is not None:
+            self._tV = params["tV"]
+        self._inplace = inplace #numpy backend: make/unmake on one board (incremental.py) instead of a copy per child
+        self._quiescence = quiescence #plies of the quiescence extension at the leaves (numpy backend only: alfabeta, inplace)
+        self._prover = prover #forced win prover (prover.py) called before searching (after the book)
+        self.last_score = None #score (for the player to move) and depth of the last move, read by selfplay.py
+        self.last_depth = None
+
+    def make_move(self, game: 'Game') -> tuple[tuple[int, int], Move]:
+        
+        if DEBUG:
+            print(game._board)
+
+        start = time.perf_counter() #book, prover and search are charged to the clock and to the budget of move_time
+        deadline = start + move_budget(self._move_time, self._clock) if self._move_time is not None else None
+        set_heuristic_params(self._params) #None: default evaluation, not the one of the last player
+
+        ply = None
+        if self._book is not None:
+            found = self._book.probe(game.get_bitboard(), game.get_minmax_player())
+            if found is not None:
+                ply, val, d = MOVES[found[0]], found[1], self._book.depth
+
+        if ply is None and self._prover is not None:
+            found = self._prover.prove(game.get_minmax_board(), game.get_minmax_player(), deadline)
+            if found is not None: #win in found[1] plies of the player: 2*found[1]-1 plies
+                ply, val, d = found[0], MAX_INT, 2*found[1] - 1
+
+        if ply is None:
+            ply, val, d = self._search(game, deadline)
+
+        self.last_score, self.last_depth = val, d
+        if self._clock is not None:
+            self._clock -= time.perf_counter() - start
+
+        if DEBUG:
+            print(ply)
+
+        return (ply[1], ply[0]), ply[2] #inverted row col
+
+    def _search(self, game: 'Game', deadline: float) -> ((int, int, Move), float, int):
+        '''Move, score and depth of the search selected by the flags of __init__ (deadline: end of the budget of move_time)'''
+        if self._move_time is not None: #what is left of the budget (clock share already in deadline)
+            return alfabeta_iter_deep_timed(game.get_bitboard(), game.get_minmax_player(), self._min_depth, self._max_depth, self._tV, self._tt, max(0, deadline - time.perf_counter()), None, self._mo)
+        elif self._negamax:
+            result = negamax_iter_deep(game.get_bitboard(), game.get_minmax_player(), self._min_depth, self._max_depth, self._tV, self._tt, self._mo)
+            return result.move, result.score, result.depth
+        elif self._pvs:
+            return alfabeta_iter_deep_pvs(game.get_bitboard(), game.get_minmax_player(), self._min_depth, self._max_depth, self._tV, self._tt, self._mo)
+        elif self._parallel is not None:
+            return self._parallel.iter_deep(game.get_bitboard(), game.get_minmax_player(), self._min_depth, self._max_depth, self._tV)
+        elif self._tt is not None:
+            return alfabeta_iter_deep_tt(game.get_bitboard(), game.get_minmax_player(), self._min_depth, self._max_depth, self._tV, self._tt, self._mo)
+        elif self._bitboard:
+            return alfabeta_iter_deep_bb(game.get_bitboard(), game.get_minmax_player(), self._min_depth, self._max_depth, self._tV)
+        elif self._inplace:
+            set_quiescence(self._quiescence)
+            return alfabeta_iter_deep_inplace(game.get_minmax_board(), game.get_minmax_player(), self._min_depth, self._max_depth, self._tV)
+        else:
+            set_quiescence(self._quiescence)
+            return alfabeta_iter_deep(game.get_minmax_board(), game.get_minmax_player(), self._min_depth, self._max_depth, self._tV)
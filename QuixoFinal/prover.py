@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+
+from game import Move #original enum
+from minmax import MAX_INT, possible_moves, expand_children, eval_children, wins_next
+
+#forced win prover (threat-space search): the attacker plays only plies that win or leave it a line to complete at its
+#next ply (threats), the defender plays every ply -> a win in at most n plies of the attacker (2n-1 plies) is proved
+#without the full width of alfabeta at the attacker nodes; every defender reply is checked, so a proof is a forced win
+#(what it misses: wins whose attacker plies are not all threats)
+#NOTE: most defender nodes are solved in batch: replies that already lose, then the attacker completions of all the
+#replies with one wins_next call (mate in 1 of the attacker after each reply), recursion only for the other replies
+
+MAX_MOVES = 3 #longest win searched: plies of the attacker (3 -> 5 plies, depth 5 of alfabeta)
+MAX_NODES = 2000 #attacker and defender nodes of one prove call, the search gives up after them
+
+
+class ProofAborted(Exception):
+    '''Raised inside the search when the node budget is exhausted or the deadline is passed'''
+    pass
+
+
+class ThreatProver(object):
+    '''Threat-space search of a forced win for the player to move, called by MyPlayer before the search'''
+
+    def __init__(self, max_moves: int = MAX_MOVES, max_nodes: int = MAX_NODES) -> None:
+        self.max_moves = max_moves
+        self.max_nodes = max_nodes
+        self._disproved = {} #(board bytes, defender to move, attacker plies left) not won within the threats, one prove call
+        self.nodes = 0 #of the last prove call
+        self._deadline = None #time.perf_counter() value of the running prove call (None: no limit)
+        self.calls = 0
+        self.proved = 0
+        self.aborted = 0
+
+    def _count(self) -> None:
+        self.nodes += 1
+        if self.nodes > self.max_nodes or (self._deadline is not None and time.perf_counter() >= self._deadline):
+            raise ProofAborted()
+
+    #first ply of a win in at most n plies of player (to move), None if not found
+    def _attack(self, board: np.array, player: int, n: int) -> (int, int, Move):
+        self._count()
+        possible = possible_moves(board, player)
+        children = expand_children(board, player, possible)
+        val, _ = eval_children(children, -player) #for the defender: -MAX_INT only the attacker has a line
+        wins = np.flatnonzero(val == -MAX_INT)
+        if len(wins) > 0:
+            return possible[wins[0]]
+        if n == 1:
+            return None
+        #threats: no line of the defender, a line the attacker completes at its next ply
+        threats = np.flatnonzero(val == 0)
+        threats = threats[wins_next(children[threats], player)]
+        for k in threats.tolist():
+            if self._defend(children[k].reshape(5, 5), player, n-1):
+                return possible[k]
+        return None
+
+    #every reply of the defender (-player, to move) loses in at most n plies of the attacker player
+    def _defend(self, board: np.array, player: int, n: int) -> bool:
+        key = (bytes(board), n)
+        if key in self._disproved:
+            return False
+        self._count()
+        proved = self._replies(board, player, n)
+        if not proved:
+            self._disproved[key] = True
+        return proved
+
+    def _replies(self, board: np.array, player: int, n: int) -> bool:
+        if wins_next(board.reshape(1, 25), -player)[0]:
+            return False
+        possible = possible_moves(board, -player)
+        children = expand_children(board, -player, possible)
+        val, _ = eval_children(children, player) #for the attacker (to move): MAX_INT the reply completed a line of the attacker
+        if (val == -MAX_INT).any():
+            return False
+        open_replies = np.flatnonzero(val == 0)
+        open_replies = open_replies[~wins_next(children[open_replies], player)] #replies not answered by a completion
+        if len(open_replies) > 0 and n == 1:
+            return False
+        for k in open_replies.tolist():
+            if self._attack(children[k].reshape(5, 5), player, n) is None:
+                return False
+        return True
+
+    def prove(self, board: np.array, player: int, deadline: float = None) -> ((int, int, Move), int):
+        '''(first ply, plies of player) of the shortest forced win found in at most max_moves plies of player, None if not found
+        (or if time.perf_counter() reaches deadline)'''
+        self.calls += 1
+        self.nodes = 0
+        self._deadline = deadline
+        self._disproved.clear()
+        try:
+            for n in range(1, self.max_moves+1):
+                ply = self._attack(board, player, n)
+                if ply is not None:
+                    self.proved += 1
+                    return ply, n
+        except ProofAborted:
+            self.aborted += 1
+        finally:
+            self._disproved.clear()
+        return None
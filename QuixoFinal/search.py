@@ -0,0 +1,243 @@
+import time
+from game import Move #original enum
+from minmax import MAX_INT
+from bitboard import *
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+from zobrist import zobrist_hash, make_ply_zobrist, canonical_key_zobrist
+from ordering import MoveOrdering
+import params
+
+#searches on the bitboard backend using a bounded TranspositionTable instead of state_cache
+#values returned are from the point of view of the player to move (at the root the root player, as alfabeta)
+
+class SearchTimeout(Exception):
+    '''Raised inside the search when search_deadline is passed: the running iteration is dropped'''
+    pass
+
+#time.perf_counter() value after which negamax aborts (None: no limit), set by alfabeta_iter_deep_timed
+search_deadline = None
+#nodes visited by negamax (reset by the caller to measure a search)
+search_nodes = 0
+#SearchStats updated by negamax and the iterative deepening searches (None: no instrumentation, see stats.py)
+search_stats = None
+#EndgameTable probed at the leaves by negamax (None: no probe, see endgame.py)
+endgame = None
+
+#null window width: default scores are multiples of 1/300 (count/5, count/25, positional/60), EPS keeps only float rounding apart
+#(with other params.py weights a score closer than EPS to alfa is only re-searched)
+PVS_EPS = 1e-6
+
+#negamax search, the core of every search on this backend (alfabeta_iter_deep_tt/timed/pvs, negamax_iter_deep, ParallelSearch):
+#every score is from the point of view of the player to move, the table stores the score as returned (no sign flips)
+#NOTE: table probed/stored once per node with the bound given by the window (alpha-beta with memory)
+#h is the zobrist hash of board (updated incrementally by make_ply_zobrist), the table key is the canonical zobrist key
+#with mo the children are visited in the order given by MoveOrdering (ply = distance from the root), otherwise by possible_moves_bb
+#with pvs it is a principal variation search (NegaScout): the first child gets the full window, the others a null window
+#that only proves they are not better, re-searched with the full window when they are
+#NOTE: described in "Principal Variation Search" on chessprogramming.org, fail-soft version
+def negamax(board: (int, int), h: int, player: int, depth: int, alfa: float, beta: float, tt: TranspositionTable, mo: MoveOrdering = None, ply: int = 0, pvs: bool = False) -> (int, float):
+    global search_nodes
+    search_nodes += 1
+    if search_stats is not None:
+        search_stats.nodes += 1
+
+    val, count = eval_terminal_3_4_bb(board, player)
+    if val != 0:
+        if search_stats is not None:
+            search_stats.terminal += 1
+        return None, val
+
+    if depth == 0:
+        if endgame is not None:
+            solved = endgame.probe(board, player)
+            if solved is not None:
+                return None, solved
+        return None, heuristic_score_bb(board, player, count)
+
+    if search_deadline is not None and time.perf_counter() >= search_deadline: #only interior nodes (leaves are cheap)
+        raise SearchTimeout()
+
+    key, simm = canonical_key_zobrist(h, player)
+
+    entry = tt.probe(key)
+    if search_stats is not None:
+        if entry is None:
+            search_stats.cache_misses += 1
+        else:
+            search_stats.cache_hits += 1
+    tt_move = None
+    if entry is not None:
+        tt_move = MOVE_SIMM_INV[simm][entry[4]]
+        if entry[1] >= depth:
+            if entry[3] == EXACT:
+                return tt_move, entry[2]
+            if entry[3] == LOWER:
+                alfa = max(alfa, entry[2])
+            else:
+                beta = min(beta, entry[2])
+            if alfa >= beta:
+                return tt_move, entry[2]
+
+    possible = possible_moves_bb(board, player)
+    if len(possible)==0:
+        return None, 0
+
+    alfa_start = alfa
+    best_move = None
+    best_val = -MAX_INT-1
+    for i, m in enumerate(possible if mo is None else mo.order(possible, tt_move, ply, player)):
+        new_board, new_h = make_ply_zobrist(board, h, m, player)
+        if pvs and best_move is not None:
+            _, val = negamax(new_board, new_h, -player, depth-1, -alfa - PVS_EPS, -alfa, tt, mo, ply+1, pvs)
+            if alfa < -val < beta: #better than the principal variation: real value needed
+                _, val = negamax(new_board, new_h, -player, depth-1, -beta, -alfa, tt, mo, ply+1, pvs)
+        else:
+            _, val = negamax(new_board, new_h, -player, depth-1, -beta, -alfa, tt, mo, ply+1, pvs)
+        val = -val
+        if val > best_val:
+            best_move, best_val = m, val
+            if val > alfa:
+                alfa = val
+                if alfa >= beta:
+                    if mo is not None:
+                        mo.cutoff(m, depth, ply, player)
+                    if search_stats is not None:
+                        search_stats.cutoffs[i] += 1
+                    break
+
+    if best_val <= alfa_start:
+        bound = UPPER
+    elif best_val >= beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    tt.store(key, depth, best_val, bound, MOVE_SIMM[simm][best_move])
+
+    return best_move, best_val
+
+
+#with mo the children are ordered by MoveOrdering, otherwise by possible_moves_bb
+def alfabeta_iter_deep_tt(board: (int, int), player: int, min_depth: int, max_depth: int, tV: [int], tt: TranspositionTable, mo: MoveOrdering = None) -> ((int, int, Move), float, int):
+
+    tt.new_search(params.evaluation)
+    if mo is not None:
+        mo.new_search()
+    h = zobrist_hash(board)
+    overwrites = tt.overwrites
+    t = 0
+    for d in range(min_depth, max_depth+1):
+
+        if search_stats is not None:
+            nodes, start = search_stats.nodes, time.perf_counter()
+        m, val = negamax(board, h, player, d, -MAX_INT, MAX_INT, tt, mo)
+        if search_stats is not None:
+            search_stats.iteration(d, search_stats.nodes - nodes, time.perf_counter() - start)
+        if val >= tV[t]:
+            if search_stats is not None:
+                search_stats.cache_deletes += tt.overwrites - overwrites
+                search_stats.end_search()
+            return MOVES[m], val , d
+        t += 1
+
+    assert False, "return val mus be > -MAX_INT"
+
+
+#expected growth of the search time from one depth to the next one (used to not start an iteration that cannot end in time)
+ITER_GROWTH = 6
+#moves still to play assumed when the budget comes from the game clock
+MOVES_TO_GO = 20
+
+def move_budget(move_time: float, clock: float = None) -> float:
+    '''Time for the next move: move_time, reduced to a share of the remaining game clock if any'''
+    if clock is None:
+        return move_time
+    return max(0, min(move_time, clock / MOVES_TO_GO))
+
+#iterative deepening with a time budget (seconds): returns the result of the last completed iteration,
+#an iteration that runs out of time is aborted (entries of completed subtrees stay valid in the table)
+#NOTE: the first iteration (min_depth) is always completed so a move is always available
+def alfabeta_iter_deep_timed(board: (int, int), player: int, min_depth: int, max_depth: int, tV: [int], tt: TranspositionTable, move_time: float, clock: float = None, mo: MoveOrdering = None) -> ((int, int, Move), float, int):
+    global search_deadline
+
+    start = time.perf_counter()
+    deadline = start + move_budget(move_time, clock)
+    tt.new_search(params.evaluation)
+    if mo is not None:
+        mo.new_search()
+    h = zobrist_hash(board)
+    overwrites = tt.overwrites
+    best = None
+    t = 0
+    for d in range(min_depth, max_depth+1):
+
+        iter_start = time.perf_counter()
+        if best is not None:
+            if iter_start + (iter_start - last_start) * ITER_GROWTH > deadline: #next iteration would not end in time
+                break
+            search_deadline = deadline
+        if search_stats is not None:
+            nodes = search_stats.nodes
+        try:
+            m, val = negamax(board, h, player, d, -MAX_INT, MAX_INT, tt, mo)
+        except SearchTimeout: #nodes of the aborted iteration stay in the counters, no iteration row
+            break
+        finally:
+            search_deadline = None
+        if search_stats is not None:
+            search_stats.iteration(d, search_stats.nodes - nodes, time.perf_counter() - iter_start)
+        last_start = iter_start
+
+        best = (MOVES[m], val, d)
+        if val >= tV[t]:
+            break
+        t += 1
+
+    if search_stats is not None:
+        search_stats.cache_deletes += tt.overwrites - overwrites
+        search_stats.end_search()
+    return best
+
+
+#half width of the aspiration window around the score of the previous iteration
+ASPIRATION_DELTA = 0.25
+
+#iterative deepening of negamax with pvs: every iteration starts from a window centred on the score of the iteration with the
+#same parity (the heuristic favours the player who moved last: d-1 and d scores differ a lot), widened to -MAX_INT
+#(fail low) or MAX_INT (fail high) when the score falls outside
+def alfabeta_iter_deep_pvs(board: (int, int), player: int, min_depth: int, max_depth: int, tV: [int], tt: TranspositionTable, mo: MoveOrdering, aspiration: bool = True) -> ((int, int, Move), float, int):
+
+    tt.new_search(params.evaluation)
+    mo.new_search()
+    h = zobrist_hash(board)
+    overwrites = tt.overwrites
+    scores = {}
+    t = 0
+    for d in range(min_depth, max_depth+1):
+
+        if search_stats is not None: #one row per depth, re-searches of the aspiration window included
+            nodes, start = search_stats.nodes, time.perf_counter()
+        prev = scores.get(d-2)
+        if aspiration and prev is not None and abs(prev) < MAX_INT:
+            alfa, beta = prev - ASPIRATION_DELTA, prev + ASPIRATION_DELTA
+        else:
+            alfa, beta = -MAX_INT, MAX_INT
+        while True:
+            m, val = negamax(board, h, player, d, alfa, beta, tt, mo, 0, True)
+            if val <= alfa and alfa > -MAX_INT:
+                alfa = -MAX_INT
+            elif val >= beta and beta < MAX_INT:
+                beta = MAX_INT
+            else:
+                break
+        scores[d] = val
+        if search_stats is not None:
+            search_stats.iteration(d, search_stats.nodes - nodes, time.perf_counter() - start)
+
+        if val >= tV[t]:
+            if search_stats is not None:
+                search_stats.cache_deletes += tt.overwrites - overwrites
+                search_stats.end_search()
+            return MOVES[m], val , d
+        t += 1
+
+    assert False, "return val mus be > -MAX_INT"
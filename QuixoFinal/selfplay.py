@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import random
+import struct
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import tqdm
+from tqdm import tqdm
+
+from game import Game
+from bitboard import possible_moves_bb, MOVES, MOVE_ID
+from transposition import TranspositionTable
+import match_runner
+from match_runner import init_worker, make_player, DEFAULT_AGENT, RANDOM
+
+#self-play corpus: every position of seeded games between two player specs (same specs of match_runner.py) with the move
+#played, the score of the search and the final outcome, for training/tuning of the evaluation
+#corpus = directory with manifest.json (parameters of the run) + one file per chunk of games chunk_<first game>.bin
+#(header + fixed size records), every chunk is written to a temporary file and renamed: a chunk file exists only if complete
+#-> a run stopped at any point is resumed by playing only the missing chunks (same seeds -> same games)
+#memory: a worker holds the records of one chunk, the parent writes them and drops them
+
+CORPUS_MAGIC = b"QXSP"
+CORPUS_VERSION = 1
+CHUNK_HEADER = struct.Struct("<4sIIII") #magic, version, records, first game, games
+#board before the move as (pos, neg) masks, player to move (1/-1), move id (bitboard.MOVES), depth of the search (0: no search),
+#outcome for the player to move (1 won, -1 lost, 0 game stopped at max_plies), score of the search for the player to move (nan: no search)
+RECORD_DTYPE = np.dtype([("pos", "<u4"), ("neg", "<u4"), ("player", "i1"), ("move", "u1"), ("depth", "u1"), ("outcome", "i1"),
+                         ("score", "<f4"), ("game", "<u4"), ("ply", "<u2")])
+
+N_GAMES = 1000
+CHUNK_SIZE = 50
+TT_BYTES = 64 * 2**20
+RANDOM_PLIES = 4 #first plies of every game played at random: deterministic players do not play always the same game
+MAX_PLIES = 300 #longer games are stopped (outcome 0), two searching players can repeat positions forever
+
+#game played ply by ply to record every position, players[0] moves first (random plies use the state of random)
+def record_game(game: int, players: ('Player', 'Player'), random_plies: int = RANDOM_PLIES, max_plies: int = MAX_PLIES) -> np.ndarray:
+    g = Game()
+    rows = []
+    winner = -1
+    for ply in range(max_plies):
+        g.current_player_idx = ply % 2 #player 0 moves first, as in Game.play
+        board, player = g.get_bitboard(), g.get_minmax_player()
+        if ply < random_plies:
+            m = random.choice(possible_moves_bb(board, player))
+            score, depth = None, None
+        else:
+            p = players[g.current_player_idx]
+            from_pos, slide = p.make_move(g)
+            m = MOVE_ID[(from_pos[1], from_pos[0], slide)] #inverted row col
+            score, depth = getattr(p, "last_score", None), getattr(p, "last_depth", None) #only MyPlayer searches
+        ok = g._Game__move((MOVES[m][1], MOVES[m][0]), MOVES[m][2], g.current_player_idx)
+        assert ok, f"game {game}: illegal move {MOVES[m]}"
+        rows.append((board[0], board[1], player, m, depth or 0, 0, np.nan if score is None else score, game, ply))
+        winner = g.check_winner()
+        if winner >= 0:
+            break
+
+    records = np.array(rows, dtype=RECORD_DTYPE)
+    if winner >= 0:
+        records["outcome"] = np.where(records["player"] == winner*2 - 1, 1, -1)
+    return records
+
+#same match of match_runner.play_game (seed, agent is player 0 on even games)
+def play_recorded(game: int, agent: tuple, opponent: tuple, tt: TranspositionTable, random_plies: int = RANDOM_PLIES, max_plies: int = MAX_PLIES) -> np.ndarray:
+    random.seed(game+1)
+    if game%2 == 0:
+        players = (make_player(agent, tt), make_player(opponent, tt))
+    else:
+        players = (make_player(opponent, tt), make_player(agent, tt))
+    return record_game(game, players, random_plies, max_plies)
+
+def play_chunk(args: (range, tuple, tuple, int, int)) -> (int, int, np.ndarray):
+    games, agent, opponent, random_plies, max_plies = args
+    match_runner._worker_tt.clear()
+    records = np.concatenate([play_recorded(game, agent, opponent, match_runner._worker_tt, random_plies, max_plies) for game in games])
+    return games.start, len(games), records
+
+def chunk_path(path: str, first: int) -> str:
+    return os.path.join(path, f"chunk_{first:09d}.bin")
+
+def write_chunk(path: str, first: int, n_games: int, records: np.ndarray) -> None:
+    tmp = chunk_path(path, first) + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(CHUNK_HEADER.pack(CORPUS_MAGIC, CORPUS_VERSION, len(records), first, n_games))
+        f.write(records.tobytes())
+    os.replace(tmp, chunk_path(path, first))
+
+def chunk_games(path: str, first: int) -> int:
+    '''Games in the chunk file starting at game first (0 if not written yet)'''
+    if not os.path.exists(chunk_path(path, first)):
+        return 0
+    with open(chunk_path(path, first), "rb") as f:
+        return CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))[4]
+
+def read_chunk(file: str) -> np.ndarray:
+    '''Records of a chunk file (memory-mapped)'''
+    with open(file, "rb") as f:
+        magic, version, n, _, _ = CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+    assert magic == CORPUS_MAGIC and version == CORPUS_VERSION, f"{file} is not a self-play chunk (version {CORPUS_VERSION})"
+    if n == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(file, dtype=RECORD_DTYPE, mode="r", offset=CHUNK_HEADER.size, shape=(n,))
+
+def iter_corpus(path: str) -> np.ndarray:
+    '''Records of the corpus one chunk at a time, in order of game'''
+    for name in sorted(os.listdir(path)):
+        if name.startswith("chunk_") and name.endswith(".bin"):
+            yield read_chunk(os.path.join(path, name))
+
+def load_corpus(path: str, fields: [str] = None) -> np.ndarray:
+    '''All the records of the corpus in memory (only the columns in fields, if given)'''
+    chunks = [chunk if fields is None else chunk[fields] for chunk in iter_corpus(path)]
+    if not chunks:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.concatenate(chunks)
+
+def generate(path: str, n_games: int, agent: tuple = DEFAULT_AGENT, opponent: tuple = RANDOM, n_workers: int = None, chunk_size: int = CHUNK_SIZE, tt_bytes: int = TT_BYTES, random_plies: int = RANDOM_PLIES, max_plies: int = MAX_PLIES, progress: bool = True) -> (int, int):
+    '''Plays the games of the corpus not already on disk, returns (games, records) written by this call'''
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    os.makedirs(path, exist_ok=True)
+
+    #a corpus is resumed only with the same parameters (n_games can grow: new chunks are appended)
+    manifest = {"agent": list(agent), "opponent": list(opponent), "chunk_size": chunk_size, "random_plies": random_plies, "max_plies": max_plies}
+    manifest_file = os.path.join(path, "manifest.json")
+    total = n_games
+    if os.path.exists(manifest_file):
+        with open(manifest_file) as f:
+            old = json.load(f)
+        total = max(n_games, old.pop("games"))
+        assert old == manifest, f"{path} was generated with different parameters: {old}"
+    manifest["games"] = total
+    with open(manifest_file, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    #missing chunks, and the last chunk of a smaller run if it has less games than now
+    chunks = [(range(start, min(start + chunk_size, n_games)), agent, opponent, random_plies, max_plies)
+              for start in range(0, n_games, chunk_size) if chunk_games(path, start) < min(chunk_size, n_games - start)]
+
+    games = 0
+    records = 0
+    with Pool(n_workers, initializer=init_worker, initargs=(tt_bytes,)) as pool:
+        progress_bar = tqdm(total=sum(len(c[0]) for c in chunks), desc="self-play", disable=not progress)
+        for first, n, chunk in pool.imap_unordered(play_chunk, chunks):
+            write_chunk(path, first, n, chunk)
+            games += n
+            records += len(chunk)
+            progress_bar.update(n)
+            progress_bar.set_description(f"self-play: {records} positions")
+        progress_bar.close()
+
+    return games, records
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="self-play games recorded position by position (resumable corpus on disk)")
+    parser.add_argument("--out", type=str, default="selfplay")
+    parser.add_argument("--games", type=int, default=N_GAMES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="games per chunk file (unit of work and of resume)")
+    parser.add_argument("--tt-mb", type=int, default=TT_BYTES // 2**20, help="transposition table size of each worker (MB)")
+    parser.add_argument("--opponent", choices=["random", "agent", "test"], default="agent", help="opponent of the minmax agent of main")
+    parser.add_argument("--random-plies", type=int, default=RANDOM_PLIES)
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES)
+    args = parser.parse_args()
+
+    opponent = {"random": RANDOM, "agent": DEFAULT_AGENT, "test": ("test",) + DEFAULT_AGENT[1:]}[args.opponent]
+    start = time.perf_counter()
+    games, records = generate(args.out, args.games, DEFAULT_AGENT, opponent, args.workers, args.chunk, args.tt_mb * 2**20, args.random_plies, args.max_plies)
+    elapsed = time.perf_counter() - start
+
+    corpus = load_corpus(args.out, ["game", "ply", "outcome"])
+    finished = corpus["outcome"] != 0
+    print(f"{args.out}: {games} games ({records} positions) played in {elapsed:.1f} s, corpus {len(np.unique(corpus['game']))} games, "
+          f"{len(corpus)} positions ({len(corpus) * RECORD_DTYPE.itemsize} bytes), {(corpus['ply'][~finished] == 0).sum()} games stopped at {args.max_plies} plies")
@@ -0,0 +1,133 @@
+import csv
+import json
+
+import minmax
+import search
+from bitboard import MOVES
+
+#opt-in instrumentation of every search: alfabeta (also with make/unmake), alfabeta_bb (state_cache backends) and negamax (table
+#backend) with all their iterative deepening versions and ParallelSearch (stats of the workers merged by the parent):
+#the searches update the SearchStats set with set_search_stats, nothing is counted when it is None
+#NOTE: cache counters are state_cache lookups for alfabeta/alfabeta_bb, table probes for negamax
+#(deletes are the entries of the table replaced by a store: TranspositionTable.overwrites during the search)
+
+#upper limits (ms) of the bins of the time per move histogram, last bin is everything above
+TIME_BINS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+class SearchStats(object):
+    '''Counters of all the searches run while active, plus one row (search, depth, nodes, seconds) per iteration of iterative deepening'''
+
+    def __init__(self) -> None:
+        self.nodes = 0
+        self.terminal = 0 #nodes cut by eval_terminal_3_4 (complete line)
+        self.quiescence = 0 #nodes of the quiescence extension of alfabeta (blocks searched below the leaves, counted in nodes too)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_deletes = 0
+        self.cutoffs = [0] * len(MOVES) #beta cutoffs by index of the move (in the order the children are visited)
+        self.iterations = []
+        self.searches = 0
+
+    def iteration(self, depth: int, nodes: int, seconds: float) -> None:
+        self.iterations.append((self.searches, depth, nodes, seconds))
+
+    def end_search(self) -> None:
+        self.searches += 1
+
+    def search_times(self) -> [float]:
+        '''Seconds of every search (sum of its iterations)'''
+        times = [0.0] * self.searches
+        for s, _, _, seconds in self.iterations:
+            if s < self.searches:
+                times[s] += seconds
+        return times
+
+    #nodes of each iteration over nodes of the previous one of the same search (None for the first iteration)
+    def branching(self) -> [float]:
+        ratios = []
+        for k, (s, _, nodes, _) in enumerate(self.iterations):
+            if k > 0 and self.iterations[k-1][0] == s and self.iterations[k-1][2] > 0:
+                ratios.append(nodes / self.iterations[k-1][2])
+            else:
+                ratios.append(None)
+        return ratios
+
+    def ebf(self) -> float:
+        '''Effective branching factor: mean growth of the nodes from one iteration to the next one'''
+        ratios = [r for r in self.branching() if r is not None]
+        return sum(ratios) / len(ratios) if ratios else 0.0
+
+    def time_histogram(self) -> [int]:
+        '''Searches per bin of TIME_BINS_MS (len(TIME_BINS_MS) + 1 bins)'''
+        histogram = [0] * (len(TIME_BINS_MS) + 1)
+        for seconds in self.search_times():
+            b = 0
+            while b < len(TIME_BINS_MS) and seconds * 1000 > TIME_BINS_MS[b]:
+                b += 1
+            histogram[b] += 1
+        return histogram
+
+    def merge(self, other: 'SearchStats') -> None:
+        '''Adds the counters and the iterations of other (e.g. stats of a worker process)'''
+        self.nodes += other.nodes
+        self.terminal += other.terminal
+        self.quiescence += other.quiescence
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        self.cache_deletes += other.cache_deletes
+        self.cutoffs = [a + b for a, b in zip(self.cutoffs, other.cutoffs)]
+        self.iterations += [(s + self.searches, depth, nodes, seconds) for s, depth, nodes, seconds in other.iterations]
+        self.searches += other.searches
+
+    def summary(self) -> dict:
+        lookups = self.cache_hits + self.cache_misses
+        times = self.search_times()
+        depths = {}
+        for _, depth, nodes, seconds in self.iterations:
+            n, t, count = depths.get(depth, (0, 0.0, 0))
+            depths[depth] = (n + nodes, t + seconds, count + 1)
+        return {
+            "searches": self.searches,
+            "nodes": self.nodes,
+            "nodes_per_search": self.nodes / self.searches if self.searches else 0,
+            "terminal": self.terminal,
+            "quiescence": self.quiescence,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_deletes": self.cache_deletes,
+            "cache_hit_rate": self.cache_hits / lookups if lookups else 0,
+            "cutoffs_by_move_index": self.cutoffs,
+            "ebf": self.ebf(),
+            "seconds": sum(times),
+            "time_histogram_ms": {"bins": TIME_BINS_MS, "searches": self.time_histogram()},
+            "iterations_by_depth": {d: {"iterations": c, "nodes": n, "seconds": t} for d, (n, t, c) in sorted(depths.items())},
+        }
+
+    def to_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "iterations": [list(row) for row in self.iterations]}, f, indent=2)
+
+    def to_csv(self, path: str) -> None:
+        '''One row per iteration'''
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["search", "depth", "nodes", "seconds", "branching"])
+            for row, ratio in zip(self.iterations, self.branching()):
+                writer.writerow(list(row) + ["" if ratio is None else ratio])
+
+    def export(self, path: str) -> None:
+        '''CSV if path ends with .csv, JSON otherwise'''
+        if path.endswith(".csv"):
+            self.to_csv(path)
+        else:
+            self.to_json(path)
+
+    def __str__(self) -> str:
+        lookups = self.cache_hits + self.cache_misses
+        return (f"{self.searches} searches, {self.nodes} nodes, {self.terminal} terminal, "
+                f"cache {self.cache_hits}/{lookups} hits {self.cache_deletes} deletes, ebf {self.ebf():.2f}")
+
+def set_search_stats(stats: SearchStats) -> None:
+    '''Activates stats for the searches of this process (None: instrumentation off)'''
+    minmax.search_stats = stats
+    search.search_stats = stats
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from minmax import MAX_INT, alfabeta_iter_deep, state_cache
+from bitboard import possible_moves_bb, make_ply_bb, eval_terminal_3_4_bb, from_bitboard, alfabeta_iter_deep_bb, state_cache_bb
+from transposition import TranspositionTable
+from ordering import MoveOrdering
+from search import alfabeta_iter_deep_tt, alfabeta_iter_deep_pvs
+from negamax import negamax_iter_deep
+from incremental import alfabeta_iter_deep_inplace
+from endgame import EndgameTable, set_endgame, build_tables
+
+#every search probes the endgame tables at its leaves (python -m pytest test_endgame.py): with a table set all of them
+#return the same value, different from the one of the heuristic
+
+DEPTH = 2
+MIN_PIECES = 20
+
+class DrawTable(EndgameTable):
+    '''Every position with at least min_pieces non-neutral tiles is a draw (probe/probe_board of EndgameTable on top)'''
+
+    def __init__(self, min_pieces: int) -> None:
+        self.min_pieces = min_pieces
+        self.hits = 0
+
+    def probe_masks(self, mine: int, theirs: int) -> int:
+        if (mine | theirs).bit_count() < self.min_pieces:
+            return None
+        self.hits += 1
+        return 0
+
+def full_positions(n: int) -> [((int, int), int)]:
+    '''Positions (not terminal) of seeded random games with MIN_PIECES-1 non-neutral tiles: leaves of the search reach MIN_PIECES'''
+    positions = []
+    game = 0
+    while len(positions) < n:
+        random.seed(game+1)
+        board = (0, 0)
+        player = 1
+        while (board[0] | board[1]).bit_count() < MIN_PIECES-1 and eval_terminal_3_4_bb(board, player)[0] == 0:
+            board = make_ply_bb(board, random.choice(possible_moves_bb(board, player)), player)
+            player = -player
+        if eval_terminal_3_4_bb(board, player)[0] == 0:
+            positions.append((board, player))
+        game += 1
+    return positions
+
+SEARCHES = {
+    "alfabeta": lambda b, p: alfabeta_iter_deep(from_bitboard(b), p, DEPTH, DEPTH, [-MAX_INT])[1],
+    "alfabeta_bb": lambda b, p: alfabeta_iter_deep_bb(b, p, DEPTH, DEPTH, [-MAX_INT])[1],
+    "alfabeta_inplace": lambda b, p: alfabeta_iter_deep_inplace(from_bitboard(b), p, DEPTH, DEPTH, [-MAX_INT])[1],
+    "negamax": lambda b, p: alfabeta_iter_deep_tt(b, p, DEPTH, DEPTH, [-MAX_INT], TranspositionTable(2**20))[1],
+    "negamax+ordering": lambda b, p: alfabeta_iter_deep_tt(b, p, DEPTH, DEPTH, [-MAX_INT], TranspositionTable(2**20), MoveOrdering())[1],
+    "pvs": lambda b, p: alfabeta_iter_deep_pvs(b, p, DEPTH, DEPTH, [-MAX_INT], TranspositionTable(2**20), MoveOrdering())[1],
+    "negamax_iter_deep": lambda b, p: negamax_iter_deep(b, p, DEPTH, DEPTH, [-MAX_INT], TranspositionTable(2**20)).score,
+}
+
+def values(search: callable, positions: [((int, int), int)], table: EndgameTable) -> [float]:
+    set_endgame(table)
+    state_cache.clear()
+    state_cache_bb.clear()
+    try:
+        return [search(board, player) for board, player in positions]
+    finally:
+        set_endgame(None)
+        state_cache.clear()
+        state_cache_bb.clear()
+
+@pytest.fixture(scope="module")
+def positions() -> [((int, int), int)]:
+    return full_positions(10)
+
+@pytest.fixture(scope="module")
+def reference(positions: list) -> [float]:
+    return values(SEARCHES["alfabeta"], positions, DrawTable(MIN_PIECES))
+
+def test_reference_uses_table(positions: list, reference: list) -> None:
+    assert reference != values(SEARCHES["alfabeta"], positions, None)
+
+@pytest.mark.parametrize("name", list(SEARCHES))
+def test_search_probes_table(name: str, positions: list, reference: list) -> None:
+    table = DrawTable(MIN_PIECES)
+    assert values(SEARCHES[name], positions, table) == pytest.approx(reference)
+    assert table.hits > 0
+
+def test_table_of_other_size_rejected(tmp_path) -> None:
+    build_tables(str(tmp_path), 3, 8, 1, progress=False)
+    with pytest.raises(ValueError):
+        EndgameTable(str(tmp_path))
@@ -0,0 +1,185 @@
+import itertools
+import time
+from multiprocessing import Value
+
+import pytest
+
+from game import Game
+from minmax import MAX_INT
+from transposition import TranspositionTable, SharedTranspositionTable
+from parallel_search import ParallelSearch
+from prover import ThreatProver
+from stats import SearchStats, set_search_stats
+from params import DEFAULT_PARAMS
+from endgame import build_tables, set_endgame
+import minmax
+import params
+import parallel_search
+import players
+import search
+
+#MyPlayer.make_move once for every combination of the search flags (python -m pytest test_players.py)
+#combinations that need the transposition table without one must be rejected by __init__
+
+FLAGS = ["bitboard", "tt", "move_time", "ordering", "pvs", "negamax", "inplace", "prover"]
+TV = [MAX_INT, -MAX_INT]
+
+players.DEBUG = False
+
+def make_player(flags: dict, **kwargs) -> players.MyPlayer:
+    return players.MyPlayer(1, 2, TV, bitboard=flags["bitboard"], tt=TranspositionTable(2**20) if flags["tt"] else None,
+                            move_time=0.05 if flags["move_time"] else None, ordering=flags["ordering"], pvs=flags["pvs"],
+                            negamax=flags["negamax"], inplace=flags["inplace"], prover=ThreatProver() if flags["prover"] else None, **kwargs)
+
+def assert_legal(game: Game, move: tuple) -> None:
+    from_pos, slide = move
+    assert game._Game__move(from_pos, slide, game.current_player_idx), f"illegal move {move}"
+
+@pytest.mark.parametrize("values", list(itertools.product([False, True], repeat=len(FLAGS))), ids=lambda v: "-".join(f for f, on in zip(FLAGS, v) if on) or "default")
+def test_make_move(values: tuple) -> None:
+    flags = dict(zip(FLAGS, values))
+    needs_tt = flags["move_time"] or flags["ordering"] or flags["pvs"] or flags["negamax"]
+    if needs_tt and not flags["tt"]:
+        with pytest.raises(ValueError):
+            make_player(flags)
+        return
+    game = Game()
+    assert_legal(game, make_player(flags).make_move(game))
+
+def test_make_move_game_time() -> None:
+    game = Game()
+    player = players.MyPlayer(1, 2, TV, tt=TranspositionTable(2**20), move_time=0.05, game_time=1.0)
+    assert_legal(game, player.make_move(game))
+
+def test_game_time_requires_move_time() -> None:
+    with pytest.raises(ValueError):
+        players.MyPlayer(1, 2, TV, tt=TranspositionTable(2**20), game_time=1.0)
+
+def test_make_move_parallel() -> None:
+    search = ParallelSearch(1, 2**20)
+    try:
+        game = Game()
+        assert_legal(game, players.MyPlayer(1, 2, TV, parallel=search).make_move(game))
+    finally:
+        search.close()
+
+#params and endgame tables of the parent are used by the workers: same value of the sequential search
+def test_make_move_parallel_params() -> None:
+    tuned = {**DEFAULT_PARAMS, "pos_div": 1, "tV": TV}
+    search = ParallelSearch(1, 2**20)
+    try:
+        game = Game()
+        player = players.MyPlayer(1, 2, TV, parallel=search, params=tuned)
+        player.make_move(game)
+        sequential = players.MyPlayer(1, 2, TV, tt=TranspositionTable(2**20), params=tuned)
+        sequential.make_move(game)
+        assert player.last_score == sequential.last_score
+        default = players.MyPlayer(1, 2, TV, tt=TranspositionTable(2**20))
+        default.make_move(game)
+        assert player.last_score != default.last_score
+    finally:
+        search.close()
+        params.set_heuristic_params(None)
+
+def test_search_root_move_endgame(tmp_path) -> None:
+    build_tables(str(tmp_path), 5, 24, 2, progress=False)
+    tt = SharedTranspositionTable(2**20)
+    parallel_search.init_worker(tt, Value('d', -MAX_INT-1))
+    try:
+        parallel_search.search_root_move(((0, 0), 1, 0, 1, False, None, str(tmp_path)))
+        assert minmax.endgame.table_dir == str(tmp_path) and search.endgame is minmax.endgame
+        parallel_search.search_root_move(((0, 0), 1, 0, 1, False, None, None))
+        assert minmax.endgame is None and search.endgame is None
+    finally:
+        set_endgame(None)
+        parallel_search._endgame_dir = None
+        tt.close()
+
+#every search path counts its nodes and records one search with its iterations
+@pytest.mark.parametrize("flags", [[], ["bitboard"], ["inplace"], ["tt"], ["tt", "move_time"], ["tt", "ordering"], ["tt", "pvs"], ["tt", "negamax"], ["parallel"]],
+                         ids=lambda f: "-".join(f) or "default")
+def test_make_move_stats(flags: list) -> None:
+    search = ParallelSearch(1, 2**20) if "parallel" in flags else None
+    stats = SearchStats()
+    set_search_stats(stats)
+    try:
+        game = Game()
+        player = make_player({f: f in flags for f in FLAGS}, parallel=search)
+        assert_legal(game, player.make_move(game))
+    finally:
+        set_search_stats(None)
+        if search is not None:
+            search.close()
+    assert stats.searches == 1
+    assert stats.nodes > 0
+    assert len(stats.iterations) > 0 and sum(row[2] for row in stats.iterations) <= stats.nodes
+
+#params=None plays with the default evaluation, a table shared with a player of other params is not read with stale values
+def test_make_move_params() -> None:
+    tuned = {**DEFAULT_PARAMS, "count_3_div": DEFAULT_PARAMS["count_3_div"] / 4, "tV": TV}
+    tt = TranspositionTable(2**20)
+    game = Game()
+    players.MyPlayer(1, 2, TV, tt=tt, params=tuned).make_move(game)
+    assert minmax.COUNT_3_DIV == tuned["count_3_div"] and len(tt) > 0
+    player = players.MyPlayer(1, 2, TV, tt=tt)
+    player.make_move(game)
+    assert params.active is None and minmax.COUNT_3_DIV == DEFAULT_PARAMS["count_3_div"]
+    assert tt.evaluation == params.evaluation == params.fingerprint(None)
+    fresh = players.MyPlayer(1, 2, TV, tt=TranspositionTable(2**20))
+    fresh.make_move(game)
+    assert player.last_score == fresh.last_score
+
+#players with different params and their own tables keep them when they alternate (tables tagged by evaluation, not cleared)
+def test_make_move_params_own_tables() -> None:
+    tuned = {**DEFAULT_PARAMS, "count_3_div": DEFAULT_PARAMS["count_3_div"] / 4, "tV": TV}
+    game = Game()
+    tuned_player = players.MyPlayer(1, 2, TV, tt=TranspositionTable(2**20), params=tuned)
+    default_player = players.MyPlayer(1, 2, TV, tt=TranspositionTable(2**20))
+    cleared = []
+    for player in (tuned_player, default_player):
+        player._tt.clear = lambda tt=player._tt: cleared.append(tt)
+    for _ in range(2):
+        tuned_player.make_move(game)
+        default_player.make_move(game)
+    assert cleared == []
+    assert tuned_player._tt.evaluation == params.fingerprint(tuned) != default_player._tt.evaluation
+    params.set_heuristic_params(dict(tuned))
+    assert params.evaluation == params.fingerprint(tuned)
+    params.set_heuristic_params(None)
+
+#quiescence only on the numpy backend, rejected with the searches that would ignore it
+@pytest.mark.parametrize("flags", [[], ["inplace"], ["bitboard"], ["tt"], ["tt", "move_time"], ["tt", "ordering"], ["tt", "pvs"], ["tt", "negamax"], ["parallel"]],
+                         ids=lambda f: "-".join(f) or "default")
+def test_make_move_quiescence(flags: list) -> None:
+    search = ParallelSearch(1, 2**20) if "parallel" in flags else None
+    try:
+        if flags in ([], ["inplace"]):
+            game = Game()
+            assert_legal(game, make_player({f: f in flags for f in FLAGS}, quiescence=2).make_move(game))
+        else:
+            with pytest.raises(ValueError):
+                make_player({f: f in flags for f in FLAGS}, parallel=search, quiescence=2)
+    finally:
+        minmax.set_quiescence(0) #process wide, set by make_move
+        if search is not None:
+            search.close()
+
+class SlowProver(ThreatProver):
+    '''ThreatProver that takes at least 20 ms per call'''
+
+    def prove(self, board, player: int, deadline: float = None) -> tuple:
+        time.sleep(0.02)
+        return super().prove(board, player, deadline)
+
+#the whole make_move is charged to the game clock, the prover included
+def test_make_move_clock_prover() -> None:
+    game = Game()
+    player = players.MyPlayer(1, 2, TV, tt=TranspositionTable(2**20), move_time=0.05, game_time=1.0, prover=SlowProver())
+    start = time.perf_counter()
+    assert_legal(game, player.make_move(game))
+    assert 0.02 <= 1.0 - player._clock <= time.perf_counter() - start
+
+def test_prove_deadline() -> None:
+    prover = ThreatProver(max_nodes=10**9)
+    assert prover.prove(Game().get_minmax_board(), 1, time.perf_counter()) is None
+    assert prover.aborted == 1
@@ -0,0 +1,265 @@
+from multiprocessing import shared_memory
+
+#transposition table with fixed size (memory budget) to replace the unbounded state_cache dict
+#NOTE: two-tier replacement scheme as described in "Replacement Schemes for Transposition Tables" (Breuker, Uiterwijk, van den Herik)
+
+#bound types: value is exact, a lower bound (search failed high) or an upper bound (search failed low)
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+#approximate size of one stored entry in bytes (entry tuple + key + value objects): used to convert the budget in slots
+ENTRY_BYTES = 200
+
+DEPTH_PREFERRED = "depth"
+TWO_TIER = "two_tier"
+
+class TranspositionTable(object):
+    '''
+    Fixed number of buckets chosen from max_bytes, every bucket holds:
+    - a depth-preferred slot: replaced only by deeper (or equal depth) results or entries of an older search
+    - an always-replace slot (only for policy TWO_TIER): keeps the most recent result that did not fit the first slot
+    entries are tuples (key, depth, value, bound, move, age), value and bound are from the point of view of the player to move
+    '''
+
+    def __init__(self, max_bytes: int = 64 * 2**20, policy: str = TWO_TIER) -> None:
+        assert policy in [DEPTH_PREFERRED, TWO_TIER], f"unknown replacement policy: {policy}"
+        self.policy = policy
+        n_slots = max(2, max_bytes // ENTRY_BYTES)
+        if policy == TWO_TIER:
+            n_slots //= 2
+        #power of 2 buckets -> index is a mask of the hash
+        self._n_buckets = 1 << (n_slots.bit_length() - 1)
+        self._mask = self._n_buckets - 1
+        self._deep = [None] * self._n_buckets
+        self._recent = [None] * self._n_buckets if policy == TWO_TIER else None
+        self._age = 0
+        self._size = 0
+        self.evaluation = None #params.evaluation of the values stored (None: not tagged yet)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.overwrites = 0
+        self.collisions = 0
+
+    def new_search(self, evaluation: str = None) -> None:
+        '''Entries of previous searches become replaceable by shallower results, all dropped if they are values of another evaluation (params.evaluation)'''
+        if evaluation is not None and evaluation != self.evaluation:
+            if self.evaluation is not None:
+                self.clear()
+            self.evaluation = evaluation
+        self._age += 1
+
+    def clear(self) -> None:
+        self._deep = [None] * self._n_buckets
+        if self._recent is not None:
+            self._recent = [None] * self._n_buckets
+        self._size = 0
+
+    def probe(self, key) -> tuple:
+        '''Returns the entry stored for key or None'''
+        idx = hash(key) & self._mask
+        entry = self._deep[idx]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        if self._recent is not None:
+            recent = self._recent[idx]
+            if recent is not None and recent[0] == key:
+                self.hits += 1
+                return recent
+            if recent is not None:
+                entry = recent
+        self.misses += 1
+        if entry is not None: #bucket used by another position
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth: int, value: float, bound: int, move: int) -> None:
+        idx = hash(key) & self._mask
+        new_entry = (key, depth, value, bound, move, self._age)
+        deep = self._deep[idx]
+
+        if deep is None or deep[0] == key or depth >= deep[1] or deep[5] != self._age:
+            if deep is None:
+                self._size += 1
+                if self._recent is not None and self._recent[idx] is not None and self._recent[idx][0] == key: #older result moves to the first slot
+                    self._recent[idx] = None
+                    self._size -= 1
+            elif deep[0] != key:
+                if self._recent is not None: #old entry demoted to the always-replace slot
+                    recent = self._recent[idx]
+                    if recent is None:
+                        self._size += 1
+                    elif recent[0] != key:
+                        self.overwrites += 1
+                    self._recent[idx] = deep
+                else:
+                    self.overwrites += 1
+            self._deep[idx] = new_entry
+        elif self._recent is not None:
+            recent = self._recent[idx]
+            if recent is None:
+                self._size += 1
+            elif recent[0] != key:
+                self.overwrites += 1
+            self._recent[idx] = new_entry
+
+    def __len__(self) -> int:
+        return self._size
+
+    def capacity(self) -> int:
+        return self._n_buckets * (2 if self._recent is not None else 1)
+
+    def stats(self) -> dict:
+        return {
+            "entries": self._size,
+            "capacity": self.capacity(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "overwrites": self.overwrites,
+            "collisions": self.collisions,
+        }
+
+
+#same interface of TranspositionTable on a fixed block of shared memory (can be used by a pool of processes)
+#entry = 3 words: check, data (depth | bound | move | age), value (float64)
+#NOTE: lockless hashing as in "A lockless transposition table implementation for parallel search" (Hyatt, Mann):
+#check = key ^ data ^ value bits -> an entry torn by concurrent writes fails the check and is a miss, no locks needed
+SHARED_ENTRY_BYTES = 24
+
+class SharedTranspositionTable(object):
+    '''
+    Two-tier buckets (depth-preferred slot 2*idx, always-replace slot 2*idx+1) in a SharedMemory block.
+    The process that creates the table owns it (close() unlinks it), processes that receive it by pickle attach to it.
+    keys must be non negative ints < 2**64 (canonical_key_zobrist), hit/miss counters are local to each process,
+    the number of entries is a shared word updated on store (approximate when processes store at the same time)
+    '''
+
+    def __init__(self, max_bytes: int = 64 * 2**20, name: str = None, n_buckets: int = None) -> None:
+        if name is None:
+            n_slots = max(2, max_bytes // SHARED_ENTRY_BYTES) // 2
+            self._n_buckets = 1 << (n_slots.bit_length() - 1)
+            #+16 bytes: search generation (age) and number of entries shared by all the processes
+            self._shm = shared_memory.SharedMemory(create=True, size=16 + 2 * self._n_buckets * SHARED_ENTRY_BYTES)
+            self._owner = True
+        else:
+            self._n_buckets = n_buckets
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self._mask = self._n_buckets - 1
+        n = 2 * self._n_buckets
+        buf = self._shm.buf
+        self._header = buf[0:16].cast('Q') #age, entries
+        self._check = buf[16:16 + 8*n].cast('Q')
+        self._data = buf[16 + 8*n:16 + 16*n].cast('Q')
+        self._value = buf[16 + 16*n:16 + 24*n].cast('d')
+        self._value_bits = buf[16 + 16*n:16 + 24*n].cast('Q')
+        if self._owner:
+            self.clear()
+        self._age = self._header[0]
+        self.policy = TWO_TIER
+        self.evaluation = None #params.evaluation of the values stored (checked by the process that calls new_search)
+        self.reset_stats()
+
+    def __reduce__(self):
+        return (SharedTranspositionTable, (0, self._shm.name, self._n_buckets))
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.overwrites = 0
+        self.collisions = 0
+
+    def new_search(self, evaluation: str = None) -> None:
+        if evaluation is not None and evaluation != self.evaluation:
+            if self.evaluation is not None:
+                self.clear()
+            self.evaluation = evaluation
+        self._age = (self._header[0] + 1) & 0xFFFF
+        self._header[0] = self._age
+
+    def sync_age(self) -> None:
+        '''Read the search generation set by new_search of another process'''
+        self._age = self._header[0]
+
+    def clear(self) -> None:
+        self._shm.buf[8:] = bytes(len(self._shm.buf) - 8) #entries and slots
+
+    def _read(self, slot: int, key: int) -> tuple:
+        data = self._data[slot]
+        if data == 0 or self._check[slot] ^ data ^ self._value_bits[slot] != key:
+            return None
+        move = (data >> 10) & 0xFF
+        return (key, data & 0xFF, self._value[slot], (data >> 8) & 0x3, move - 1 if move else None, data >> 18)
+
+    def _write(self, slot: int, key: int, depth: int, value: float, bound: int, move: int) -> None:
+        data = depth | bound << 8 | (0 if move is None else move + 1) << 10 | self._age << 18
+        self._value[slot] = value
+        self._data[slot] = data
+        self._check[slot] = key ^ data ^ self._value_bits[slot]
+
+    def probe(self, key: int) -> tuple:
+        '''Returns the entry stored for key or None'''
+        idx = (key & self._mask) << 1
+        entry = self._read(idx, key)
+        if entry is None:
+            entry = self._read(idx + 1, key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        if self._data[idx] != 0 or self._data[idx + 1] != 0: #bucket used by another position
+            self.collisions += 1
+        return None
+
+    def store(self, key: int, depth: int, value: float, bound: int, move: int) -> None:
+        idx = (key & self._mask) << 1
+        deep = self._read(idx, key)
+        data = self._data[idx]
+        if data == 0 or deep is not None or depth >= (data & 0xFF) or (data >> 18) != self._age:
+            if data == 0:
+                self._header[1] += 1
+            elif deep is None: #old entry demoted to the always-replace slot
+                if self._data[idx + 1] == 0:
+                    self._header[1] += 1
+                elif self._read(idx + 1, key) is None:
+                    self.overwrites += 1
+                self._data[idx + 1] = data
+                self._value[idx + 1] = self._value[idx]
+                self._check[idx + 1] = self._check[idx]
+            self._write(idx, key, depth, value, bound, move)
+        else:
+            if self._data[idx + 1] == 0:
+                self._header[1] += 1
+            elif self._read(idx + 1, key) is None:
+                self.overwrites += 1
+            self._write(idx + 1, key, depth, value, bound, move)
+
+    def __len__(self) -> int:
+        return self._header[1]
+
+    def capacity(self) -> int:
+        return 2 * self._n_buckets
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self),
+            "capacity": self.capacity(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "overwrites": self.overwrites,
+            "collisions": self.collisions,
+        }
+
+    def close(self) -> None:
+        self._header.release()
+        self._check.release()
+        self._data.release()
+        self._value.release()
+        self._value_bits.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
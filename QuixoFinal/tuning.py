@@ -0,0 +1,171 @@
+import argparse
+import math
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from transposition import TranspositionTable
+from params import DEFAULT_PARAMS, load_params, save_params
+from selfplay import record_game
+import players
+
+#tuning of the params of params.py (divisors of the counts of 4/3 in line, positional scores, tV thresholds) with SPSA
+#(simultaneous perturbation stochastic approximation): every iteration plays theta + c*delta against theta - c*delta
+#(delta = random +-1 on every coordinate) and moves theta along delta by the difference of the scores
+#-> 2 players per iteration whatever the number of params (a mutation of every coordinate at once, as the self-adaptive
+#mutations of lab9, but with a gradient step instead of a selection)
+#games are pairs with the same random opening and colours swapped, played on a pool of processes, the run stops at a time budget
+#the result is compared with DEFAULT_PARAMS in a final match: score and Elo difference with its 95% interval
+
+#theta (normalized coordinates): log of the two divisors, the 6 values of the positional scores (tiles equivalent by the
+#8 rotations/flips share the value, pos_div is fixed: scaling all the values is the same as changing it), inner thresholds of tV
+#SCALE = change of the param for 1 unit of theta
+LOG_DIV_SCALE = 0.2
+POS_SCALE = 0.5
+TV_SCALE = 0.1
+
+#SPSA gains: a_k = A / (k + 1 + STABILITY)^ALPHA, c_k = C / (k + 1)^GAMMA (values suggested by Spall)
+A = 4.0
+STABILITY = 10
+ALPHA = 0.602
+C = 1.0
+GAMMA = 0.101
+
+BUDGET = 600 #seconds of SPSA iterations (the final match is not included)
+PAIRS = 8 #pairs of games per iteration
+EVAL_PAIRS = 50
+MIN_DEPTH = 1
+MAX_DEPTH = 3
+RANDOM_PLIES = 4
+MAX_PLIES = 200 #longer games are draws
+EVAL_SEED = 10**9 #first seed of the final match (the tuning uses seed * 10^6 + k * pairs)
+TT_BYTES = 32 * 2**20 #each of the two players of a worker has its own table (different evaluations)
+
+#class of every tile: orbit of the 8 rotations/flips of the board
+def tile_classes() -> np.array:
+    classes = np.full((5, 5), -1)
+    n = 0
+    for i in range(5):
+        for j in range(5):
+            if classes[i, j] < 0:
+                cells = set()
+                a, b = i, j
+                for _ in range(4):
+                    a, b = b, 4 - a
+                    cells |= {(a, b), (b, a)}
+                for a, b in cells:
+                    classes[a, b] = n
+                n += 1
+    return classes
+
+TILE_CLASSES = tile_classes()
+N_CLASSES = TILE_CLASSES.max() + 1
+
+def to_theta(params: dict) -> np.array:
+    pos_scores = np.array(params["pos_scores"], dtype=float)
+    pos = [pos_scores[TILE_CLASSES == c].mean() for c in range(N_CLASSES)]
+    return np.array([math.log(params["count_4_div"]) / LOG_DIV_SCALE, math.log(params["count_3_div"]) / LOG_DIV_SCALE]
+                    + [p / POS_SCALE for p in pos] + [t / TV_SCALE for t in params["tV"][1:-1]])
+
+def from_theta(theta: np.array, base: dict = DEFAULT_PARAMS) -> dict:
+    pos = theta[2:2 + N_CLASSES] * POS_SCALE
+    return {
+        "count_4_div": math.exp(theta[0] * LOG_DIV_SCALE),
+        "count_3_div": math.exp(theta[1] * LOG_DIV_SCALE),
+        "pos_div": base["pos_div"],
+        "pos_scores": pos[TILE_CLASSES].tolist(),
+        "tV": base["tV"][:1] + (theta[2 + N_CLASSES:] * TV_SCALE).tolist() + base["tV"][-1:],
+    }
+
+def elo(score: float) -> float:
+    '''Elo difference of a player with mean score (0 loss, 0.5 draw, 1 win) against its opponent'''
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def elo_interval(points: [float]) -> (float, float, float):
+    '''Elo difference and 95% interval from the points of every game'''
+    n = len(points)
+    score = sum(points) / n
+    se = math.sqrt(max(sum((p - score)**2 for p in points) / n, 1e-12) / n)
+    return elo(score), elo(score - 1.96 * se), elo(score + 1.96 * se)
+
+
+_worker_tt = None
+
+def init_worker(tt_bytes: int) -> None:
+    global _worker_tt
+    players.DEBUG = False
+    _worker_tt = (TranspositionTable(tt_bytes), TranspositionTable(tt_bytes))
+
+#points of params_a in a pair of games (same opening, a moves first in the first game, second in the other one)
+def play_pair(args: (int, dict, dict, int, int, int, int)) -> (float, float):
+    seed, params_a, params_b, min_depth, max_depth, random_plies, max_plies = args
+    points = []
+    for first in (0, 1):
+        for tt in _worker_tt:
+            tt.clear()
+        a = players.MyPlayer(min_depth, max_depth, params_a["tV"], tt=_worker_tt[0], params=params_a)
+        b = players.MyPlayer(min_depth, max_depth, params_b["tV"], tt=_worker_tt[1], params=params_b)
+        random.seed(seed)
+        records = record_game(seed, (a, b) if first == 0 else (b, a), random_plies, max_plies)
+        points.append((records["outcome"][first] + 1) / 2) #a moves at ply first (outcome 0: stopped at max_plies, draw)
+    return tuple(points)
+
+def match(pool: Pool, seeds: range, params_a: dict, params_b: dict, min_depth: int, max_depth: int, random_plies: int, max_plies: int) -> [float]:
+    '''Points of params_a in every game'''
+    tasks = [(seed, params_a, params_b, min_depth, max_depth, random_plies, max_plies) for seed in seeds]
+    return [p for pair in pool.map(play_pair, tasks) for p in pair]
+
+def spsa(pool: Pool, params: dict, budget: float, pairs: int = PAIRS, min_depth: int = MIN_DEPTH, max_depth: int = MAX_DEPTH, random_plies: int = RANDOM_PLIES, max_plies: int = MAX_PLIES, seed: int = 0, log: callable = print) -> (dict, [dict]):
+    '''Tuned params after the iterations that start within budget seconds, history of the iterations'''
+    rng = np.random.default_rng(seed)
+    theta = to_theta(params)
+    history = []
+    start = time.perf_counter()
+    k = 0
+    while time.perf_counter() - start < budget:
+        a_k = A / (k + 1 + STABILITY)**ALPHA
+        c_k = C / (k + 1)**GAMMA
+        delta = rng.choice([-1, 1], size=len(theta))
+        plus, minus = from_theta(theta + c_k * delta, params), from_theta(theta - c_k * delta, params)
+        seeds = range(seed * 10**6 + k * pairs, seed * 10**6 + (k + 1) * pairs)
+        points = match(pool, seeds, plus, minus, min_depth, max_depth, random_plies, max_plies)
+        r = 2 * sum(points) / len(points) - 1 #score difference of plus and minus (in [-1, 1])
+        theta = theta + a_k * r / (2 * c_k) * delta #delta is +-1: 1 / delta = delta
+        history.append({"iteration": k, "score_plus": sum(points) / len(points), "seconds": time.perf_counter() - start, "theta": theta.tolist()})
+        log(f"iteration {k}: score of theta+ {sum(points) / len(points):.3f}, {time.perf_counter() - start:.0f} s")
+        k += 1
+    return from_theta(theta, params), history
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SPSA tuning of the evaluation params (params.py) with self-play matches")
+    parser.add_argument("--out", type=str, default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "params.json"), help="tuned params, read by MyPlayer(params=load_params(...)) and by the batch of main (default: next to main.py)")
+    parser.add_argument("--start", type=str, default=None, help="params file to start from (default: DEFAULT_PARAMS)")
+    parser.add_argument("--budget", type=float, default=BUDGET, help="seconds of tuning")
+    parser.add_argument("--pairs", type=int, default=PAIRS, help="pairs of games per iteration")
+    parser.add_argument("--eval-pairs", type=int, default=EVAL_PAIRS, help="pairs of games of the final match against DEFAULT_PARAMS")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--min-depth", type=int, default=MIN_DEPTH)
+    parser.add_argument("--max-depth", type=int, default=MAX_DEPTH)
+    parser.add_argument("--tt-mb", type=int, default=TT_BYTES // 2**20, help="transposition table size of each player of a worker (MB)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    params = DEFAULT_PARAMS if args.start is None else load_params(args.start)
+    assert len(params["tV"]) == args.max_depth - args.min_depth + 1, "tV needs one threshold per depth"
+
+    with Pool(args.workers, initializer=init_worker, initargs=(args.tt_mb * 2**20,)) as pool:
+        tuned, history = spsa(pool, params, args.budget, args.pairs, args.min_depth, args.max_depth, seed=args.seed)
+        #final match on seeds not used by the tuning
+        seeds = range(EVAL_SEED, EVAL_SEED + args.eval_pairs)
+        points = match(pool, seeds, tuned, DEFAULT_PARAMS, args.min_depth, args.max_depth, RANDOM_PLIES, MAX_PLIES)
+
+    gain, low, high = elo_interval(points)
+    print(f"tuned against default: score {sum(points) / len(points):.3f} in {len(points)} games, Elo {gain:+.0f} [{low:+.0f}, {high:+.0f}]")
+    save_params(args.out, tuned, tuning={"iterations": len(history), "budget": args.budget, "games": len(points), "score": sum(points) / len(points),
+                                        "elo": gain, "elo_95": [low, high], "history": history})
+    print(f"{args.out}: {tuned}")
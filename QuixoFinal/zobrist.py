@@ -0,0 +1,82 @@
+import random
+from bitboard import SIMM_PERM, MOVES, PLY_TABLE, make_ply_bb
+from game import Move #original enum
+
+#zobrist hashing of bitboards with the 16 simmetries (8 rotations/flips x colour swap) kept at the same time:
+#every simmetry has its own 64-bit lane, the 16 lanes are packed in one int (lane l = bits 64*l..64*l+63)
+#-> one xor updates all the lanes and the canonical key is the min over 16 ints (no board copies, see canonical_repr_16simm)
+
+N_LANES = 16 #lane = t + 8*swap: t is the index of SIMM_PERM, swap means colour swapped board (player 1 <-> player -1)
+LANE_MASK = (1 << 64) - 1
+#the low 4 bits of every lane are the lane index (random numbers have them cleared) -> the min tells the simmetry used
+TAG_BITS = 4
+ZOBRIST_SEED = 2024
+
+_rng = random.Random(ZOBRIST_SEED)
+#Z[cell][0] for a tile of player 1, Z[cell][1] for a tile of player -1
+Z = [[_rng.getrandbits(64) & ~((1 << TAG_BITS) - 1) for _ in range(2)] for _ in range(25)]
+Z_TURN = _rng.getrandbits(64) & ~((1 << TAG_BITS) - 1)
+
+def pack(values: [int]) -> int:
+    packed = 0
+    for l, v in enumerate(values):
+        packed |= v << (64 * l)
+    return packed
+
+#packed contribution of a tile of player 1 (piece 0) or -1 (piece 1) on cell c
+def cell_lanes(c: int, piece: int) -> int:
+    values = []
+    for swap in range(2):
+        for perm in SIMM_PERM:
+            values.append(Z[perm.index(c)][piece ^ swap])
+    return pack(values)
+
+CELL_LANES = [[cell_lanes(c, piece) for piece in range(2)] for c in range(25)]
+
+H_EMPTY = pack(list(range(N_LANES)))
+#side to move: xor on the not swapped lanes when player 1 moves, on the swapped ones when player -1 moves
+TURN_POS = pack([Z_TURN] * 8 + [0] * 8)
+TURN_NEG = pack([0] * 8 + [Z_TURN] * 8)
+
+#LINE_LANES[l][pos5 | neg5 << 5]: packed hash of the content of line l (rows 0..4, cols 0..4), bit k = k-th tile of the line
+LINE_CELLS = [[r*5 + k for k in range(5)] for r in range(5)] + [[k*5 + c for k in range(5)] for c in range(5)]
+LINE_LANES = []
+for cells in LINE_CELLS:
+    table = [0] * 1024
+    for pattern in range(1, 1024):
+        low = (pattern & -pattern).bit_length() - 1 #lowest bit set
+        piece, k = divmod(low, 5)
+        table[pattern] = table[pattern & (pattern - 1)] ^ CELL_LANES[cells[k]][piece]
+    LINE_LANES.append(table)
+
+COL0 = sum(1 << (5*k) for k in range(5))
+
+#bits 0,5,10,15,20 of x -> bits 0..4 (magic multiplication, no carries for this layout)
+def gather_col(x: int) -> int:
+    return ((x & COL0) * 0x111110 >> 20) & 31
+
+def line_pattern(board: (int, int), line: int) -> int:
+    if line < 5:
+        return (board[0] >> 5*line) & 31 | ((board[1] >> 5*line) & 31) << 5
+    return gather_col(board[0] >> (line - 5)) | gather_col(board[1] >> (line - 5)) << 5
+
+#line changed by each ply: row i for LEFT/RIGHT, col j for TOP/BOTTOM
+PLY_LINE = [ply[1] + 5 if ply[2] in [Move.TOP, Move.BOTTOM] else ply[0] for ply in MOVES]
+
+def zobrist_hash(board: (int, int)) -> int:
+    h = H_EMPTY
+    for r in range(5):
+        h ^= LINE_LANES[r][line_pattern(board, r)]
+    return h
+
+#ply with incremental update of the hash: only the line of the slide changes
+def make_ply_zobrist(board: (int, int), h: int, m: int, player: int) -> ((int, int), int):
+    new_board = make_ply_bb(board, m, player)
+    table = LINE_LANES[PLY_LINE[m]]
+    return new_board, h ^ table[line_pattern(board, PLY_LINE[m])] ^ table[line_pattern(new_board, PLY_LINE[m])]
+
+#canonical key of (board, player to move): same for the 16 simmetric positions, also returns the simmetry t of SIMM_PERM
+#that maps the board to the canonical frame (moves can be mapped with MOVE_SIMM[t])
+def canonical_key_zobrist(h: int, player: int) -> (int, int):
+    v = min(memoryview((h ^ (TURN_POS if player == 1 else TURN_NEG)).to_bytes(8 * N_LANES, 'little')).cast('Q'))
+    return v >> TAG_BITS, v & 7